@@ -0,0 +1,210 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from config import Config
+from models import Turn
+from utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class SchedulerFull(Exception):
+    """Raised when the scheduler already holds its maximum number of jobs"""
+
+
+class Engagement:
+    """One autonomous engagement, advanced a single turn at a time.
+
+    ``step`` runs one agent reply + scammer reply round trip and returns
+    whether another turn is needed; ``finish`` runs the final extraction.
+    When a detector is given, the first step runs scam detection instead;
+    with a persona registry, the persona is then routed by the scam type.
+    With an event broker, progress is published for live viewers and the
+    persona reply is streamed token by token while anyone is watching.
+    The status and history are read from the store once (so an existing
+    conversation is resumed) and then kept on the engagement as turns are
+    written, so a turn never re-reads the whole transcript.
+    """
+
+    def __init__(self, conv_id, initial_message, max_turns, persona, extractor,
+                 conversation_store, scammer_api, detector=None, personas=None,
+                 events=None):
+        self.conv_id = conv_id
+        self.max_turns = max_turns
+        self.persona = persona
+        self.personas = personas
+        self.conversation_store = conversation_store
+        self.scammer_api = scammer_api
+        self.detector = detector
+        self.events = events
+        self.extraction = extractor.start_session()
+        self.current_scammer_msg = initial_message
+        self.turn = 0
+        self.detection = None
+        self.final_intel = None
+        self._conversation = None
+
+    @property
+    def conversation(self):
+        """Local view of the conversation: id, status and history"""
+        if self._conversation is None:
+            stored = self.conversation_store.get(self.conv_id)
+            self._conversation = {
+                'id': self.conv_id,
+                'status': stored['status'] if stored is not None else 'active',
+                'history': list(stored['history']) if stored is not None else []
+            }
+        return self._conversation
+
+    def _set_status(self, status, **fields):
+        self.conversation_store.update(self.conv_id, status=status, **fields)
+        self.conversation['status'] = status
+
+    def step(self):
+        """Advance the engagement; return True while more turns are needed"""
+        if self.detector is not None and self.detection is None:
+            return self._detect()
+
+        conversation = self.conversation
+        if conversation['status'] != 'active':
+            self._set_status('active')
+            self._publish('status', status='active')
+        turn = self.turn
+        self.turn += 1
+        self._publish('message', turn=turn, scammer=self.current_scammer_msg)
+
+        # Agent responds (streamed only while someone is watching)
+        on_token = None
+        if self.events is not None and self.events.has_subscribers(self.conv_id):
+            on_token = lambda text: self._publish('token', turn=turn, text=text)
+        agent_response = self.persona.generate_response(
+            self.current_scammer_msg, conversation, on_token=on_token
+        )
+        self.conversation_store.add_turn(self.conv_id, self.current_scammer_msg, agent_response)
+        conversation['history'].append(Turn(self.current_scammer_msg, agent_response))
+        self._publish('turn', turn=turn, scammer=self.current_scammer_msg, agent=agent_response)
+
+        # Get scammer's next message
+        scammer_response = self.scammer_api.send_message(self.conv_id, agent_response)
+        self.current_scammer_msg = scammer_response.get('message')
+
+        if not self.current_scammer_msg:
+            return False
+
+        # Check if we've extracted enough intelligence (new turns only, no LLM)
+        self.extraction.update(conversation)
+        intel = self.extraction.intel()
+        if len(intel.get('upi_ids', [])) > 0 or len(intel.get('bank_accounts', [])) > 0:
+            # Got what we need, can stop early
+            if turn >= 2:  # At least 3 turns
+                return False
+
+        return self.turn < self.max_turns
+
+    def finish(self):
+        """Final intelligence extraction (single AI pass over the transcript)"""
+        conversation = self.conversation
+        if conversation['status'] == 'not_a_scam':
+            return None
+
+        self.final_intel = self.extraction.finalize(conversation)
+        self._set_status('completed', extracted_intel=self.final_intel)
+        self._publish('done', status='completed', extracted_intel=self.final_intel)
+        metrics.inc('engagements_total', status='completed')
+        return self.final_intel
+
+    def fail(self, error):
+        self._set_status('failed', error=str(error))
+        self._publish('done', status='failed', error=str(error))
+        metrics.inc('engagements_total', status='failed')
+
+    def _detect(self):
+        self.detection = self.detector.assign_campaign(
+            self.current_scammer_msg, self.detector.detect(self.current_scammer_msg)
+        )
+        fields = {'detection': self.detection, 'scam_type': self.detection['scam_type']}
+
+        if self.detection.get('campaign_id'):
+            fields['campaign_id'] = self.detection['campaign_id']
+
+        if not self.detection['is_scam']:
+            fields['status'] = 'not_a_scam'
+        elif self.personas is not None:
+            fields['persona'] = self.personas.name_for(self.detection['scam_type'])
+            self.persona = self.personas.get(fields['persona'])
+        self.conversation_store.update(self.conv_id, **fields)
+        if 'status' in fields:
+            self.conversation['status'] = fields['status']
+        if self.detection['is_scam']:
+            self._publish('status', status='detected', scam_type=fields['scam_type'],
+                          persona=fields.get('persona'), campaign_id=fields.get('campaign_id'))
+        else:
+            self._publish('done', status='not_a_scam')
+            metrics.inc('engagements_total', status='not_a_scam')
+        return self.detection['is_scam']
+
+    def _publish(self, event, **data):
+        if self.events is not None:
+            self.events.publish(self.conv_id, event, data)
+
+
+class EngagementScheduler:
+    """Runs many engagements concurrently on a bounded worker pool.
+
+    Each job is re-queued after every turn, so conversations interleave
+    turn by turn instead of one engagement holding a worker until it ends.
+    A step still holds its thread through the blocking LLM call and
+    scammer round trip, so at most ``max_workers`` engagements make
+    progress at once per process; the rest wait in the pool's queue.
+    """
+
+    def __init__(self, max_workers=None, max_jobs=None):
+        self.max_workers = max_workers or Config.ENGAGEMENT_WORKERS
+        self.max_jobs = max_jobs or Config.ENGAGEMENT_MAX_JOBS
+        self._pool = ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix='engagement'
+        )
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self.completed = 0
+        self.failed = 0
+
+    def submit(self, engagement):
+        """Queue an engagement; raises SchedulerFull when at capacity"""
+        with self._lock:
+            if len(self._jobs) >= self.max_jobs:
+                raise SchedulerFull(f'{self.max_jobs} engagements already running')
+            self._jobs[engagement.conv_id] = engagement
+        self._pool.submit(self._run_step, engagement)
+
+    def is_running(self, conv_id):
+        return conv_id in self._jobs
+
+    def stats(self):
+        return {
+            'running': len(self._jobs),
+            'workers': self.max_workers,
+            'max_jobs': self.max_jobs,
+            'completed': self.completed,
+            'failed': self.failed
+        }
+
+    def _run_step(self, engagement):
+        try:
+            if engagement.step():
+                self._pool.submit(self._run_step, engagement)
+                return
+            engagement.finish()
+            failed = False
+        except Exception as e:
+            logger.exception("Engagement failed", extra={'conv_id': engagement.conv_id})
+            engagement.fail(e)
+            failed = True
+
+        with self._lock:
+            self._jobs.pop(engagement.conv_id, None)
+            if failed:
+                self.failed += 1
+            else:
+                self.completed += 1
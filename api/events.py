@@ -0,0 +1,57 @@
+import queue
+import threading
+
+# Statuses after which a conversation produces no more events
+TERMINAL_STATUSES = ('completed', 'not_a_scam', 'failed')
+
+
+class ConversationEvents:
+    """In-process publish/subscribe of live conversation events.
+
+    Engagements publish turn, token and status events; each SSE client holds
+    a bounded queue for one conversation. A client that falls too far behind
+    loses events rather than slowing the engagement down. Events only reach
+    subscribers in the same process as the engagement.
+    """
+
+    def __init__(self, max_queue=1000):
+        self.max_queue = max_queue
+        self._subscribers = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, conv_id):
+        subscriber = queue.Queue(maxsize=self.max_queue)
+        with self._lock:
+            self._subscribers.setdefault(conv_id, []).append(subscriber)
+        return subscriber
+
+    def unsubscribe(self, conv_id, subscriber):
+        with self._lock:
+            subscribers = self._subscribers.get(conv_id, [])
+            if subscriber in subscribers:
+                subscribers.remove(subscriber)
+            if not subscribers:
+                self._subscribers.pop(conv_id, None)
+
+    def has_subscribers(self, conv_id):
+        return conv_id in self._subscribers
+
+    def publish(self, conv_id, event, data):
+        with self._lock:
+            subscribers = list(self._subscribers.get(conv_id, ()))
+        for subscriber in subscribers:
+            try:
+                subscriber.put_nowait((event, data))
+            except queue.Full:
+                pass
+
+    def stats(self):
+        with self._lock:
+            return {
+                'conversations': len(self._subscribers),
+                'subscribers': sum(len(s) for s in self._subscribers.values())
+            }
+
+
+# Global instance
+conversation_events = ConversationEvents()
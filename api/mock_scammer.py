@@ -1,70 +1,120 @@
-import requests
+import logging
+import threading
+
+import httpx
+
 from config import Config
+from utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
 
 class MockScammerAPI:
-    """Integration with Mock Scammer API"""
+    """Integration with Mock Scammer API over pooled, keep-alive connections"""
+    
+    def __init__(self, base_url=None, api_key=None, max_connections=None, timeout=None):
+        self.base_url = (base_url or Config.MOCK_SCAMMER_API_URL or '').rstrip('/')
+        self.api_key = api_key or Config.MOCK_SCAMMER_API_KEY
+        self.max_connections = max_connections or Config.MOCK_SCAMMER_MAX_CONNECTIONS
+        self.timeout = timeout or Config.MOCK_SCAMMER_TIMEOUT
+        self._client = None
+        self._async_client = None
+        self._simulator = None
+        self._lock = threading.Lock()
+    
+    def _client_options(self):
+        headers = {'Content-Type': 'application/json'}
+        if self.api_key:
+            headers['Authorization'] = f'Bearer {self.api_key}'
+        return {
+            'base_url': self.base_url,
+            'headers': headers,
+            'timeout': self.timeout,
+            'limits': httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_connections,
+                keepalive_expiry=60
+            )
+        }
     
-    def __init__(self):
-        self.base_url = Config.MOCK_SCAMMER_API_URL
-        self.api_key = Config.MOCK_SCAMMER_API_KEY
+    @property
+    def client(self):
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    self._client = httpx.Client(**self._client_options())
+        return self._client
     
+    @property
+    def async_client(self):
+        if self._async_client is None:
+            with self._lock:
+                if self._async_client is None:
+                    self._async_client = httpx.AsyncClient(**self._client_options())
+        return self._async_client
+    
+    @property
+    def simulator(self):
+        if self._simulator is None:
+            from simulator import ScammerSimulator
+            with self._lock:
+                if self._simulator is None:
+                    self._simulator = ScammerSimulator()
+        return self._simulator
+    
+    @metrics.timed('scammer_reply')
     def send_message(self, conversation_id, agent_message):
         """Send agent message to mock scammer and get response"""
         
         if not self.base_url:
             # Fallback for testing without actual API
-            return self._mock_response(agent_message)
+            return self._mock_response(conversation_id, agent_message)
         
         try:
-            response = requests.post(
-                f"{self.base_url}/respond",
-                json={
-                    'conversation_id': conversation_id,
-                    'message': agent_message
-                },
-                headers={
-                    'Authorization': f'Bearer {self.api_key}',
-                    'Content-Type': 'application/json'
-                },
-                timeout=10
-            )
-            
+            response = self.client.post('/respond', json={
+                'conversation_id': conversation_id,
+                'message': agent_message
+            })
             response.raise_for_status()
             return response.json()
             
         except Exception as e:
-            print(f"Mock Scammer API error: {e}")
-            return self._mock_response(agent_message)
+            logger.warning("Mock Scammer API error: %s", e)
+            metrics.inc('fallbacks_total', component='scammer')
+            return self._mock_response(conversation_id, agent_message)
     
-    def _mock_response(self, agent_message):
-        """Generate mock scammer response for testing"""
-        
-        # Simple rule-based mock responses
-        message_lower = agent_message.lower()
+    async def asend_message(self, conversation_id, agent_message):
+        """Async variant of send_message, for asyncio load generators"""
         
-        if 'how' in message_lower or 'what' in message_lower:
-            return {
-                'message': 'Sir, very simple process. Just send your bank account number and IFSC code to my UPI: scammer123@paytm. We will transfer money immediately!',
-                'scammer_id': 'mock_scammer_001'
-            }
-        
-        elif 'son' in message_lower or 'check' in message_lower or 'family' in message_lower:
-            return {
-                'message': 'No need sir! This is 100% government approved. Your son will also say same thing. Just send details now before offer expires!',
-                'scammer_id': 'mock_scammer_001'
-            }
-        
-        elif 'safe' in message_lower or 'trust' in message_lower:
-            return {
-                'message': 'Yes sir, completely safe! Just click this link: http://fake-lottery-claim.com/verify and enter your card details. Or call me at 9876543210.',
-                'scammer_id': 'mock_scammer_001'
-            }
+        if not self.base_url:
+            return self._mock_response(conversation_id, agent_message)
         
-        else:
-            return {
-                'message': 'Sir please hurry! Send Rs 1000 processing fee to winner2024@paytm to claim your Rs 10 lakh prize. Limited time offer!',
-                'scammer_id': 'mock_scammer_001'
-            }
+        try:
+            response = await self.async_client.post('/respond', json={
+                'conversation_id': conversation_id,
+                'message': agent_message
+            })
+            response.raise_for_status()
+            return response.json()
+            
+        except Exception as e:
+            logger.warning("Mock Scammer API error: %s", e)
+            metrics.inc('fallbacks_total', component='scammer')
+            return self._mock_response(conversation_id, agent_message)
+    
+    def close(self):
+        """Close pooled connections (the async client must be closed with aclose)"""
+        if self._client is not None:
+            self._client.close()
+            self._client = None
+    
+    async def aclose(self):
+        if self._async_client is not None:
+            await self._async_client.aclose()
+            self._async_client = None
+    
+    def _mock_response(self, conversation_id, agent_message):
+        """Scripted scammer reply from the in-process simulator"""
+        return self.simulator.respond(conversation_id, agent_message)
 
 # Global instance
-mock_scammer_api = MockScammerAPI()
\ No newline at end of file
+mock_scammer_api = MockScammerAPI()
@@ -0,0 +1,90 @@
+import json
+
+from config import Config
+from detection.matcher import TrieMatcher
+
+# Any of these marks the message as a scam
+SCAM_FLAG_KEYWORDS = [
+    'blocked', 'verify', 'urgent', 'account',
+    'bank', 'otp', 'prize', 'lottery',
+    'upi', 'paytm', 'payment', 'money'
+]
+
+# Checked in order; the first rule with a keyword in the message replies
+REPLY_RULES = [
+    {'name': 'blocked', 'keywords': ['blocked', 'suspended'],
+     'reply': "Oh no! My account blocked? But sir, I not do anything wrong."},
+    {'name': 'verify', 'keywords': ['verify'],
+     'reply': "Verify again? But I already did KYC."},
+    {'name': 'bank', 'keywords': ['bank'],
+     'reply': "Which bank sir? I have SBI only."},
+    {'name': 'prize', 'keywords': ['prize', 'lottery'],
+     'reply': "Really? I won? I not remember applying."},
+    {'name': 'upi', 'keywords': ['upi', 'paytm'],
+     'reply': "UPI I not know properly. My son handles phone."},
+    {'name': 'urgent', 'keywords': ['urgent'],
+     'reply': "So urgent? I am busy now."},
+    {'name': 'link', 'keywords': ['link'],
+     'reply': "Link? Please explain slowly."},
+    {'name': 'call', 'keywords': ['call'],
+     'reply': "Is this official number sir?"},
+    {'name': 'payment', 'keywords': ['pay', 'money'],
+     'reply': "Why I need to pay money?"},
+]
+
+DEFAULT_REPLY = "Sir, please explain again."
+
+
+class QuickReplyEngine:
+    """Rule-table reply selection for /api/process-message.
+
+    The scam keywords and every rule's keywords share one compiled matcher,
+    so a message is scanned once. The scam flag and the reply then come
+    from bitmask tests against the hit mask.
+    """
+
+    def __init__(self, rules=None, scam_keywords=None, default_reply=None):
+        self.rules = REPLY_RULES if rules is None else rules
+        scam_keywords = SCAM_FLAG_KEYWORDS if scam_keywords is None else scam_keywords
+        self.default_reply = default_reply or DEFAULT_REPLY
+
+        vocabulary = set(scam_keywords)
+        for rule in self.rules:
+            vocabulary.update(rule['keywords'])
+        self.matcher = TrieMatcher(vocabulary)
+
+        self._scam_mask = self.matcher.mask_of(scam_keywords)
+        self._rule_masks = [
+            (self.matcher.mask_of(rule['keywords']), rule['reply']) for rule in self.rules
+        ]
+
+    @classmethod
+    def from_file(cls, path):
+        """Load a rule table from JSON: {"rules": [...], "scam_keywords": [...], "default_reply": "..."}"""
+        with open(path, encoding='utf-8') as f:
+            table = json.load(f)
+        return cls(
+            rules=table.get('rules'),
+            scam_keywords=table.get('scam_keywords'),
+            default_reply=table.get('default_reply')
+        )
+
+    def respond(self, message):
+        """Return (is_scam, reply) for a message"""
+        mask = self.matcher.scan(message.lower())
+        for rule_mask, reply in self._rule_masks:
+            if mask & rule_mask:
+                return bool(mask & self._scam_mask), reply
+        return bool(mask & self._scam_mask), self.default_reply
+
+
+def create_quick_reply_engine(path=None):
+    """Build the engine from Config.QUICK_REPLY_RULES_PATH, or the built-in table"""
+    path = path or Config.QUICK_REPLY_RULES_PATH
+    if path:
+        return QuickReplyEngine.from_file(path)
+    return QuickReplyEngine()
+
+
+# Compiled once at import
+quick_reply_engine = create_quick_reply_engine()
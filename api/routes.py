@@ -1,16 +1,35 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify, stream_with_context
 from utils.auth import require_api_key
+from utils.latency import endpoint_latency, track_latency
+from utils.keys import key_registry
+from utils.log import logging_stats
+from utils.metrics import metrics
+from utils.profiling import SORT_KEYS, collapsed_stacks, pstats_text, request_profiler
+from utils.rate_limit import rate_limiter
+from config import Config
+from models import json_default
+from .engagement import Engagement, EngagementScheduler, SchedulerFull
+from .events import TERMINAL_STATUSES, conversation_events
 from datetime import datetime
+import json
+import queue
 import uuid
 
 api_bp = Blueprint('api', __name__)
+request_profiler.init_blueprint(api_bp, exclude=('list_profiles', 'get_profile', 'stream_conversation'))
 
 # Lazy-load heavy dependencies only when needed
 _detector = None
 _extractor = None
-_persona = None
+_persona_registry = None
 _conversation_store = None
 _mock_scammer_api = None
+_verdict_cache = None
+_campaign_clusterer = None
+_scam_classifier = None
+_scheduler = None
+_quick_reply_engine = None
+_reply_bodies = {}
 
 def get_detector():
     global _detector
@@ -26,20 +45,54 @@ def get_extractor():
         _extractor = IntelligenceExtractor()
     return _extractor
 
-def get_persona():
-    global _persona
-    if _persona is None:
-        from personas.ramesh import RameshPersona
-        _persona = RameshPersona()
-    return _persona
+def get_persona_registry():
+    global _persona_registry
+    if _persona_registry is None:
+        from personas import persona_registry
+        _persona_registry = persona_registry
+    return _persona_registry
 
 def get_conversation_store():
     global _conversation_store
     if _conversation_store is None:
-        from storage.memory_store import conversation_store
+        from storage import conversation_store
         _conversation_store = conversation_store
     return _conversation_store
 
+def get_verdict_cache():
+    global _verdict_cache
+    if _verdict_cache is None:
+        from detection.cache import verdict_cache
+        _verdict_cache = verdict_cache
+    return _verdict_cache
+
+def get_campaign_clusterer():
+    global _campaign_clusterer
+    if _campaign_clusterer is None:
+        from detection.campaigns import campaign_clusterer
+        _campaign_clusterer = campaign_clusterer
+    return _campaign_clusterer
+
+def get_scam_classifier():
+    global _scam_classifier
+    if _scam_classifier is None:
+        from detection.classifier import scam_classifier
+        _scam_classifier = scam_classifier
+    return _scam_classifier
+
+def get_scheduler():
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = EngagementScheduler()
+    return _scheduler
+
+def get_quick_reply_engine():
+    global _quick_reply_engine
+    if _quick_reply_engine is None:
+        from .quick_reply import quick_reply_engine
+        _quick_reply_engine = quick_reply_engine
+    return _quick_reply_engine
+
 def get_mock_scammer():
     global _mock_scammer_api
     if _mock_scammer_api is None:
@@ -47,6 +100,19 @@ def get_mock_scammer():
         _mock_scammer_api = mock_scammer_api
     return _mock_scammer_api
 
+# Gauges read at scrape time; components not loaded yet are skipped
+metrics.gauge('conversations',
+              lambda: _conversation_store.get_stats()['total_conversations'] if _conversation_store else None,
+              shared=Config.STORE_BACKEND == 'sqlite')
+metrics.gauge('active_conversations',
+              lambda: _conversation_store.get_stats()['active_conversations'] if _conversation_store else None,
+              shared=Config.STORE_BACKEND == 'sqlite')
+metrics.gauge('verdict_cache_entries',
+              lambda: _verdict_cache.stats()['size'] if _verdict_cache else None,
+              shared=Config.VERDICT_CACHE_BACKEND == 'sqlite')
+metrics.gauge('engagement_jobs', lambda: _scheduler.stats()['running'] if _scheduler else None)
+metrics.gauge('stream_subscribers', lambda: conversation_events.stats()['subscribers'])
+
 @api_bp.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint (no auth required)"""
@@ -84,8 +150,14 @@ def test_endpoint():
 
 
 @api_bp.route('/process-message', methods=['POST', 'OPTIONS'])
+@track_latency('process_message')
 def process_message():
+    """
+    Fast-path reply for the evaluation harness
 
+    The reply comes from the precompiled rule table in api/quick_reply.py
+    (one scan per message, no LLM call); the harness expects only the reply.
+    """
     if request.method == 'OPTIONS':
         return jsonify({'status': 'ok'}), 200
 
@@ -96,61 +168,81 @@ def process_message():
         scammer_message = message_obj.get('text', '').strip()
 
         if not scammer_message:
-            return jsonify({
-                'status': 'success',
-                'reply': 'Hello! How can I help you?'
-            }), 200
-
-        msg = scammer_message.lower()
-
-        # Simple scam detection
-        scam_keywords = [
-            'blocked', 'verify', 'urgent', 'account',
-            'bank', 'otp', 'prize', 'lottery',
-            'upi', 'paytm', 'payment', 'money'
-        ]
-
-        is_scam = any(k in msg for k in scam_keywords)
-        scam_type = "banking" if is_scam else "unknown"
-
-        # Persona replies
-        if 'blocked' in msg or 'suspended' in msg:
-            reply = "Oh no! My account blocked? But sir, I not do anything wrong."
-        elif 'verify' in msg:
-            reply = "Verify again? But I already did KYC."
-        elif 'bank' in msg:
-            reply = "Which bank sir? I have SBI only."
-        elif 'prize' in msg or 'lottery' in msg:
-            reply = "Really? I won? I not remember applying."
-        elif 'upi' in msg or 'paytm' in msg:
-            reply = "UPI I not know properly. My son handles phone."
-        elif 'urgent' in msg:
-            reply = "So urgent? I am busy now."
-        elif 'link' in msg:
-            reply = "Link? Please explain slowly."
-        elif 'call' in msg:
-            reply = "Is this official number sir?"
-        elif 'pay' in msg or 'money' in msg:
-            reply = "Why I need to pay money?"
-        else:
-            reply = "Sir, please explain again."
-
-        # ✅ FIXED: Return ONLY what hackathon expects
-        return jsonify({
-            'status': 'success',
-            'reply': reply
-        }), 200
+            return _reply_response('Hello! How can I help you?')
 
-    except Exception as e:
+        _, reply = get_quick_reply_engine().respond(scammer_message)
+        return _reply_response(reply)
+
+    except Exception:
         # Even in errors, return the expected format
+        return _reply_response('Sorry sir, please tell me again.')
+
+def _reply_response(reply):
+    """process-message response; replies come from a fixed table, so bodies are encoded once"""
+    body = _reply_bodies.get(reply)
+    if body is None:
+        body = _reply_bodies[reply] = jsonify({'status': 'success', 'reply': reply}).get_data()
+    return Response(body, status=200, mimetype='application/json')
+
+
+@api_bp.route('/detect-batch', methods=['POST'])
+@require_api_key
+def detect_batch():
+    """
+    Batch scam detection endpoint
+
+    Request Body:
+        {
+            "messages": ["message 1", "message 2", ...],
+            "max_concurrency": 8 (optional, parallel LLM calls)
+        }
+
+    Response:
+        {
+            "status": "success",
+            "results": [{...detection...}, ...],  (same order as input)
+            "total": 2
+        }
+    """
+    detector = get_detector()
+
+    data = request.get_json(silent=True) or {}
+    messages = data.get('messages')
+
+    if not isinstance(messages, list) or not all(isinstance(m, str) for m in messages):
         return jsonify({
-            'status': 'success',
-            'reply': 'Sorry sir, please tell me again.'
-        }), 200
+            'error': 'Invalid request',
+            'message': 'Request body must include "messages" as a list of strings'
+        }), 400
+
+    if len(messages) > Config.DETECT_BATCH_MAX_MESSAGES:
+        return jsonify({
+            'error': 'Batch too large',
+            'message': f'At most {Config.DETECT_BATCH_MAX_MESSAGES} messages per request'
+        }), 413
+
+    max_concurrency = data.get('max_concurrency')
+    if max_concurrency is not None:
+        if not isinstance(max_concurrency, int) or max_concurrency < 1:
+            return jsonify({
+                'error': 'Invalid request',
+                'message': '"max_concurrency" must be a positive integer'
+            }), 400
+        # Never exceed the server-wide LLM fan-out limit
+        max_concurrency = min(max_concurrency, Config.DETECT_BATCH_CONCURRENCY)
+
+    results = detector.detect_batch(messages, max_concurrency=max_concurrency)
+
+    return jsonify({
+        'status': 'success',
+        'results': results,
+        'total': len(results)
+    })
 
 
 @api_bp.route('/autonomous-engage', methods=['POST'])
-@require_api_key
+@require_api_key(cost=Config.RATE_LIMIT_ENGAGE_COST)
+@track_latency('autonomous_engage')
 def autonomous_engage():
     """
     Autonomous engagement endpoint - AI handles full conversation
@@ -158,7 +250,8 @@ def autonomous_engage():
     Request Body:
         {
             "initial_message": "Scam message",
-            "max_turns": 5 (default)
+            "max_turns": 5 (default),
+            "background": false (default)
         }
 
     Response:
@@ -169,11 +262,15 @@ def autonomous_engage():
             "extracted_intel": {...},
             "summary": "..."
         }
+
+    With "background": true the engagement is handed to the scheduler and
+    the response (202) only carries the conversation_id; poll
+    /api/conversation/<id> for progress.
     """
     # Lazy-load heavy dependencies
     detector = get_detector()
     extractor = get_extractor()
-    persona = get_persona()
+    personas = get_persona_registry()
     conversation_store = get_conversation_store()
     mock_scammer_api = get_mock_scammer()
 
@@ -189,8 +286,15 @@ def autonomous_engage():
     max_turns = data.get('max_turns', 5)
     conv_id = f'conv_{uuid.uuid4().hex[:8]}'
 
+    if data.get('background'):
+        return _engage_in_background(
+            Engagement(conv_id, initial_message, max_turns, None, extractor,
+                       conversation_store, mock_scammer_api, detector=detector,
+                       personas=personas, events=conversation_events)
+        )
+
     # Step 1: Detect scam
-    detection = detector.detect(initial_message)
+    detection = detector.assign_campaign(initial_message, detector.detect(initial_message))
 
     if not detection['is_scam']:
         return jsonify({
@@ -198,41 +302,27 @@ def autonomous_engage():
             'message': 'Message does not appear to be a scam'
         })
 
-    # Step 2: Create conversation
-    conversation = conversation_store.create(conv_id)
-    conversation['scam_type'] = detection['scam_type']
+    # Step 2: Create conversation, routed to the persona for this scam type
+    persona_name = personas.name_for(detection['scam_type'])
+    persona = personas.get(persona_name)
+    conversation_store.create(conv_id)
+    conversation_store.update(conv_id, scam_type=detection['scam_type'], persona=persona_name,
+                              campaign_id=detection.get('campaign_id'))
 
     # Step 3: Autonomous engagement loop
-    current_scammer_msg = initial_message
-
-    for turn in range(max_turns):
-        # Agent responds
-        agent_response = persona.generate_response(current_scammer_msg, conversation)
-        conversation_store.add_turn(conv_id, current_scammer_msg, agent_response)
+    engagement = Engagement(conv_id, initial_message, max_turns, persona, extractor,
+                            conversation_store, mock_scammer_api, events=conversation_events)
+    while engagement.step():
+        pass
 
-        # Get scammer's next message
-        scammer_response = mock_scammer_api.send_message(conv_id, agent_response)
-        current_scammer_msg = scammer_response.get('message')
-
-        if not current_scammer_msg:
-            break
-
-        # Check if we've extracted enough intelligence
-        intel = extractor.extract(conversation)
-        if len(intel.get('upi_ids', [])) > 0 or len(intel.get('bank_accounts', [])) > 0:
-            # Got what we need, can stop early
-            if turn >= 2:  # At least 3 turns
-                break
-
-    # Final intelligence extraction
-    final_intel = extractor.extract(conversation)
-    conversation['extracted_intel'] = final_intel
-    conversation['status'] = 'completed'
+    final_intel = engagement.finish()
+    conversation = conversation_store.get(conv_id)
 
     return jsonify({
         'status': 'success',
         'conversation_id': conv_id,
         'detection': detection,
+        'persona': persona_name,
         'full_conversation': conversation['history'],
         'extracted_intel': final_intel,
         'total_turns': len(conversation['history']),
@@ -240,15 +330,93 @@ def autonomous_engage():
                   f"Extracted {sum(len(v) for v in final_intel.values())} pieces of intelligence."
     })
 
+def _engage_in_background(engagement):
+    """Queue an engagement on the scheduler and return its conversation_id"""
+    scheduler = get_scheduler()
+    conversation_store = get_conversation_store()
+    conversation_store.create(engagement.conv_id)
+    conversation_store.update(engagement.conv_id, status='queued')
+
+    try:
+        scheduler.submit(engagement)
+    except SchedulerFull as e:
+        conversation_store.update(engagement.conv_id, status='failed', error=str(e))
+        return jsonify({
+            'error': 'Too many engagements',
+            'message': str(e)
+        }), 503
+
+    return jsonify({
+        'status': 'queued',
+        'conversation_id': engagement.conv_id,
+        'poll_url': f'/api/conversation/{engagement.conv_id}'
+    }), 202
+
 @api_bp.route('/conversations', methods=['GET'])
 @require_api_key
 def get_conversations():
-    """Get all conversations"""
+    """
+    List conversations, paginated and filterable
+
+    Query parameters (all optional):
+        limit      page size (default 100, max 500)
+        cursor     next_cursor from the previous page
+        status     exact match, e.g. completed
+        scam_type  exact match, e.g. lottery
+        since      ISO timestamp, created_at >= since
+        until      ISO timestamp, created_at < until
+        fields     comma-separated projection, e.g. id,status,scam_type
+        format     json (default) or ndjson to stream every match
+    """
     conversation_store = get_conversation_store()
+    args = request.args
+
+    try:
+        limit = int(args.get('limit', 100))
+    except ValueError:
+        limit = 0
+    if not 1 <= limit <= 500:
+        return jsonify({
+            'error': 'Invalid request',
+            'message': '"limit" must be an integer between 1 and 500'
+        }), 400
+
+    cursor = args.get('cursor')
+    if cursor is not None and not cursor.isdigit():
+        return jsonify({
+            'error': 'Invalid request',
+            'message': '"cursor" must be a next_cursor value from a previous page'
+        }), 400
+
+    fields = [f for f in args.get('fields', '').split(',') if f]
+    filters = {
+        'status': args.get('status'),
+        'scam_type': args.get('scam_type'),
+        'since': args.get('since'),
+        'until': args.get('until'),
+        'after': cursor,
+        'include_history': not fields or 'history' in fields
+    }
+
+    def project(conversation):
+        if not fields:
+            return conversation
+        return {k: conversation[k] for k in ['id', *fields] if k in conversation}
+
+    if args.get('format') == 'ndjson':
+        def generate():
+            for _, conversation in conversation_store.iter_conversations(**filters):
+                yield json.dumps(project(conversation), default=json_default) + '\n'
+        return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+    conversations, next_cursor = conversation_store.list_conversations(limit, **filters)
+
     return jsonify({
         'status': 'success',
-        'conversations': conversation_store.get_all(),
-        'total': len(conversation_store.get_all())
+        'conversations': [project(c) for c in conversations],
+        'count': len(conversations),
+        'next_cursor': next_cursor,
+        'total': conversation_store.get_stats()['total_conversations']
     })
 
 @api_bp.route('/conversation/<conv_id>', methods=['GET'])
@@ -269,37 +437,209 @@ def get_conversation(conv_id):
         'conversation': conversation
     })
 
-@api_bp.route('/stats', methods=['GET'])
+@api_bp.route('/conversation/<conv_id>/stream', methods=['GET'])
 @require_api_key
-def get_stats():
-    """Get statistics"""
+def stream_conversation(conv_id):
+    """
+    Live conversation events as Server-Sent Events
+
+    Starts with a "snapshot" event (the stored conversation), then pushes
+    "status", "message" (scammer message), "token" (persona reply deltas),
+    "turn" (completed turn) and finally "done". Comment lines are sent as
+    heartbeats while the engagement is idle.
+    """
     conversation_store = get_conversation_store()
-    stats = conversation_store.get_stats()
 
-    # Calculate additional stats
-    all_convs = conversation_store.get_all()
+    # Subscribe before reading the snapshot so no event falls in between
+    subscriber = conversation_events.subscribe(conv_id)
+    conversation = conversation_store.get(conv_id)
+
+    if not conversation:
+        conversation_events.unsubscribe(conv_id, subscriber)
+        return jsonify({
+            'error': 'Not found',
+            'message': f'Conversation {conv_id} not found'
+        }), 404
+
+    def generate():
+        try:
+            yield _sse('snapshot', conversation)
+            if conversation['status'] in TERMINAL_STATUSES:
+                yield _sse('done', {'status': conversation['status']})
+                return
+
+            while True:
+                try:
+                    event, data = subscriber.get(timeout=Config.SSE_HEARTBEAT)
+                except queue.Empty:
+                    # The engagement may be running in another process
+                    status = conversation_store.get(conv_id)['status']
+                    if status in TERMINAL_STATUSES:
+                        yield _sse('done', {'status': status})
+                        return
+                    yield ': keep-alive\n\n'
+                    continue
+
+                yield _sse(event, data)
+                if event == 'done':
+                    return
+        finally:
+            conversation_events.unsubscribe(conv_id, subscriber)
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+def _sse(event, data):
+    return f'event: {event}\ndata: {json.dumps(data, default=_sse_default)}\n\n'
+
+def _sse_default(value):
+    try:
+        return json_default(value)
+    except TypeError:
+        return str(value)
+
+def _int_arg(args, name, default, maximum):
+    """Integer query parameter in 1..maximum, or None if invalid"""
+    try:
+        value = int(args.get(name, default))
+    except ValueError:
+        return None
+    return value if 1 <= value <= maximum else None
+
+@api_bp.route('/intel/lookup', methods=['GET'])
+@require_api_key
+def lookup_intel():
+    """
+    Conversations that mentioned an entity (UPI ID, phone, account, URL, ...)
+
+    Query parameters:
+        value  the entity; normalized the same way as stored intel
+        kind   optional, e.g. upi_ids or phone_numbers (default: any kind)
+        limit  conversation ids per match, most recent first (default 100, max 1000)
+    """
+    conversation_store = get_conversation_store()
+    args = request.args
+    value = args.get('value', '').strip()
+    kind = args.get('kind') or None
+    limit = _int_arg(args, 'limit', 100, 1000)
+
+    if not value or limit is None:
+        return jsonify({
+            'error': 'Invalid request',
+            'message': '"value" is required and "limit" must be an integer between 1 and 1000'
+        }), 400
+
+    matches = conversation_store.lookup_entity(value, kind=kind, limit=limit)
+    return jsonify({
+        'status': 'success',
+        'value': value,
+        'matches': matches,
+        'count': len(matches)
+    })
 
-    total_intel = 0
-    scam_types = {}
+@api_bp.route('/intel/top', methods=['GET'])
+@require_api_key
+def top_intel():
+    """
+    Entities seen in the most conversations
 
-    for conv in all_convs:
-        intel = conv.get('extracted_intel', {})
-        total_intel += sum(len(v) for v in intel.values())
+    Query parameters:
+        kind   optional, e.g. upi_ids (default: every kind)
+        limit  number of entities (default 20, max 500)
+    """
+    conversation_store = get_conversation_store()
+    limit = _int_arg(request.args, 'limit', 20, 500)
 
-        scam_type = conv.get('scam_type', 'unknown')
-        scam_types[scam_type] = scam_types.get(scam_type, 0) + 1
+    if limit is None:
+        return jsonify({
+            'error': 'Invalid request',
+            'message': '"limit" must be an integer between 1 and 500'
+        }), 400
 
-    # Calculate average turns
-    total_turns = sum(len(c.get('history', [])) for c in all_convs)
-    avg_turns = total_turns / max(len(all_convs), 1)
+    entities = conversation_store.top_entities(limit, kind=request.args.get('kind') or None)
+    return jsonify({
+        'status': 'success',
+        'entities': entities,
+        'count': len(entities)
+    })
+
+@api_bp.route('/stats', methods=['GET'])
+@require_api_key
+def get_stats():
+    """Get statistics (running aggregates, constant time)"""
+    conversation_store = get_conversation_store()
+    stats = conversation_store.get_stats()
+    verdict_cache = get_verdict_cache()
+    campaign_clusterer = get_campaign_clusterer()
+    scam_classifier = get_scam_classifier()
 
     return jsonify({
         'status': 'success',
         'stats': {
             **stats,
-            'total_intel_items': total_intel,
-            'scam_types_breakdown': scam_types,
-            'avg_turns_per_conversation': avg_turns
+            'retention': conversation_store.retention_stats(),
+            'verdict_cache': verdict_cache.stats() if verdict_cache else None,
+            'engagements': _scheduler.stats() if _scheduler else None,
+            'streams': conversation_events.stats(),
+            'latency': endpoint_latency.snapshot(),
+            'logging': logging_stats(),
+            'api_keys': key_registry.stats(),
+            'rate_limit': rate_limiter.stats() if rate_limiter else None,
+            'personas': _persona_registry.get_metrics() if _persona_registry else None,
+            'campaigns': campaign_clusterer.stats() if campaign_clusterer else None,
+            'classifier': scam_classifier.stats() if scam_classifier else None,
+            'profiling': request_profiler.stats()
         }
     })
 
+@api_bp.route('/metrics', methods=['GET'])
+@require_api_key
+def get_metrics():
+    """Stage timings, LLM counters and gauges in Prometheus text format"""
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+@api_bp.route('/profiles', methods=['GET'])
+@require_api_key
+def list_profiles():
+    """Recent request profiles held by this process, newest first"""
+    profiles = request_profiler.list()
+    return jsonify({'status': 'success', 'profiles': profiles, 'count': len(profiles)})
+
+@api_bp.route('/profiles/<int:profile_id>', methods=['GET'])
+@require_api_key
+def get_profile(profile_id):
+    """
+    One profile
+
+    Query: format=collapsed (stack samples, for flame graphs),
+    format=text (cProfile table, ?sort=cumulative|tottime|calls|...) or
+    format=pstats (cProfile binary for pstats/snakeviz).
+    """
+    profile = request_profiler.get(profile_id)
+    if profile is None:
+        return jsonify({'error': 'Profile not found'}), 404
+
+    default = 'collapsed' if profile['mode'] == 'sample' else 'text'
+    fmt = request.args.get('format', default)
+    if profile['mode'] == 'sample' and fmt == 'collapsed':
+        return Response(collapsed_stacks(profile), mimetype='text/plain')
+    if profile['mode'] == 'cprofile' and fmt == 'text':
+        sort = request.args.get('sort', 'cumulative')
+        if sort not in SORT_KEYS:
+            return jsonify({
+                'error': 'Unsupported sort',
+                'message': f"sort must be one of: {', '.join(sorted(SORT_KEYS))}"
+            }), 400
+        return Response(pstats_text(profile, sort), mimetype='text/plain')
+    if profile['mode'] == 'cprofile' and fmt == 'pstats':
+        return Response(profile['data'], mimetype='application/octet-stream', headers={
+            'Content-Disposition': f'attachment; filename=profile_{profile_id}.pstats'
+        })
+    return jsonify({
+        'error': 'Unsupported format',
+        'message': f"{profile['mode']} profiles support: "
+                   f"{'collapsed' if profile['mode'] == 'sample' else 'text, pstats'}"
+    }), 400
@@ -1,25 +1,40 @@
 from flask import Flask, render_template, request, jsonify
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
 from dotenv import load_dotenv
 import os
 
 from api.routes import api_bp
-from storage.memory_store import ConversationStore
+from config import Config
+from models import json_default
+from utils.log import setup_logging
 
 # Load environment variables
 load_dotenv()
 
+# Structured logging through a background writer thread
+setup_logging()
+Config.log_startup()
+
+class ModelJSONProvider(DefaultJSONProvider):
+    """jsonify that serialises stored models (models/) to their API shape"""
+
+    @staticmethod
+    def default(o):
+        try:
+            return json_default(o)
+        except TypeError:
+            return DefaultJSONProvider.default(o)
+
 # Initialize Flask app
 app = Flask(__name__)
+app.json = ModelJSONProvider(app)
 app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'dev-secret-key')
 CORS(app)
 
 # Register blueprints
 app.register_blueprint(api_bp, url_prefix='/api')
 
-# Initialize storage
-conversation_store = ConversationStore()
-
 @app.route('/')
 def index():
     """Main dashboard"""
@@ -1,3 +1,4 @@
+import logging
 import os
 from dotenv import load_dotenv
 
@@ -18,22 +19,116 @@ class Config:
     GROQ_API_KEY = os.getenv('GROQ_API_KEY')
     GROQ_MODEL = os.getenv('GROQ_MODEL', 'llama-3.3-70b-versatile')
     
-    # Startup check for Groq Key
-    if not GROQ_API_KEY:
-        print("❌ ERROR: GROQ_API_KEY is not set in environment variables!")
-    else:
-        # Prints first 10 characters to verify key loading without exposing it
-        print(f"✅ GROQ_API_KEY loaded successfully: {GROQ_API_KEY[:10]}...")
-
     # API Security (For X-API-Key header)
     API_KEY = os.getenv('API_KEY', 'scam-honeypot-secret-key-12345')
     
+    # API key registry (hashed keys; the env API_KEY is always accepted as client "default")
+    API_KEYS_BACKEND = os.getenv('API_KEYS_BACKEND', 'file')          # file (JSON) or sqlite
+    API_KEYS_PATH = os.getenv('API_KEYS_PATH', '')                    # Unset: only the env API_KEY
+    API_KEY_CACHE_SIZE = int(os.getenv('API_KEY_CACHE_SIZE', 10000))  # Verified key hashes kept in process
+    API_KEY_CACHE_TTL = float(os.getenv('API_KEY_CACHE_TTL', 60))     # Seconds until a revocation applies
+    
+    # Per-key token-bucket rate limits
+    RATE_LIMIT_BACKEND = os.getenv('RATE_LIMIT_BACKEND', 'none')      # none (off), sqlite (shared by workers) or memory
+    RATE_LIMIT_PATH = os.getenv('RATE_LIMIT_PATH', 'rate_limits.db')
+    RATE_LIMIT_PER_MINUTE = float(os.getenv('RATE_LIMIT_PER_MINUTE', 120))  # Default refill rate per key
+    RATE_LIMIT_BURST = float(os.getenv('RATE_LIMIT_BURST', 30))             # Default bucket size per key
+    RATE_LIMIT_ENGAGE_COST = int(os.getenv('RATE_LIMIT_ENGAGE_COST', 10))   # Tokens per autonomous engagement
+    
     # Mock Scammer API (Optional integrations)
     MOCK_SCAMMER_API_URL = os.getenv('MOCK_SCAMMER_API_URL')
     MOCK_SCAMMER_API_KEY = os.getenv('MOCK_SCAMMER_API_KEY')
+    MOCK_SCAMMER_MAX_CONNECTIONS = int(os.getenv('MOCK_SCAMMER_MAX_CONNECTIONS', 32))  # Pooled keep-alive connections
+    MOCK_SCAMMER_TIMEOUT = float(os.getenv('MOCK_SCAMMER_TIMEOUT', 10))                # Seconds per scammer reply
+    SCAMMER_CORPUS_PATH = os.getenv('SCAMMER_CORPUS_PATH', '')                    # Unset: simulator/corpus.json
     
     # Application Logic & AI Parameters
     MAX_CONVERSATION_TURNS = 10
     RESPONSE_TIMEOUT = 30  # Seconds before giving up on an AI response
     MAX_TOKENS = 500       # Increased from 200 for more natural dialogue
     TEMPERATURE = 0.7      # Balanced between creative and predictable
+    
+    # Logging (records go through a queue to a background writer thread)
+    LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
+    LOG_FORMAT = os.getenv('LOG_FORMAT', 'json')                    # json or text
+    LOG_SAMPLE_RATE = float(os.getenv('LOG_SAMPLE_RATE', 1.0))      # Fraction of DEBUG/INFO records kept
+    LOG_QUEUE_SIZE = int(os.getenv('LOG_QUEUE_SIZE', 10000))        # Records beyond this are dropped
+    
+    # LLM Gateway
+    LLM_BACKEND = os.getenv('LLM_BACKEND', 'groq')  # groq, or stub for offline runs
+    LLM_MAX_CONCURRENCY = int(os.getenv('LLM_MAX_CONCURRENCY', 16))  # In-flight calls per worker
+    LLM_MAX_RETRIES = int(os.getenv('LLM_MAX_RETRIES', 2))           # Retries on 429/5xx/connection errors
+    LLM_BACKOFF_BASE = float(os.getenv('LLM_BACKOFF_BASE', 0.5))     # Seconds, doubled per attempt
+    LLM_BACKOFF_MAX = float(os.getenv('LLM_BACKOFF_MAX', 8))
+    LLM_STUB_LATENCY = float(os.getenv('LLM_STUB_LATENCY', 0))       # Simulated seconds per stub call
+    
+    # Conversation Storage
+    STORE_BACKEND = os.getenv('STORE_BACKEND', 'memory')  # memory (per process) or sqlite (shared)
+    STORE_PATH = os.getenv('STORE_PATH', 'conversations.db')
+    STORE_ARCHIVE_DIR = os.getenv('STORE_ARCHIVE_DIR', '')                      # Memory store: evict finished conversations here (unset keeps all in memory)
+    STORE_ARCHIVE_COMPRESSION = os.getenv('STORE_ARCHIVE_COMPRESSION', 'gzip')  # gzip, or zstd (needs zstandard)
+    STORE_ARCHIVE_BLOCK_RECORDS = int(os.getenv('STORE_ARCHIVE_BLOCK_RECORDS', 64))  # Conversations per compressed block (one is decompressed per read)
+    STORE_ARCHIVE_SEGMENT_MB = int(os.getenv('STORE_ARCHIVE_SEGMENT_MB', 64))     # Start a new segment file past this size
+    STORE_IDLE_TTL = float(os.getenv('STORE_IDLE_TTL', 600))                    # Seconds a finished conversation stays resident
+    STORE_MAX_RESIDENT = int(os.getenv('STORE_MAX_RESIDENT', 10000))            # Evict finished conversations beyond this many
+    STORE_SWEEP_INTERVAL = float(os.getenv('STORE_SWEEP_INTERVAL', 30))         # Seconds between background eviction sweeps
+    
+    # /api/process-message rule table (JSON file; built-in table when unset)
+    QUICK_REPLY_RULES_PATH = os.getenv('QUICK_REPLY_RULES_PATH', '')
+    
+    # Live conversation streaming (SSE)
+    SSE_HEARTBEAT = float(os.getenv('SSE_HEARTBEAT', 15))  # Seconds between keep-alive comments
+    
+    # Personas
+    DEFAULT_PERSONA = os.getenv('DEFAULT_PERSONA', 'ramesh')                              # Persona for unrouted scam types
+    PERSONA_HISTORY_TOKEN_BUDGET = int(os.getenv('PERSONA_HISTORY_TOKEN_BUDGET', 1200))  # Estimated tokens of past turns per prompt
+    PERSONA_METRICS_WINDOW = int(os.getenv('PERSONA_METRICS_WINDOW', 1000))              # Recent per-call records kept
+    
+    # Background Engagement Scheduler
+    ENGAGEMENT_WORKERS = int(os.getenv('ENGAGEMENT_WORKERS', 32))      # Threads per process; caps engagement steps in flight
+    ENGAGEMENT_MAX_JOBS = int(os.getenv('ENGAGEMENT_MAX_JOBS', 1000))  # Queued + running engagements
+    
+    # Batch Detection
+    DETECT_BATCH_MAX_MESSAGES = int(os.getenv('DETECT_BATCH_MAX_MESSAGES', 50000))
+    DETECT_BATCH_CONCURRENCY = int(os.getenv('DETECT_BATCH_CONCURRENCY', 8))  # Parallel LLM calls per batch
+    
+    # LLM Verdict Cache (keyed on normalized message fingerprint)
+    VERDICT_CACHE_BACKEND = os.getenv('VERDICT_CACHE_BACKEND', 'memory')  # memory, sqlite or none
+    VERDICT_CACHE_SIZE = int(os.getenv('VERDICT_CACHE_SIZE', 10000))
+    VERDICT_CACHE_TTL = int(os.getenv('VERDICT_CACHE_TTL', 6 * 60 * 60))  # Seconds
+    VERDICT_CACHE_PATH = os.getenv('VERDICT_CACHE_PATH', 'verdict_cache.db')
+    
+    # Scam campaign clustering (MinHash/LSH, per process)
+    CAMPAIGN_CLUSTERING = os.getenv('CAMPAIGN_CLUSTERING', 'true').lower() == 'true'
+    CAMPAIGN_LSH_BANDS = int(os.getenv('CAMPAIGN_LSH_BANDS', 32))              # Divides the 64 MinHash values
+    CAMPAIGN_SIMILARITY = float(os.getenv('CAMPAIGN_SIMILARITY', 0.5))         # Estimated Jaccard to join a campaign
+    CAMPAIGN_REUSE_SIMILARITY = float(os.getenv('CAMPAIGN_REUSE_SIMILARITY', 0.8))  # Reuse a campaign's verdict instead of the LLM (1.1 disables)
+    CAMPAIGN_MAX = int(os.getenv('CAMPAIGN_MAX', 20000))                       # Least recently seen dropped beyond this
+    CAMPAIGN_MAX_EXEMPLARS = int(os.getenv('CAMPAIGN_MAX_EXEMPLARS', 4))       # Signatures indexed per campaign
+    CAMPAIGN_EXACT_CACHE_SIZE = int(os.getenv('CAMPAIGN_EXACT_CACHE_SIZE', 50000))  # Normalized-message fingerprints remembered
+    CAMPAIGN_STATS_TOP = int(os.getenv('CAMPAIGN_STATS_TOP', 20))              # Campaigns listed in /api/stats
+    
+    # Local scam classifier (hashed n-grams + logistic regression; scripts/train_classifier.py)
+    CLASSIFIER_MODEL_PATH = os.getenv('CLASSIFIER_MODEL_PATH', 'scam_classifier.bin')  # Missing file or '': every borderline message goes to the LLM
+    CLASSIFIER_SAFE_BELOW = float(os.getenv('CLASSIFIER_SAFE_BELOW', 0.05))    # Scam probability at or below: not a scam, no LLM call
+    CLASSIFIER_SCAM_ABOVE = float(os.getenv('CLASSIFIER_SCAM_ABOVE', 0.9))     # At or above: scam, no LLM call; in between: ask the LLM
+    
+    # Metrics (/api/metrics, Prometheus text format)
+    METRICS_DIR = os.getenv('METRICS_DIR', '')                                    # Shared dir merges gunicorn workers; unset: this process only
+    METRICS_FLUSH_INTERVAL = float(os.getenv('METRICS_FLUSH_INTERVAL', 5))        # Seconds between per-process writes
+    
+    # Request profiling (/api/profiles)
+    PROFILE_SAMPLE_RATE = float(os.getenv('PROFILE_SAMPLE_RATE', 0))                       # Fraction of API requests profiled; 0: header only
+    PROFILE_HEADER_ENABLED = os.getenv('PROFILE_HEADER_ENABLED', 'true').lower() == 'true'  # Honour X-Profile from keyed callers
+    PROFILE_MODE = os.getenv('PROFILE_MODE', 'sample')                                     # sample (stack sampling) or cprofile
+    PROFILE_MAX_PROFILES = int(os.getenv('PROFILE_MAX_PROFILES', 50))                      # Ring buffer size per process
+    PROFILE_SAMPLE_INTERVAL_MS = float(os.getenv('PROFILE_SAMPLE_INTERVAL_MS', 5))         # Stack sampling period
+    
+    @classmethod
+    def log_startup(cls):
+        """Startup check for the Groq key (never logs any part of it)"""
+        logger = logging.getLogger(__name__)
+        if not cls.GROQ_API_KEY:
+            logger.error("GROQ_API_KEY is not set in environment variables")
+        else:
+            logger.info("GROQ_API_KEY loaded", extra={'llm_backend': cls.LLM_BACKEND})
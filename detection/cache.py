@@ -0,0 +1,234 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from config import Config
+
+# Campaign templates differ only in names, amounts, handles and links, so
+# these are masked before fingerprinting a message.
+_URL_RE = re.compile(r'(?:https?://|www\.)\S+', re.IGNORECASE)
+_HANDLE_RE = re.compile(r'[\w.\-]+@[\w.\-]+')
+_DIGITS_RE = re.compile(r'\d+')
+
+
+def normalize_message(message):
+    """Normalize a message so template variants collapse to the same text"""
+    text = message.lower()
+    text = _URL_RE.sub('<url>', text)
+    text = _HANDLE_RE.sub('<upi>', text)
+    text = _DIGITS_RE.sub('#', text)
+    return ' '.join(text.split())
+
+
+def message_fingerprint(message):
+    """Stable cache key for a message"""
+    return text_fingerprint(normalize_message(message))
+
+
+def text_fingerprint(normalized):
+    """message_fingerprint of text that is already normalized"""
+    return hashlib.blake2b(normalized.encode('utf-8'), digest_size=16).hexdigest()
+
+
+class VerdictCache:
+    """Base class for LLM verdict caches.
+
+    Backends implement ``_get``/``_set``/``_size``; counters are kept here.
+    Values are plain JSON-serializable dicts.
+    """
+
+    def __init__(self, max_size, ttl):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Return the cached verdict for key, or None"""
+        value = self._get(key)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def set(self, key, value):
+        """Store a verdict"""
+        self._set(key, value)
+
+    def stats(self):
+        """Counters for /api/stats"""
+        lookups = self.hits + self.misses
+        return {
+            'backend': self.backend,
+            'size': self._size(),
+            'max_size': self.max_size,
+            'ttl_seconds': self.ttl,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+    def _get(self, key):
+        raise NotImplementedError
+
+    def _set(self, key, value):
+        raise NotImplementedError
+
+    def _size(self):
+        raise NotImplementedError
+
+
+class MemoryVerdictCache(VerdictCache):
+    """Process-local LRU cache with per-entry TTL"""
+
+    backend = 'memory'
+
+    def __init__(self, max_size, ttl):
+        super().__init__(max_size, ttl)
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+
+    def _get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] < time.time():
+                del self._entries[key]
+                self.expirations += 1
+                return None
+            self._entries.move_to_end(key)
+            return dict(entry[1])
+
+    def _set(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.time() + self.ttl, dict(value))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def _size(self):
+        return len(self._entries)
+
+
+class SQLiteVerdictCache(VerdictCache):
+    """On-disk LRU cache shared by every worker that points at the same file.
+
+    Hit/miss/eviction counters are per process. Hits refresh ``last_used``
+    at most once per ``TOUCH_INTERVAL`` seconds, and each process prunes to
+    ``max_size`` every ``prune_every`` inserts, so the table can briefly
+    overshoot by that many rows per worker. The reported size is the row
+    count from the last prune plus this process's inserts since, so stats
+    never scan the table.
+    """
+
+    backend = 'sqlite'
+    TOUCH_INTERVAL = 60  # Seconds; LRU order only needs to be approximate
+
+    def __init__(self, max_size, ttl, path):
+        super().__init__(max_size, ttl)
+        self.path = path
+        self.prune_every = max(1, min(100, max_size // 10))
+        self._inserts = 0
+        self._local = threading.local()
+        conn = self._conn()
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS verdicts ('
+            'key TEXT PRIMARY KEY, value TEXT NOT NULL, '
+            'expires_at REAL NOT NULL, last_used REAL NOT NULL)'
+        )
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_verdicts_last_used ON verdicts(last_used)')
+        conn.commit()
+        self._count = conn.execute('SELECT COUNT(*) FROM verdicts').fetchone()[0]
+
+    def _conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _get(self, key):
+        conn = self._conn()
+        now = time.time()
+        row = conn.execute(
+            'SELECT value, expires_at, last_used FROM verdicts WHERE key = ?', (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        if row[1] < now:
+            with conn:
+                deleted = conn.execute('DELETE FROM verdicts WHERE key = ?', (key,)).rowcount
+            with self._lock:
+                self.expirations += 1
+                self._count -= deleted
+            return None
+        if now - row[2] > self.TOUCH_INTERVAL:
+            with conn:
+                conn.execute('UPDATE verdicts SET last_used = ? WHERE key = ?', (now, key))
+        return json.loads(row[0])
+
+    def _set(self, key, value):
+        conn = self._conn()
+        now = time.time()
+        with self._lock:
+            self._inserts += 1
+            prune = self._inserts % self.prune_every == 0
+        count = overflow = None
+        with conn:
+            conn.execute(
+                'INSERT OR REPLACE INTO verdicts (key, value, expires_at, last_used) '
+                'VALUES (?, ?, ?, ?)',
+                (key, json.dumps(value), now + self.ttl, now)
+            )
+            if prune:
+                count = conn.execute('SELECT COUNT(*) FROM verdicts').fetchone()[0]
+                overflow = max(count - self.max_size, 0)
+            if overflow:
+                conn.execute(
+                    'DELETE FROM verdicts WHERE key IN '
+                    '(SELECT key FROM verdicts ORDER BY last_used LIMIT ?)',
+                    (overflow,)
+                )
+        with self._lock:
+            if count is None:
+                self._count += 1
+            else:
+                self._count = count - overflow
+                self.evictions += overflow
+
+    def _size(self):
+        return self._count
+
+
+def create_verdict_cache(backend=None):
+    """Build the verdict cache configured in Config (None when disabled)"""
+    backend = backend or Config.VERDICT_CACHE_BACKEND
+    if backend == 'memory':
+        return MemoryVerdictCache(Config.VERDICT_CACHE_SIZE, Config.VERDICT_CACHE_TTL)
+    if backend == 'sqlite':
+        return SQLiteVerdictCache(
+            Config.VERDICT_CACHE_SIZE, Config.VERDICT_CACHE_TTL, Config.VERDICT_CACHE_PATH
+        )
+    if backend == 'none':
+        return None
+    raise ValueError(f'Unknown verdict cache backend: {backend}')
+
+
+# Global instance
+verdict_cache = create_verdict_cache()
@@ -0,0 +1,226 @@
+import hashlib
+import operator
+import struct
+import threading
+import time
+from collections import Counter, OrderedDict
+from datetime import datetime
+
+from config import Config
+from utils.metrics import metrics
+from utils.ranking import CountRanking
+from .cache import normalize_message, text_fingerprint
+
+# One shake_128 output per shingle gives all NUM_PERM uint32 hash values
+NUM_PERM = 64
+_UNPACK = struct.Struct(f'<{NUM_PERM}I').unpack
+
+
+def shingles(normalized, size=2):
+    """Word n-grams of a normalized message (numbers, handles and links masked)"""
+    words = normalized.split()
+    if len(words) <= size:
+        return {' '.join(words)}
+    return {' '.join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+def minhash(items):
+    """MinHash signature (NUM_PERM uint32 values) of a set of strings"""
+    rows = [_UNPACK(hashlib.shake_128(item.encode('utf-8')).digest(NUM_PERM * 4)) for item in items]
+    return tuple(map(min, zip(*rows)))
+
+
+def similarity(a, b):
+    """Estimated Jaccard similarity of two signatures"""
+    return sum(map(operator.eq, a, b)) / NUM_PERM
+
+
+class Campaign:
+    """One cluster of near-duplicate scam messages"""
+
+    __slots__ = ('id', 'messages', 'first_seen', 'last_seen', 'scam_type', 'sample',
+                 'exemplars', 'verdict')
+
+    def __init__(self, campaign_id, sample, now):
+        self.id = campaign_id
+        self.messages = 0
+        self.first_seen = now
+        self.last_seen = now
+        self.scam_type = None
+        self.sample = sample
+        self.exemplars = []  # Signatures whose LSH bands point here
+        self.verdict = None  # First LLM verdict, reused for later members
+
+    def to_dict(self):
+        return {
+            'campaign_id': self.id,
+            'messages': self.messages,
+            'scam_type': self.scam_type,
+            'first_seen': datetime.fromtimestamp(self.first_seen).isoformat(),
+            'last_seen': datetime.fromtimestamp(self.last_seen).isoformat(),
+            'sample': self.sample
+        }
+
+
+class CampaignClusterer:
+    """Streaming near-duplicate clustering of scam messages (MinHash + LSH).
+
+    Each message's word-shingle MinHash signature is split into ``bands``
+    bands; messages sharing any band are candidates, and the best
+    candidate whose estimated Jaccard similarity reaches ``threshold``
+    becomes the message's campaign. Otherwise the message founds a new
+    one. Assignment costs one signature plus ``bands`` dict probes, never
+    a comparison against every campaign. Template variants that normalize
+    to identical text skip the signature via an exact-fingerprint LRU.
+
+    Campaigns keep up to ``max_exemplars`` signatures (members that
+    differ noticeably from the existing ones) so a drifting campaign is
+    still recognised. Beyond ``max_campaigns`` the least recently seen
+    campaign is dropped. Campaigns are also bucketed by message count, so
+    ``stats`` reads the largest without walking them all. Process-local,
+    like the memory verdict cache.
+    """
+
+    def __init__(self, bands=None, threshold=None, max_campaigns=None,
+                 max_exemplars=None, exact_cache_size=None):
+        self.bands = bands or Config.CAMPAIGN_LSH_BANDS
+        if NUM_PERM % self.bands:
+            raise ValueError(f'{NUM_PERM} MinHash values do not split into {self.bands} bands')
+        self.rows = NUM_PERM // self.bands
+        self.threshold = Config.CAMPAIGN_SIMILARITY if threshold is None else threshold
+        self.max_campaigns = max_campaigns or Config.CAMPAIGN_MAX
+        self.max_exemplars = max_exemplars or Config.CAMPAIGN_MAX_EXEMPLARS
+        self.exact_cache_size = exact_cache_size or Config.CAMPAIGN_EXACT_CACHE_SIZE
+        self._campaigns = OrderedDict()  # id -> Campaign, least recently seen first
+        self._buckets = {}  # (band, band hash) -> campaign id
+        self._exact = OrderedDict()  # message fingerprint -> campaign id
+        self._counts = Counter()
+        self._ranking = CountRanking()  # Campaign ids by message count
+        self._lock = threading.Lock()
+
+    def match(self, message, min_similarity=None):
+        """(campaign, similarity) for message without recording it, or (None, 0.0)"""
+        normalized = normalize_message(message)
+        with self._lock:
+            campaign = self._exact_match(text_fingerprint(normalized))
+            if campaign is not None:
+                return campaign, 1.0
+        signature = minhash(shingles(normalized))
+        with self._lock:
+            campaign, score = self._lsh_match(signature)
+        if campaign is None or score < (self.threshold if min_similarity is None else min_similarity):
+            return None, 0.0
+        return campaign, score
+
+    @metrics.timed('cluster')
+    def assign(self, message, scam_type=None, verdict=None):
+        """Record a scam message; returns its campaign id"""
+        now = time.time()
+        normalized = normalize_message(message)
+        fingerprint = text_fingerprint(normalized)
+        with self._lock:
+            campaign = self._exact_match(fingerprint)
+        outcome = 'exact'
+        signature = None
+        if campaign is None:
+            signature = minhash(shingles(normalized))
+
+        with self._lock:
+            if campaign is not None and campaign.id not in self._campaigns:
+                campaign, signature = None, minhash(shingles(normalized))  # Evicted in between
+            if signature is not None:
+                campaign, score = self._lsh_match(signature)
+                if campaign is not None and score >= self.threshold:
+                    outcome = 'similar'
+                    if score < 0.9 and len(campaign.exemplars) < self.max_exemplars:
+                        self._add_exemplar(campaign, signature)
+                elif f'cmp_{fingerprint[:12]}' in self._campaigns:
+                    campaign = self._campaigns[f'cmp_{fingerprint[:12]}']  # Bands dropped with a rival
+                    outcome = 'similar'
+                else:
+                    outcome = 'new'
+                    campaign = Campaign(f'cmp_{fingerprint[:12]}', normalized[:160], now)
+                    self._campaigns[campaign.id] = campaign
+                    self._add_exemplar(campaign, signature)
+                    while len(self._campaigns) > self.max_campaigns:
+                        self._drop(self._campaigns.popitem(last=False)[1])
+                self._exact[fingerprint] = campaign.id
+                while len(self._exact) > self.exact_cache_size:
+                    self._exact.popitem(last=False)
+
+            campaign.messages += 1
+            self._ranking.move(campaign.id, campaign.messages - 1, campaign.messages)
+            campaign.last_seen = now
+            campaign.scam_type = scam_type or campaign.scam_type
+            if verdict is not None and campaign.verdict is None:
+                campaign.verdict = dict(verdict)
+            self._campaigns.move_to_end(campaign.id)
+            self._counts[outcome] += 1
+        metrics.inc('campaign_assignments_total', outcome=outcome)
+        return campaign.id
+
+    def note_reuse(self):
+        with self._lock:
+            self._counts['verdicts_reused'] += 1
+
+    def stats(self, top=None):
+        """Campaign count and the largest campaigns, for /api/stats"""
+        with self._lock:
+            largest = [self._campaigns[i] for i in self._ranking.top(top or Config.CAMPAIGN_STATS_TOP)]
+            return {
+                'campaigns': len(self._campaigns),
+                'messages': self._counts['exact'] + self._counts['similar'] + self._counts['new'],
+                'assigned': {k: self._counts[k] for k in ('exact', 'similar', 'new')},
+                'verdicts_reused': self._counts['verdicts_reused'],
+                'top': [c.to_dict() for c in largest]
+            }
+
+    def _exact_match(self, fingerprint):
+        campaign_id = self._exact.get(fingerprint)
+        if campaign_id is None:
+            return None
+        campaign = self._campaigns.get(campaign_id)
+        if campaign is None:
+            del self._exact[fingerprint]
+            return None
+        self._exact.move_to_end(fingerprint)
+        return campaign
+
+    def _band_keys(self, signature):
+        rows = self.rows
+        return [(b, hash(signature[b * rows:(b + 1) * rows])) for b in range(self.bands)]
+
+    def _lsh_match(self, signature):
+        candidates = Counter(
+            self._buckets[key] for key in self._band_keys(signature) if key in self._buckets
+        )
+        best, best_score = None, 0.0
+        # Campaigns sharing the most bands are the likeliest; score a few exactly
+        for campaign_id, _ in candidates.most_common(3):
+            campaign = self._campaigns[campaign_id]
+            score = max(similarity(signature, exemplar) for exemplar in campaign.exemplars)
+            if score > best_score:
+                best, best_score = campaign, score
+        return best, best_score
+
+    def _add_exemplar(self, campaign, signature):
+        campaign.exemplars.append(signature)
+        for key in self._band_keys(signature):
+            self._buckets.setdefault(key, campaign.id)
+
+    def _drop(self, campaign):
+        self._ranking.move(campaign.id, campaign.messages, 0)
+        for signature in campaign.exemplars:
+            for key in self._band_keys(signature):
+                if self._buckets.get(key) == campaign.id:
+                    del self._buckets[key]
+
+
+def create_campaign_clusterer(enabled=None):
+    """Build the clusterer configured in Config (None when disabled)"""
+    enabled = Config.CAMPAIGN_CLUSTERING if enabled is None else enabled
+    return CampaignClusterer() if enabled else None
+
+
+# Global instance
+campaign_clusterer = create_campaign_clusterer()
@@ -0,0 +1,292 @@
+import json
+import logging
+import os
+import re
+import struct
+import threading
+import time
+import zlib
+from collections import Counter
+from datetime import datetime
+
+from config import Config
+from utils.metrics import metrics
+from .cache import normalize_message
+
+try:
+    import numpy as np
+except ImportError:  # Optional: without numpy the local classifier is disabled
+    np = None
+
+logger = logging.getLogger(__name__)
+
+# Model file: magic, header length, JSON header, then float32 weights at
+# a 16-byte aligned offset so they can be memory-mapped as they are.
+MAGIC = b'HPSCLF01'
+_HEADER_LEN = struct.Struct('<I')
+_TOKEN_RE = re.compile(r'<\w+>|#|\w+')
+
+# crc32 seeds keep words and word pairs apart; byte 4-grams are hashed
+# as uint32 values (Fibonacci hashing), a whole batch at a time
+_WORD_SEED, _PAIR_SEED = 0x57, 0x5750
+_GRAM_MULTIPLIER = 0x9E3779B1
+
+
+class HashedFeatures:
+    """Hashed word, word-pair and character 4-gram features.
+
+    Messages are normalized like the verdict cache does (numbers, handles
+    and links masked), so features generalize across campaign variants.
+    Each distinct n-gram sets one of ``2 ** bits`` columns (crc32 and a
+    fixed multiplier, so columns are stable across processes); rows are
+    L2-normalized binary vectors.
+    """
+
+    def __init__(self, bits=18):
+        self.bits = bits
+        self.mask = (1 << bits) - 1
+
+    @property
+    def n_features(self):
+        return 1 << self.bits
+
+    def transform(self, messages):
+        """CSR rows for messages: (columns, row offsets, row scale) arrays"""
+        crc, mask = zlib.crc32, self.mask
+        word_cols, word_counts, texts = [], [], []
+        for message in messages:
+            encoded = [word.encode('utf-8') for word in _TOKEN_RE.findall(normalize_message(message))]
+            cols = [crc(word, _WORD_SEED) & mask for word in encoded]
+            cols += [crc(a + b' ' + b, _PAIR_SEED) & mask for a, b in zip(encoded, encoded[1:])]
+            word_cols += cols
+            word_counts.append(len(cols))
+            texts.append(b' ' + b' '.join(encoded) + b' ' if encoded else b'')
+        rows = np.arange(len(messages), dtype=np.int64)
+        word_rows = np.repeat(rows, word_counts)
+
+        # Every byte 4-gram of every text, dropping those that cross into the next text
+        lengths = np.fromiter(map(len, texts), dtype=np.int64, count=len(texts))
+        buffer = np.frombuffer(b''.join(texts) + b'\0\0\0', dtype=np.uint8).astype(np.uint32)
+        grams = buffer[:-3] | buffer[1:-2] << 8 | buffer[2:-1] << 16 | buffer[3:] << 24
+        gram_rows = np.repeat(rows, lengths)
+        starts = np.repeat(np.cumsum(lengths) - lengths, lengths)
+        keep = np.arange(len(gram_rows)) - starts <= np.repeat(lengths, lengths) - 4
+        gram_cols = (grams[keep] * np.uint32(_GRAM_MULTIPLIER)) >> np.uint32(32 - self.bits)
+
+        # Distinct (row, column) pairs, sorted by row
+        keys = np.concatenate([
+            word_rows << self.bits | np.asarray(word_cols, dtype=np.int64),
+            gram_rows[keep] << self.bits | gram_cols.astype(np.int64)
+        ])
+        keys.sort()
+        keys = keys[np.concatenate(([True], keys[1:] != keys[:-1]))] if len(keys) else keys
+        counts = np.bincount(keys >> self.bits, minlength=len(messages))
+        indptr = np.zeros(len(messages) + 1, dtype=np.int64)
+        np.cumsum(counts, out=indptr[1:])
+        scale = np.zeros(len(messages))
+        np.divide(1.0, np.sqrt(counts), out=scale, where=counts > 0)
+        return (keys & mask).astype(np.int32), indptr, scale
+
+    def to_dict(self):
+        return {'bits': self.bits}
+
+
+def _sigmoid(z):
+    return 1.0 / (1.0 + np.exp(-np.clip(z, -30, 30)))
+
+
+def _row_ids(indptr):
+    return np.repeat(np.arange(len(indptr) - 1), np.diff(indptr))
+
+
+class ScamClassifier:
+    """Logistic regression over hashed n-grams, scored in batches with NumPy.
+
+    Loaded models memory-map their weight vector, so every gunicorn worker
+    shares one copy through the page cache. ``triage`` splits messages
+    into confident scam / not-scam decisions and an uncertain band that
+    still goes to the LLM.
+    """
+
+    def __init__(self, weights, bias, features, info=None, path=None):
+        self.weights = weights
+        self.bias = float(bias)
+        self.features = features
+        self.info = info or {}
+        self.path = path
+        self._counts = Counter()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path):
+        """Open a model file written by ``save``, mapping its weights"""
+        with open(path, 'rb') as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f'{path} is not a scam classifier model')
+            (length,) = _HEADER_LEN.unpack(f.read(_HEADER_LEN.size))
+            header = json.loads(f.read(length))
+        features = HashedFeatures(**header['features'])
+        weights = np.memmap(path, dtype='<f4', mode='r', offset=header['offset'],
+                            shape=(features.n_features,))
+        return cls(weights, header['bias'], features, header.get('info'), path)
+
+    def save(self, path):
+        """Write the model file atomically"""
+        header = {'features': self.features.to_dict(), 'bias': self.bias, 'info': self.info}
+        prefix = len(MAGIC) + _HEADER_LEN.size
+        body = json.dumps(header).encode('utf-8')
+        # The header stores the weights' offset, which depends on its own length
+        offset = -(-(prefix + len(body) + 32) // 16) * 16
+        header['offset'] = offset
+        body = json.dumps(header).encode('utf-8').ljust(offset - prefix)
+        tmp = f'{path}.tmp'
+        with open(tmp, 'wb') as f:
+            f.write(MAGIC + _HEADER_LEN.pack(len(body)) + body)
+            f.write(np.asarray(self.weights, dtype='<f4').tobytes())
+        os.replace(tmp, path)
+        self.path = path
+
+    def predict_proba(self, messages):
+        """Scam probability per message (one vectorized pass for the batch)"""
+        indices, indptr, scale = self.features.transform(messages)
+        if not len(messages):
+            return np.zeros(0)
+        z = np.bincount(_row_ids(indptr), weights=self.weights[indices], minlength=len(messages))
+        return _sigmoid(z * scale + self.bias)
+
+    @metrics.timed('classify')
+    def triage(self, messages, safe_below=None, scam_above=None):
+        """(probability, 'scam' / 'not_scam' / None when uncertain) per message"""
+        safe_below = Config.CLASSIFIER_SAFE_BELOW if safe_below is None else safe_below
+        scam_above = Config.CLASSIFIER_SCAM_ABOVE if scam_above is None else scam_above
+        decisions = []
+        for p in self.predict_proba(messages).tolist():
+            decisions.append((p, 'scam' if p >= scam_above else 'not_scam' if p <= safe_below else None))
+        outcomes = Counter(decision or 'uncertain' for _, decision in decisions)
+        with self._lock:
+            self._counts.update(outcomes)
+        for outcome, count in outcomes.items():
+            metrics.inc('classifier_decisions_total', count, outcome=outcome)
+        return decisions
+
+    def stats(self):
+        """Model details and decision counts, for /api/stats"""
+        with self._lock:
+            counts = {k: self._counts[k] for k in ('scam', 'not_scam', 'uncertain')}
+        decided = counts['scam'] + counts['not_scam']
+        total = decided + counts['uncertain']
+        return {
+            'path': self.path,
+            'features': self.features.n_features,
+            'trained_at': self.info.get('trained_at'),
+            'examples': self.info.get('examples'),
+            'band': [Config.CLASSIFIER_SAFE_BELOW, Config.CLASSIFIER_SCAM_ABOVE],
+            'decisions': counts,
+            'decided_rate': round(decided / total, 4) if total else 0.0
+        }
+
+
+def train(messages, labels, bits=18, epochs=8, batch_size=256, learning_rate=0.5,
+          l2=1e-6, seed=0):
+    """Fit a ScamClassifier (class-balanced logistic loss, mini-batch AdaGrad)"""
+    features = HashedFeatures(bits)
+    indices, indptr, scale = features.transform(messages)
+    y = np.asarray(labels, dtype=np.float64)
+    n = len(y)
+    positives = y.sum()
+    if not 0 < positives < n:
+        raise ValueError('training data needs both scam and non-scam examples')
+    sample_weight = np.where(y > 0, n / (2 * positives), n / (2 * (n - positives)))
+    lengths = np.diff(indptr)
+
+    weights = np.zeros(features.n_features)
+    squared = np.full(features.n_features, 1e-8)
+    bias, bias_squared = 0.0, 1e-8
+    rng = np.random.default_rng(seed)
+    for _ in range(epochs):
+        order = rng.permutation(n)
+        for start in range(0, n, batch_size):
+            rows = order[start:start + batch_size]
+            row_lengths = lengths[rows]
+            row_of = np.repeat(np.arange(len(rows)), row_lengths)
+            offsets = np.arange(row_lengths.sum()) + np.repeat(
+                indptr[rows] - np.cumsum(row_lengths) + row_lengths, row_lengths
+            )
+            cols = indices[offsets]
+            values = scale[rows][row_of]
+            z = np.bincount(row_of, weights=weights[cols] * values, minlength=len(rows)) + bias
+            error = (_sigmoid(z) - y[rows]) * sample_weight[rows] / len(rows)
+
+            # AdaGrad on the touched columns only (L2 applied lazily with them)
+            touched, position = np.unique(cols, return_inverse=True)
+            grad = np.bincount(position, weights=error[row_of] * values) + l2 * weights[touched]
+            squared[touched] += grad ** 2
+            weights[touched] -= learning_rate * grad / np.sqrt(squared[touched])
+            bias_grad = error.sum()
+            bias_squared += bias_grad ** 2
+            bias -= learning_rate * bias_grad / np.sqrt(bias_squared)
+
+    info = {
+        'trained_at': datetime.now().isoformat(timespec='seconds'),
+        'examples': n,
+        'scam_examples': int(positives),
+        'epochs': epochs
+    }
+    return ScamClassifier(weights.astype(np.float32), bias, features, info)
+
+
+def evaluate(classifier, messages, labels, safe_below=None, scam_above=None):
+    """Accuracy at 0.5, ROC AUC, and how the uncertain band splits the data"""
+    safe_below = Config.CLASSIFIER_SAFE_BELOW if safe_below is None else safe_below
+    scam_above = Config.CLASSIFIER_SCAM_ABOVE if scam_above is None else scam_above
+    y = np.asarray(labels, dtype=bool)
+    start = time.perf_counter()
+    p = classifier.predict_proba(messages)
+    elapsed = time.perf_counter() - start
+
+    predicted = p >= 0.5
+    tp = int((predicted & y).sum())
+    scam_decided = p >= scam_above
+    safe_decided = p <= safe_below
+    decided = scam_decided | safe_decided
+
+    # ROC AUC from ranks (Mann-Whitney U); ties broken arbitrarily
+    ranks = np.empty(len(p))
+    ranks[np.argsort(p, kind='stable')] = np.arange(1, len(p) + 1)
+    positives, negatives = int(y.sum()), int((~y).sum())
+    auc = ((ranks[y].sum() - positives * (positives + 1) / 2) / (positives * negatives)
+           if positives and negatives else None)
+
+    return {
+        'examples': len(y),
+        'accuracy': round(float((predicted == y).mean()), 4),
+        'precision': round(tp / max(int(predicted.sum()), 1), 4),
+        'recall': round(tp / max(positives, 1), 4),
+        'roc_auc': round(float(auc), 4) if auc is not None else None,
+        'band': [safe_below, scam_above],
+        'decided_rate': round(float(decided.mean()), 4),
+        'decided_accuracy': round(float((predicted == y)[decided].mean()), 4) if decided.any() else None,
+        'scams_cleared': int((safe_decided & y).sum()),      # Scams the LLM never sees
+        'false_alarms': int((scam_decided & ~y).sum()),
+        'messages_per_second': round(len(y) / elapsed) if elapsed else None
+    }
+
+
+def create_classifier(path=None):
+    """Load the model configured in Config (None when unset, missing, unreadable or numpy is absent)"""
+    path = Config.CLASSIFIER_MODEL_PATH if path is None else path
+    if not path or not os.path.exists(path):
+        return None
+    if np is None:
+        logger.warning("numpy is not installed; local scam classifier %s disabled", path)
+        return None
+    try:
+        return ScamClassifier.load(path)
+    except (OSError, ValueError, KeyError, TypeError, struct.error) as e:
+        # A corrupt or truncated model must not stop the app from importing
+        logger.error("Could not load scam classifier %s, disabled: %s", path, e)
+        return None
+
+
+# Global instance
+scam_classifier = create_classifier()
@@ -1,14 +1,27 @@
-from groq import Groq
+from concurrent.futures import ThreadPoolExecutor
 import json
+import logging
 from config import Config
-from .keywords import SCAM_KEYWORDS, SCAM_TYPES
+from llm import llm_gateway
+from utils.metrics import metrics
+from .matcher import keyword_matcher
+from .cache import message_fingerprint, verdict_cache as default_verdict_cache
+from .campaigns import campaign_clusterer as default_campaigns
+from .classifier import scam_classifier as default_classifier
+
+logger = logging.getLogger(__name__)
 
 class ScamDetector:
     """Main scam detection class"""
     
-    def __init__(self):
-        self.client = Groq(api_key=Config.GROQ_API_KEY)
+    def __init__(self, verdict_cache=default_verdict_cache, llm=None, campaigns=default_campaigns,
+                 classifier=default_classifier):
+        self.llm = llm or llm_gateway
+        self.verdict_cache = verdict_cache
+        self.campaigns = campaigns
+        self.classifier = classifier
     
+    @metrics.timed('detect')
     def detect(self, message):
         """Detect if message is a scam"""
         
@@ -17,69 +30,199 @@ class ScamDetector:
         
         # If keyword score is high enough, it's definitely a scam
         if keyword_score >= 0.4:  # Lowered threshold
-            return {
-                'is_scam': True,
-                'confidence': min(keyword_score + 0.3, 0.95),
-                'scam_type': matched_type or 'fraud',
-                'reasoning': f'Message contains multiple scam indicators: prize/money requests, urgency, payment details',
-                'keyword_matches': keyword_score
-            }
+            return self._keyword_verdict(keyword_score, matched_type)
         
-        # AI-powered detection for borderline cases
-        ai_result = self._ai_detect(message)
+        # Local classifier, then AI-powered detection if it is unsure
+        local, probability = self._local_detect([message])[0]
+        if local is not None:
+            return self._combined_verdict(keyword_score, matched_type, local)
+        ai_result = self._ai_detect(message, probability)
         
-        # Combine results - be more aggressive
-        is_scam = ai_result.get('is_scam', False) or keyword_score > 0.3
+        return self._with_campaign(
+            message, self._combined_verdict(keyword_score, matched_type, ai_result), ai_result
+        )
+    
+    def detect_batch(self, messages, max_concurrency=None):
+        """Detect scams in many messages, returning results in input order.
+        
+        Keyword scoring runs for the whole batch first, then the local
+        classifier scores the borderline messages in one pass; only those it
+        is unsure about go to the LLM, with at most ``max_concurrency``
+        requests in flight (defaults to ``Config.DETECT_BATCH_CONCURRENCY``).
+        """
+        scores = [self._keyword_check(message) for message in messages]
+        results = [None] * len(messages)
+        
+        borderline = []
+        for i, (keyword_score, matched_type) in enumerate(scores):
+            if keyword_score >= 0.4:
+                results[i] = self._keyword_verdict(keyword_score, matched_type)
+            else:
+                borderline.append(i)
+        
+        uncertain, probabilities = [], []
+        for i, (local, probability) in zip(borderline, self._local_detect([messages[i] for i in borderline])):
+            if local is None:
+                uncertain.append(i)
+                probabilities.append(probability)
+            else:
+                keyword_score, matched_type = scores[i]
+                results[i] = self._combined_verdict(keyword_score, matched_type, local)
+        
+        if uncertain:
+            workers = min(max_concurrency or Config.DETECT_BATCH_CONCURRENCY, len(uncertain))
+            with ThreadPoolExecutor(max_workers=max(workers, 1)) as pool:
+                ai_results = pool.map(self._ai_detect, [messages[i] for i in uncertain], probabilities)
+                for i, ai_result in zip(uncertain, ai_results):
+                    keyword_score, matched_type = scores[i]
+                    results[i] = self._with_campaign(
+                        messages[i], self._combined_verdict(keyword_score, matched_type, ai_result), ai_result
+                    )
         
+        return results
+    
+    def _keyword_verdict(self, keyword_score, matched_type):
+        """Verdict for messages that clear the keyword threshold on their own"""
         return {
+            'is_scam': True,
+            'confidence': min(keyword_score + 0.3, 0.95),
+            'scam_type': matched_type or 'fraud',
+            'reasoning': f'Message contains multiple scam indicators: prize/money requests, urgency, payment details',
+            'keyword_matches': keyword_score
+        }
+    
+    def _combined_verdict(self, keyword_score, matched_type, ai_result):
+        """Combine keyword and AI results - be more aggressive"""
+        is_scam = ai_result.get('is_scam', False) or keyword_score > 0.3
+        
+        result = {
             'is_scam': is_scam,
             'confidence': max(ai_result.get('confidence', 0), keyword_score + 0.2),
             'scam_type': ai_result.get('scam_type', matched_type or 'fraud'),
             'reasoning': ai_result.get('reasoning', f'Detected {int(keyword_score*10)} scam patterns'),
             'keyword_matches': keyword_score
         }
+        if 'classifier_score' in ai_result:
+            result['classifier_score'] = ai_result['classifier_score']
+        return result
     
-    def _keyword_check(self, message):
-        """Quick keyword-based detection"""
-        message_lower = message.lower()
-        
-        # High-confidence scam indicators
-        high_confidence_keywords = [
-            'won', 'prize', 'lottery', 'claim', 'winner',
-            'bank account', 'send money', 'transfer', 'payment',
-            'upi', '@paytm', '@phonepe', '@gpay',
-            'urgent', 'immediately', 'blocked', 'suspended',
-            'kyc', 'verify', 'update details'
-        ]
-        
-        # Count high-confidence matches
-        high_matches = sum(1 for kw in high_confidence_keywords if kw in message_lower)
-        
-        # Count all keyword matches
-        all_matches = sum(1 for kw in SCAM_KEYWORDS if kw in message_lower)
+    def assign_campaign(self, message, result):
+        """Add ``campaign_id`` to a scam verdict that has none.
         
+        Keyword verdicts skip clustering in ``detect`` (it would cost more
+        than the keyword check and save no LLM call); engagements call this
+        so every engaged scam still gets a campaign.
+        """
+        if 'campaign_id' not in result:
+            self._with_campaign(message, result)
+        return result
+    
+    def _with_campaign(self, message, result, ai_result=None):
+        """Assign scam verdicts to a campaign cluster (adds ``campaign_id``)"""
+        if self.campaigns is not None and result['is_scam']:
+            # Only LLM verdicts are worth reusing for the rest of a campaign
+            llm_verdict = ai_result and not ai_result.get('fallback') and 'classifier_score' not in ai_result
+            verdict = ai_result if llm_verdict else None
+            result['campaign_id'] = self.campaigns.assign(message, result['scam_type'], verdict)
+        return result
+    
+    def _keyword_check(self, message):
+        """Quick keyword-based detection (single pass over the message)"""
+        return self._score_matches(keyword_matcher.match(message))
+    
+    def _score_matches(self, matches):
+        """Turn keyword matcher output into a (score, scam_type) pair"""
         # Calculate score (more aggressive)
-        score = min((high_matches * 0.3) + (all_matches * 0.15), 0.9)
+        score = min((matches['high_matches'] * 0.3) + (matches['all_matches'] * 0.15), 0.9)
         
-        # Detect scam type
+        # Detect scam type (first type in SCAM_TYPES order with any hit)
         scam_type = None
-        for stype, keywords in SCAM_TYPES.items():
-            if any(kw in message_lower for kw in keywords):
+        for stype, count in matches['type_counts'].items():
+            if count:
                 scam_type = stype
                 break
         
         # Special patterns that are almost always scams
-        if any(pattern in message_lower for pattern in ['@paytm', '@phonepe', '@gpay']):
+        if matches['special']['payment_handle']:
             score = max(score, 0.8)
             scam_type = scam_type or 'payment_fraud'
         
-        if any(pattern in message_lower for pattern in ['won rs', 'won rupees', 'claim prize']):
+        if matches['special']['prize_claim']:
             score = max(score, 0.8)
             scam_type = 'lottery'
         
         return score, scam_type
     
-    def _ai_detect(self, message):
+    def _local_detect(self, messages):
+        """(verdict or None, scam probability) per message from the local classifier.
+        
+        The verdict is None inside the uncertain band, and the probability
+        is None without a model.
+        """
+        if self.classifier is None or not messages:
+            return [(None, None)] * len(messages)
+        results = []
+        for probability, decision in self.classifier.triage(messages):
+            verdict = None
+            if decision == 'scam':
+                verdict = {
+                    'is_scam': True,
+                    'confidence': round(probability, 4),
+                    'reasoning': f'Local classifier scam score {probability:.2f}',
+                    'classifier_score': round(probability, 4)
+                }
+            elif decision == 'not_scam':
+                verdict = {
+                    'is_scam': False,
+                    'confidence': round(1 - probability, 4),
+                    'scam_type': 'none',
+                    'reasoning': f'Local classifier scam score {probability:.2f}',
+                    'classifier_score': round(probability, 4)
+                }
+            results.append((verdict, probability))
+        return results
+    
+    def _ai_detect(self, message, probability=None):
+        """AI-powered detection, reusing cached verdicts for template variants"""
+        if self.verdict_cache is None:
+            result = self._campaign_verdict(message) or self._ai_query(message)
+            return self._classifier_fallback(result, probability)
+        
+        key = message_fingerprint(message)
+        cached = self.verdict_cache.get(key)
+        if cached is not None:
+            return cached
+        
+        result = self._campaign_verdict(message) or self._ai_query(message)
+        # Only cache real model verdicts, never the error fallback
+        if not result.get('fallback'):
+            self.verdict_cache.set(key, result)
+        return self._classifier_fallback(result, probability)
+    
+    def _classifier_fallback(self, result, probability):
+        """Replace the blind error fallback with the local model's best guess"""
+        if not result.get('fallback') or probability is None:
+            return result
+        return {
+            'is_scam': probability >= 0.5,
+            'confidence': round(max(probability, 1 - probability), 4),
+            'scam_type': 'unknown' if probability >= 0.5 else 'none',
+            'reasoning': f'Could not analyze fully; local classifier scam score {probability:.2f}',
+            'classifier_score': round(probability, 4),
+            'fallback': True
+        }
+    
+    def _campaign_verdict(self, message):
+        """The verdict of a known scam campaign this message closely matches, if any"""
+        if self.campaigns is None:
+            return None
+        campaign, _ = self.campaigns.match(message, Config.CAMPAIGN_REUSE_SIMILARITY)
+        if campaign is None or campaign.verdict is None:
+            return None
+        self.campaigns.note_reuse()
+        return dict(campaign.verdict)
+    
+    def _ai_query(self, message):
         """AI-powered detection using Groq"""
         try:
             prompt = f"""You are a scam detection AI. Analyze this message and determine if it's a scam.
@@ -104,14 +247,13 @@ Return ONLY valid JSON (no markdown):
 
 Be sensitive - if there's any suspicion of fraud, mark as scam."""
 
-            response = self.client.chat.completions.create(
-                model=Config.GROQ_MODEL,
+            response = self.llm.complete(
                 messages=[{"role": "user", "content": prompt}],
                 temperature=0.2,  # Lower temperature for more consistent detection
                 max_tokens=300
             )
             
-            result_text = response.choices[0].message.content.strip()
+            result_text = response.text.strip()
             
             # Clean JSON
             result_text = result_text.replace('```json', '').replace('```', '').strip()
@@ -126,11 +268,13 @@ Be sensitive - if there's any suspicion of fraud, mark as scam."""
             return parsed
             
         except Exception as e:
-            print(f"AI detection error: {e}")
+            logger.warning("AI detection error: %s", e)
+            metrics.inc('fallbacks_total', component='detection')
             # On error, be cautious and return uncertain
             return {
                 'is_scam': True,  # Default to True for safety
                 'confidence': 0.5,
                 'scam_type': 'unknown',
-                'reasoning': 'Could not analyze fully, treating as suspicious'
+                'reasoning': 'Could not analyze fully, treating as suspicious',
+                'fallback': True
             }
\ No newline at end of file
@@ -30,6 +30,15 @@ SCAM_KEYWORDS = [
     'send your', 'provide your', 'share your'
 ]
 
+# High-confidence scam indicators (weighted more heavily when scoring)
+HIGH_CONFIDENCE_KEYWORDS = [
+    'won', 'prize', 'lottery', 'claim', 'winner',
+    'bank account', 'send money', 'transfer', 'payment',
+    'upi', '@paytm', '@phonepe', '@gpay',
+    'urgent', 'immediately', 'blocked', 'suspended',
+    'kyc', 'verify', 'update details'
+]
+
 SCAM_TYPES = {
     'lottery': ['won', 'prize', 'lottery', 'lucky', 'winning', 'claim'],
     'banking': ['account', 'kyc', 'bank', 'verify', 'blocked', 'suspended'],
@@ -38,4 +47,10 @@ SCAM_TYPES = {
     'romance': ['love', 'meet', 'lonely', 'dating', 'relationship'],
     'job': ['hiring', 'work from home', 'earn money', 'part time', 'job offer'],
     'phishing': ['click here', 'link', 'verify now', 'update now', 'expire'],
-}
\ No newline at end of file
+}
+
+# Special patterns that are almost always scams
+SPECIAL_PATTERNS = {
+    'payment_handle': ['@paytm', '@phonepe', '@gpay'],
+    'prize_claim': ['won rs', 'won rupees', 'claim prize'],
+}
@@ -0,0 +1,135 @@
+import re
+
+from .keywords import (
+    HIGH_CONFIDENCE_KEYWORDS,
+    SCAM_KEYWORDS,
+    SCAM_TYPES,
+    SPECIAL_PATTERNS,
+)
+
+
+def _build_trie(words):
+    """Build a character trie; the '' key marks the end of a word"""
+    root = {}
+    for word in words:
+        node = root
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[''] = True
+    return root
+
+
+def _trie_to_regex(node):
+    """Render a trie as a regex that matches the longest word at a position.
+
+    Sibling branches start with distinct characters and optional tails are
+    greedy, so the first successful match is always the longest keyword.
+    """
+    branches = [
+        re.escape(ch) + _trie_to_regex(child)
+        for ch, child in sorted((k, v) for k, v in node.items() if k)
+    ]
+    if not branches:
+        return ''
+
+    body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+    if '' in node:
+        body = f'(?:{body})?'
+    return body
+
+
+class TrieMatcher:
+    """Single-pass substring matcher over a fixed keyword vocabulary.
+
+    The vocabulary is folded into one trie-shaped regex, so a message is
+    walked once instead of once per keyword. Matching is attempted at every
+    position where a keyword can start, so overlapping keywords ('won'
+    inside 'won rs', 'rs ' straddling it) are reported exactly as separate
+    ``in`` checks would. Hits are returned as a bitmask over the vocabulary;
+    use ``mask_of`` to turn a keyword list into a mask to test against.
+    """
+
+    def __init__(self, vocabulary):
+        vocabulary = set(vocabulary)
+        vocabulary.discard('')
+
+        self.keywords = sorted(vocabulary)
+        self._bit = {kw: 1 << i for i, kw in enumerate(self.keywords)}
+
+        # A keyword matching at a position is always a prefix of the longest
+        # keyword matching there, so expanding to prefixes recovers every hit.
+        self._prefix_masks = {
+            kw: self.mask_of(p for p in vocabulary if kw.startswith(p))
+            for kw in vocabulary
+        }
+
+        # Only try positions holding a possible first character; the
+        # lookbehind steps back onto it and the lookahead captures the
+        # longest keyword starting there without consuming it.
+        first_chars = ''.join(sorted({kw[0] for kw in vocabulary}))
+        trie = _trie_to_regex(_build_trie(vocabulary))
+        self.pattern = re.compile(f'[{re.escape(first_chars)}](?<=(?=({trie})).)')
+
+    def mask_of(self, words):
+        """Bitmask of a list of vocabulary keywords"""
+        bit = self._bit
+        mask = 0
+        for kw in words:
+            mask |= bit[kw]
+        return mask
+
+    def scan(self, message_lower):
+        """Return a bitmask of the keywords present in a lowercased message"""
+        prefix_masks = self._prefix_masks
+        mask = 0
+        for longest in self.pattern.findall(message_lower):
+            mask |= prefix_masks[longest]
+        return mask
+
+    def keywords_in(self, mask):
+        """Decode a hit bitmask into the matching keywords"""
+        keywords = self.keywords
+        found = []
+        while mask:
+            low = mask & -mask
+            found.append(keywords[low.bit_length() - 1])
+            mask ^= low
+        return found
+
+
+class KeywordMatcher(TrieMatcher):
+    """Single-pass matcher over every keyword list used by the detector.
+
+    Each keyword list is a mask over the shared vocabulary, and counts are
+    popcounts of the scanned hit mask.
+    """
+
+    def __init__(self, high_confidence, keywords, scam_types, special_patterns):
+        vocabulary = set(high_confidence) | set(keywords)
+        for words in scam_types.values():
+            vocabulary.update(words)
+        for words in special_patterns.values():
+            vocabulary.update(words)
+        super().__init__(vocabulary)
+
+        self._high_mask = self.mask_of(high_confidence)
+        self._all_mask = self.mask_of(keywords)
+        self._type_masks = [(t, self.mask_of(words)) for t, words in scam_types.items()]
+        self._special_masks = [(n, self.mask_of(words)) for n, words in special_patterns.items()]
+
+    def match(self, message):
+        """Scan a message once and return hits, counts and special-pattern flags"""
+        mask = self.scan(message.lower())
+        return {
+            'hits': self.keywords_in(mask),
+            'high_matches': (mask & self._high_mask).bit_count(),
+            'all_matches': (mask & self._all_mask).bit_count(),
+            'type_counts': {t: (mask & m).bit_count() for t, m in self._type_masks},
+            'special': {n: bool(mask & m) for n, m in self._special_masks},
+        }
+
+
+# Compiled once at import and shared by every detector instance
+keyword_matcher = KeywordMatcher(
+    HIGH_CONFIDENCE_KEYWORDS, SCAM_KEYWORDS, SCAM_TYPES, SPECIAL_PATTERNS
+)
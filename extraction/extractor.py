@@ -1,14 +1,18 @@
-from groq import Groq
 import json
-from config import Config
-from .patterns import extract_by_pattern, PATTERNS
+import logging
+from llm import llm_gateway
+from utils.metrics import metrics
+from .patterns import scan_entities
+
+logger = logging.getLogger(__name__)
 
 class IntelligenceExtractor:
     """Extract sensitive information from conversations"""
     
-    def __init__(self):
-        self.client = Groq(api_key=Config.GROQ_API_KEY)
+    def __init__(self, llm=None):
+        self.llm = llm or llm_gateway
     
+    @metrics.timed('extract')
     def extract(self, conversation):
         """Extract intelligence from conversation history"""
         
@@ -29,6 +33,10 @@ class IntelligenceExtractor:
         
         return merged
     
+    def start_session(self):
+        """Begin incremental extraction for one conversation"""
+        return ExtractionSession(self)
+    
     def _combine_messages(self, history):
         """Combine all conversation messages"""
         messages = []
@@ -38,17 +46,15 @@ class IntelligenceExtractor:
         return ' '.join(messages)
     
     def _regex_extraction(self, text):
-        """Extract using regex patterns"""
+        """Extract using regex patterns (single pass over the text)"""
+        found = scan_entities(text)
         return {
-            'upi_ids': extract_by_pattern(text, 'upi_id'),
-            'bank_accounts': extract_by_pattern(text, 'bank_account'),
-            'phone_numbers': (
-                extract_by_pattern(text, 'phone_indian') + 
-                extract_by_pattern(text, 'phone_international')
-            ),
-            'urls': extract_by_pattern(text, 'url'),
-            'emails': extract_by_pattern(text, 'email'),
-            'ifsc_codes': extract_by_pattern(text, 'ifsc'),
+            'upi_ids': found['upi_id'],
+            'bank_accounts': found['bank_account'],
+            'phone_numbers': found['phone_indian'] + found['phone_international'],
+            'urls': found['url'],
+            'emails': found['email'],
+            'ifsc_codes': found['ifsc'],
         }
     
     def _ai_extraction(self, text):
@@ -69,14 +75,13 @@ Find and return ONLY a valid JSON object (no markdown, no extra text):
     "payment_methods": ["any other payment info mentioned"]
 }}"""
 
-            response = self.client.chat.completions.create(
-                model=Config.GROQ_MODEL,
+            response = self.llm.complete(
                 messages=[{"role": "user", "content": prompt}],
                 temperature=0.1,
                 max_tokens=500
             )
             
-            result_text = response.choices[0].message.content.strip()
+            result_text = response.text.strip()
             
             # Clean JSON
             result_text = result_text.replace('```json', '').replace('```', '').strip()
@@ -84,7 +89,8 @@ Find and return ONLY a valid JSON object (no markdown, no extra text):
             return json.loads(result_text)
             
         except Exception as e:
-            print(f"AI extraction error: {e}")
+            logger.warning("AI extraction error: %s", e)
+            metrics.inc('fallbacks_total', component='extraction')
             return {}
     
     def _merge_intel(self, regex_intel, ai_intel):
@@ -117,4 +123,58 @@ Find and return ONLY a valid JSON object (no markdown, no extra text):
             'emails': [],
             'ifsc_codes': [],
             'payment_methods': []
-        }
\ No newline at end of file
+        }
+
+
+class ExtractionSession:
+    """Incremental extraction state for a single conversation.
+    
+    Each ``update`` only scans turns added since the previous call and merges
+    the regex hits into an accumulated intel set. The AI pass runs once, in
+    ``finalize``, over the full transcript.
+    """
+    
+    def __init__(self, extractor):
+        self.extractor = extractor
+        self.turns_seen = 0
+        self.regex_intel = {}
+    
+    @metrics.timed('extract_scan')
+    def update(self, conversation):
+        """Scan new turns; return the entity types that gained new values"""
+        history = (conversation or {}).get('history') or []
+        new_turns = history[self.turns_seen:]
+        self.turns_seen = len(history)
+        
+        if not new_turns:
+            return []
+        
+        text = self.extractor._combine_messages(new_turns)
+        found = self.extractor._regex_extraction(text)
+        
+        grown = []
+        for key, items in found.items():
+            known = self.regex_intel.setdefault(key, set())
+            before = len(known)
+            known.update(items)
+            if len(known) > before:
+                grown.append(key)
+        return grown
+    
+    def intel(self):
+        """Regex intelligence accumulated so far"""
+        return {key: list(items) for key, items in self.regex_intel.items()}
+    
+    @metrics.timed('extract_final')
+    def finalize(self, conversation):
+        """Scan any remaining turns, run the AI pass once and merge"""
+        self.update(conversation)
+        
+        if not self.turns_seen:
+            return self.extractor._empty_intel()
+        
+        all_text = self.extractor._combine_messages(conversation['history'])
+        ai_intel = self.extractor._ai_extraction(all_text)
+        
+        return self.extractor._merge_intel(self.intel(), ai_intel)
+
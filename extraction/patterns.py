@@ -11,11 +11,56 @@ PATTERNS = {
     'ifsc': r'\b[A-Z]{4}0[A-Z0-9]{6}\b',
 }
 
+# Compiled once at import
+COMPILED_PATTERNS = {
+    name: re.compile(pattern, re.IGNORECASE) for name, pattern in PATTERNS.items()
+}
+
+# Precedence for the single-pass scanner. The text is scanned left to right;
+# at each position the first entity class in this order that matches wins and
+# its whole span is consumed, so every character belongs to at most one entity:
+#   - text inside a URL is never reported as a UPI ID, email or number
+#   - an address with a domain TLD (name@gmail.com) is an email, not a UPI ID
+#   - a mobile number is a phone number, not a bank account; only digit runs
+#     that are not phone numbers are reported as bank accounts
+SCAN_ORDER = [
+    'url',
+    'email',
+    'upi_id',
+    'phone_international',
+    'phone_indian',
+    'ifsc',
+    'bank_account',
+]
+
+ENTITY_SCANNER = re.compile(
+    '|'.join(f'(?P<{name}>{PATTERNS[name]})' for name in SCAN_ORDER),
+    re.IGNORECASE
+)
+
+# No entity spans whitespace, and every entity contains a digit, '@' or ':'
+# (URL scheme), so only whitespace-separated tokens holding one can match.
+_HAS_TRIGGER = re.compile(r'[\d@:]').search
+
 def extract_by_pattern(text, pattern_name):
     """Extract data using regex pattern"""
-    pattern = PATTERNS.get(pattern_name)
+    pattern = COMPILED_PATTERNS.get(pattern_name)
     if not pattern:
         return []
     
-    matches = re.findall(pattern, text, re.IGNORECASE)
-    return list(set(matches))  # Remove duplicates
\ No newline at end of file
+    matches = pattern.findall(text)
+    return list(dict.fromkeys(matches))  # Remove duplicates, keep first-seen order
+
+def scan_entities(text):
+    """Extract every entity class with a single regex scan.
+    
+    Returns a dict keyed by pattern name with de-duplicated matches in order
+    of first appearance. Overlaps are resolved by SCAN_ORDER.
+    """
+    # Prose tokens are dropped before the (comparatively slow) scanner runs
+    candidates = ' '.join(filter(_HAS_TRIGGER, text.split()))
+    
+    found = {name: {} for name in SCAN_ORDER}
+    for match in ENTITY_SCANNER.finditer(candidates):
+        found[match.lastgroup][match.group()] = None
+    return {name: list(items) for name, items in found.items()}
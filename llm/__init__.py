@@ -0,0 +1,4 @@
+from .gateway import LLMGateway, LLMResponse, LLMStream, llm_gateway
+from .tokens import estimate_tokens
+
+__all__ = ['LLMGateway', 'LLMResponse', 'LLMStream', 'llm_gateway', 'estimate_tokens']
@@ -0,0 +1,357 @@
+import asyncio
+import random
+import threading
+import time
+import weakref
+from typing import NamedTuple, Optional
+
+import httpx
+
+from config import Config
+from utils.metrics import metrics
+
+
+class LLMResponse(NamedTuple):
+    """Result of a single chat completion"""
+    text: str
+    prompt_tokens: Optional[int] = None
+    completion_tokens: Optional[int] = None
+    latency_ms: float = 0.0
+
+
+class GroqBackend:
+    """Groq chat completions over pooled, keep-alive httpx connections"""
+
+    name = 'groq'
+
+    def __init__(self, api_key=None, max_connections=None):
+        self.api_key = api_key or Config.GROQ_API_KEY
+        self.max_connections = max_connections or Config.LLM_MAX_CONCURRENCY
+        self._client = None
+        self._async_clients = weakref.WeakKeyDictionary()  # Event loop -> AsyncGroq
+        self._lock = threading.Lock()
+
+    def _limits(self):
+        return httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_connections,
+            keepalive_expiry=60
+        )
+
+    @property
+    def client(self):
+        if self._client is None:
+            from groq import Groq
+            with self._lock:
+                if self._client is None:
+                    self._client = Groq(
+                        api_key=self.api_key,
+                        max_retries=0,  # Retries are handled by the gateway
+                        timeout=Config.RESPONSE_TIMEOUT,
+                        http_client=httpx.Client(limits=self._limits())
+                    )
+        return self._client
+
+    @property
+    def async_client(self):
+        """The AsyncGroq client for the running event loop (its connections belong to that loop)"""
+        loop = asyncio.get_running_loop()
+        client = self._async_clients.get(loop)
+        if client is None:
+            from groq import AsyncGroq
+            with self._lock:
+                client = self._async_clients.get(loop)
+                if client is None:
+                    client = self._async_clients[loop] = AsyncGroq(
+                        api_key=self.api_key,
+                        max_retries=0,
+                        timeout=Config.RESPONSE_TIMEOUT,
+                        http_client=httpx.AsyncClient(limits=self._limits())
+                    )
+        return client
+
+    def create(self, messages, model, temperature, max_tokens, timeout):
+        response = self.client.chat.completions.create(
+            model=model,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            timeout=timeout
+        )
+        return self._to_response(response)
+
+    def create_stream(self, messages, model, temperature, max_tokens, timeout):
+        """Yield LLMResponse deltas; usage arrives on the last chunk"""
+        chunks = self.client.chat.completions.create(
+            model=model,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            timeout=timeout,
+            stream=True
+        )
+        for chunk in chunks:
+            text = chunk.choices[0].delta.content if chunk.choices else None
+            usage = getattr(getattr(chunk, 'x_groq', None), 'usage', None)
+            if text or usage is not None:
+                yield LLMResponse(
+                    text=text or '',
+                    prompt_tokens=getattr(usage, 'prompt_tokens', None),
+                    completion_tokens=getattr(usage, 'completion_tokens', None)
+                )
+
+    async def acreate(self, messages, model, temperature, max_tokens, timeout):
+        response = await self.async_client.chat.completions.create(
+            model=model,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            timeout=timeout
+        )
+        return self._to_response(response)
+
+    def _to_response(self, response):
+        usage = getattr(response, 'usage', None)
+        return LLMResponse(
+            text=response.choices[0].message.content or '',
+            prompt_tokens=getattr(usage, 'prompt_tokens', None),
+            completion_tokens=getattr(usage, 'completion_tokens', None)
+        )
+
+    @staticmethod
+    def is_retryable(error):
+        """429s, 5xx, timeouts and dropped connections are worth retrying"""
+        from groq import APIConnectionError, APIStatusError
+        if isinstance(error, APIStatusError):
+            return error.status_code == 429 or error.status_code >= 500
+        return isinstance(error, APIConnectionError)
+
+    @staticmethod
+    def retry_after(error):
+        """Server-requested delay in seconds, if any"""
+        response = getattr(error, 'response', None)
+        if response is None:
+            return None
+        try:
+            return float(response.headers.get('retry-after'))
+        except (TypeError, ValueError):
+            return None
+
+
+class StubBackend:
+    """Offline backend returning canned completions (tests, load runs)"""
+
+    name = 'stub'
+
+    def __init__(self, responder=None, latency=None):
+        self.responder = responder or self.default_responder
+        self.latency = Config.LLM_STUB_LATENCY if latency is None else latency
+
+    @staticmethod
+    def default_responder(messages):
+        prompt = messages[-1]['content']
+        if 'JSON' in prompt:
+            return '{}'
+        return 'Acha, ok sir. But how I will do this? Please explain slowly.'
+
+    def _respond(self, messages):
+        text = self.responder(messages)
+        prompt_chars = sum(len(m['content']) for m in messages)
+        return LLMResponse(
+            text=text,
+            prompt_tokens=prompt_chars // 4,
+            completion_tokens=len(text) // 4
+        )
+
+    def create(self, messages, model, temperature, max_tokens, timeout):
+        if self.latency:
+            time.sleep(self.latency)
+        return self._respond(messages)
+
+    def create_stream(self, messages, model, temperature, max_tokens, timeout):
+        """Yield the canned reply word by word, spreading the latency"""
+        response = self._respond(messages)
+        words = response.text.split(' ')
+        for i, word in enumerate(words):
+            if self.latency:
+                time.sleep(self.latency / len(words))
+            last = i == len(words) - 1
+            yield LLMResponse(
+                text=word if last else word + ' ',
+                prompt_tokens=response.prompt_tokens if last else None,
+                completion_tokens=response.completion_tokens if last else None
+            )
+
+    async def acreate(self, messages, model, temperature, max_tokens, timeout):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return self._respond(messages)
+
+    @staticmethod
+    def is_retryable(error):
+        return False
+
+    @staticmethod
+    def retry_after(error):
+        return None
+
+
+class LLMGateway:
+    """Shared entry point for every LLM call in the app.
+
+    Applies the per-call timeout, caps in-flight calls with a semaphore and
+    retries 429/5xx/connection failures with jittered exponential backoff.
+    Offers ``complete`` for request handlers, ``acomplete`` for asyncio and
+    ``stream`` for token-by-token output. The asyncio semaphore is kept per
+    event loop, so ``acomplete`` may be used from several loops at once.
+    """
+
+    def __init__(self, backend=None, max_concurrency=None, max_retries=None):
+        self.backend = backend or create_backend()
+        self.max_concurrency = max_concurrency or Config.LLM_MAX_CONCURRENCY
+        self.max_retries = Config.LLM_MAX_RETRIES if max_retries is None else max_retries
+        self._semaphore = threading.BoundedSemaphore(self.max_concurrency)
+        self._async_semaphores = weakref.WeakKeyDictionary()  # Event loop -> asyncio.Semaphore
+        self._lock = threading.Lock()
+
+    def complete(self, messages, temperature=None, max_tokens=None, model=None, timeout=None):
+        """Run a chat completion, blocking the calling thread"""
+        args = self._call_args(messages, temperature, max_tokens, model, timeout)
+        attempt = 0
+        while True:
+            start = time.perf_counter()
+            try:
+                with self._semaphore:
+                    response = self.backend.create(*args)
+                return self._record('complete', response._replace(latency_ms=(time.perf_counter() - start) * 1000))
+            except Exception as e:
+                if attempt >= self.max_retries or not self.backend.is_retryable(e):
+                    metrics.inc('llm_calls_total', mode='complete', outcome='error')
+                    raise
+                metrics.inc('llm_retries_total')
+                time.sleep(self._backoff(attempt, e))
+                attempt += 1
+
+    def stream(self, messages, temperature=None, max_tokens=None, model=None, timeout=None):
+        """Stream a chat completion; iterate the result for text deltas"""
+        return LLMStream(self, self._call_args(messages, temperature, max_tokens, model, timeout))
+
+    async def acomplete(self, messages, temperature=None, max_tokens=None, model=None, timeout=None):
+        """Run a chat completion without blocking the event loop"""
+        semaphore = self._async_semaphore()
+        args = self._call_args(messages, temperature, max_tokens, model, timeout)
+        attempt = 0
+        while True:
+            start = time.perf_counter()
+            try:
+                async with semaphore:
+                    response = await self.backend.acreate(*args)
+                return self._record('async', response._replace(latency_ms=(time.perf_counter() - start) * 1000))
+            except Exception as e:
+                if attempt >= self.max_retries or not self.backend.is_retryable(e):
+                    metrics.inc('llm_calls_total', mode='async', outcome='error')
+                    raise
+                metrics.inc('llm_retries_total')
+                await asyncio.sleep(self._backoff(attempt, e))
+                attempt += 1
+
+    def _async_semaphore(self):
+        loop = asyncio.get_running_loop()
+        semaphore = self._async_semaphores.get(loop)
+        if semaphore is None:
+            with self._lock:
+                semaphore = self._async_semaphores.get(loop)
+                if semaphore is None:
+                    semaphore = self._async_semaphores[loop] = asyncio.Semaphore(self.max_concurrency)
+        return semaphore
+
+    def _call_args(self, messages, temperature, max_tokens, model, timeout):
+        return (
+            messages,
+            model or Config.GROQ_MODEL,
+            Config.TEMPERATURE if temperature is None else temperature,
+            max_tokens or Config.MAX_TOKENS,
+            timeout or Config.RESPONSE_TIMEOUT
+        )
+
+    @staticmethod
+    def _record(mode, response):
+        """Count a successful call, its tokens and latency"""
+        metrics.inc('llm_calls_total', mode=mode, outcome='ok')
+        if response.prompt_tokens:
+            metrics.inc('llm_tokens_total', response.prompt_tokens, kind='prompt')
+        if response.completion_tokens:
+            metrics.inc('llm_tokens_total', response.completion_tokens, kind='completion')
+        metrics.stages.get('llm_call').observe(response.latency_ms)
+        return response
+
+    def _backoff(self, attempt, error):
+        """Full-jitter exponential backoff, honouring Retry-After when sent"""
+        retry_after = self.backend.retry_after(error)
+        if retry_after is not None:
+            return min(retry_after, Config.LLM_BACKOFF_MAX)
+        return random.uniform(0, min(Config.LLM_BACKOFF_BASE * 2 ** attempt, Config.LLM_BACKOFF_MAX))
+
+
+class LLMStream:
+    """Iterator over the text deltas of one streamed completion.
+
+    Once exhausted, ``response`` holds the full LLMResponse and
+    ``first_token_ms`` the time to the first delta. A failed attempt is
+    only retried if nothing has been yielded yet.
+    """
+
+    def __init__(self, gateway, args):
+        self.gateway = gateway
+        self.args = args
+        self.response = None
+        self.first_token_ms = None
+
+    def __iter__(self):
+        gateway = self.gateway
+        attempt = 0
+        while True:
+            start = time.perf_counter()
+            parts = []
+            prompt_tokens = completion_tokens = None
+            try:
+                with gateway._semaphore:
+                    for delta in gateway.backend.create_stream(*self.args):
+                        prompt_tokens = delta.prompt_tokens or prompt_tokens
+                        completion_tokens = delta.completion_tokens or completion_tokens
+                        if not delta.text:
+                            continue
+                        if self.first_token_ms is None:
+                            self.first_token_ms = (time.perf_counter() - start) * 1000
+                        parts.append(delta.text)
+                        yield delta.text
+                break
+            except Exception as e:
+                if parts or attempt >= gateway.max_retries or not gateway.backend.is_retryable(e):
+                    metrics.inc('llm_calls_total', mode='stream', outcome='error')
+                    raise
+                metrics.inc('llm_retries_total')
+                time.sleep(gateway._backoff(attempt, e))
+                attempt += 1
+
+        self.response = LLMResponse(
+            text=''.join(parts),
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+            latency_ms=(time.perf_counter() - start) * 1000
+        )
+        gateway._record('stream', self.response)
+
+
+def create_backend(name=None):
+    """Build the LLM backend configured in Config"""
+    name = name or Config.LLM_BACKEND
+    if name == 'groq':
+        return GroqBackend()
+    if name == 'stub':
+        return StubBackend()
+    raise ValueError(f'Unknown LLM backend: {name}')
+
+
+# Global instance
+llm_gateway = LLMGateway()
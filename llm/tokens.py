@@ -0,0 +1,16 @@
+import re
+
+# Words, numbers and individual punctuation marks
+_PIECE_RE = re.compile(r'\w+|[^\w\s]')
+
+
+def estimate_tokens(text):
+    """Rough local token count for budgeting prompts.
+
+    BPE vocabularies split long words into ~4 character pieces and give
+    most punctuation its own token; this tracks real counts closely enough
+    to budget prompt history without shipping a tokenizer.
+    """
+    if not text:
+        return 0
+    return sum((len(piece) + 3) // 4 for piece in _PIECE_RE.findall(text))
@@ -0,0 +1,7 @@
+from .conversation import Conversation, Turn, json_default
+from .intelligence import INTEL_KINDS, Intel, entity_keys, lookup_keys, normalize_entity
+
+__all__ = [
+    'Conversation', 'Turn', 'Intel', 'INTEL_KINDS', 'json_default',
+    'entity_keys', 'lookup_keys', 'normalize_entity'
+]
@@ -0,0 +1,154 @@
+import sys
+import time
+from collections.abc import Mapping
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional
+
+from .intelligence import Intel
+
+
+def _iso(timestamp: float) -> str:
+    return datetime.fromtimestamp(timestamp).isoformat()
+
+
+def _intern(value):
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+class Turn:
+    """One scammer message and the agent's reply.
+
+    The timestamp is an epoch float; ``turn['timestamp']`` and ``to_dict``
+    render it as the ISO string the API returns.
+    """
+
+    __slots__ = ('scammer', 'agent', 'timestamp')
+
+    def __init__(self, scammer: str, agent: str, timestamp: Optional[float] = None):
+        self.scammer = scammer
+        self.agent = agent
+        self.timestamp = time.time() if timestamp is None else timestamp
+
+    def __getitem__(self, key: str) -> str:
+        if key == 'scammer':
+            return self.scammer
+        if key == 'agent':
+            return self.agent
+        if key == 'timestamp':
+            return _iso(self.timestamp)
+        raise KeyError(key)
+
+    def get(self, key: str, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def to_dict(self) -> Dict[str, str]:
+        return {'scammer': self.scammer, 'agent': self.agent, 'timestamp': _iso(self.timestamp)}
+
+
+class Conversation(Mapping):
+    """A conversation held in process memory.
+
+    Reads like the conversation dict the API returns (``c['status']``,
+    ``c.get('extracted_intel')``) but stores turns as slotted ``Turn``
+    objects, timestamps as epoch floats, intel as an ``Intel`` and
+    interned status/scam_type strings. Fields outside the fixed set
+    (persona, detection, error, ...) live in ``extra``. Convert with
+    ``to_dict`` only when the conversation leaves the process.
+    """
+
+    __slots__ = ('id', 'history', 'extracted_intel', 'scam_type', 'created_at', 'status', 'extra')
+
+    _FIELDS = ('id', 'history', 'extracted_intel', 'scam_type', 'created_at', 'status')
+
+    def __init__(self, conv_id: str, status: str = 'active', created_at: Optional[float] = None):
+        self.id = conv_id
+        self.history: List[Turn] = []
+        self.extracted_intel = Intel()
+        self.scam_type: Optional[str] = None
+        self.created_at = time.time() if created_at is None else created_at
+        self.status = _intern(status)
+        self.extra: Optional[Dict[str, Any]] = None
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'Conversation':
+        """Rebuild from the ``to_dict`` shape (e.g. an archived record)"""
+        data = dict(data)
+        conversation = cls(data.pop('id'), status=data.pop('status', 'active'))
+        for turn in data.pop('history', ()):
+            timestamp = turn.get('timestamp')
+            conversation.add_turn(
+                turn.get('scammer', ''), turn.get('agent', ''),
+                datetime.fromisoformat(timestamp).timestamp() if timestamp else None
+            )
+        conversation.set(**data)
+        return conversation
+
+    def set(self, **fields) -> None:
+        """Assign top-level fields; unknown names go to ``extra``"""
+        for key, value in fields.items():
+            if key == 'status' or key == 'scam_type':
+                setattr(self, key, _intern(value))
+            elif key == 'extracted_intel':
+                self.extracted_intel = Intel.coerce(value)
+            elif key == 'created_at':
+                self.created_at = value if isinstance(value, float) else datetime.fromisoformat(value).timestamp()
+            elif key in ('id', 'history'):
+                raise KeyError(f'{key} cannot be set')
+            else:
+                if self.extra is None:
+                    self.extra = {}
+                self.extra[key] = value
+
+    def add_turn(self, scammer_msg: str, agent_msg: str, timestamp: Optional[float] = None) -> Turn:
+        turn = Turn(scammer_msg, agent_msg, timestamp)
+        self.history.append(turn)
+        return turn
+
+    @property
+    def created_at_iso(self) -> str:
+        return _iso(self.created_at)
+
+    def __getitem__(self, key: str):
+        if key == 'created_at':
+            return self.created_at_iso
+        if key in self._FIELDS:
+            return getattr(self, key)
+        if self.extra is not None and key in self.extra:
+            return self.extra[key]
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        yield from self._FIELDS
+        if self.extra:
+            yield from self.extra
+
+    def __len__(self) -> int:
+        return len(self._FIELDS) + len(self.extra or ())
+
+    def __repr__(self):
+        return f'Conversation({self.id!r}, status={self.status!r}, turns={len(self.history)})'
+
+    def to_dict(self, include_history: bool = True) -> Dict[str, Any]:
+        """The API's JSON shape"""
+        data = {'id': self.id}
+        if include_history:
+            data['history'] = [turn.to_dict() for turn in self.history]
+        data.update({
+            'extracted_intel': self.extracted_intel.to_dict(),
+            'scam_type': self.scam_type,
+            'created_at': self.created_at_iso,
+            'status': self.status
+        })
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+
+def json_default(value):
+    """``default=`` hook for json.dumps: serialise models on the way out"""
+    if isinstance(value, (Conversation, Turn, Intel)):
+        return value.to_dict()
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
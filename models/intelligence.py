@@ -0,0 +1,113 @@
+import re
+from collections.abc import Mapping
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+INTEL_KINDS = (
+    'upi_ids', 'bank_accounts', 'phone_numbers', 'urls',
+    'emails', 'ifsc_codes', 'payment_methods'
+)
+
+_NON_DIGITS = re.compile(r'\D+')
+_SPACES = re.compile(r'\s+')
+_LETTERS = re.compile(r'[A-Za-z@]')
+_NUMERIC_KINDS = ('bank_accounts', 'phone_numbers')
+
+
+def _phone(value: str) -> str:
+    digits = _NON_DIGITS.sub('', value)
+    # +91 98765 43210, 098765 43210 and 9876543210 are the same number
+    if len(digits) == 12 and digits.startswith('91') or len(digits) == 11 and digits.startswith('0'):
+        digits = digits[-10:]
+    return digits
+
+
+def _url(value: str) -> str:
+    value = value.strip().rstrip('.,;:!?)]}\'"').rstrip('/')
+    scheme, sep, rest = value.partition('://')
+    if not sep:
+        return value.lower()
+    host, slash, path = rest.partition('/')
+    return f'{scheme.lower()}://{host.lower()}{slash}{path}'
+
+
+_NORMALIZERS = {
+    'upi_ids': lambda v: v.strip().lower(),
+    'emails': lambda v: v.strip().lower(),
+    'bank_accounts': lambda v: _NON_DIGITS.sub('', v),
+    'phone_numbers': _phone,
+    'urls': _url,
+    'ifsc_codes': lambda v: v.strip().upper(),
+}
+
+
+def normalize_entity(kind: str, value) -> str:
+    """Canonical form of an extracted value, used as its index key ('' if unusable)"""
+    normalizer = _NORMALIZERS.get(kind)
+    if normalizer is None:
+        return _SPACES.sub(' ', str(value)).strip().lower()
+    return normalizer(str(value))
+
+
+def entity_keys(intel, kind: Optional[str] = None) -> List[Tuple[str, str]]:
+    """Distinct (kind, normalized value) pairs of an intel mapping"""
+    keys = {}
+    for item_kind, items in (intel or {}).items():
+        if kind is not None and item_kind != kind:
+            continue
+        for item in items or ():
+            value = normalize_entity(item_kind, item)
+            if value:
+                keys[item_kind, value] = None
+    return list(keys)
+
+
+def lookup_keys(value: str, kind: Optional[str] = None) -> List[Tuple[str, str]]:
+    """Index keys a raw query value could match: one per kind, or just ``kind``"""
+    kinds = INTEL_KINDS if kind is None else (kind,)
+    if kind is None and _LETTERS.search(value):
+        kinds = [k for k in kinds if k not in _NUMERIC_KINDS]  # 'winner2024@paytm' is not account 2024
+    keys = {}
+    for candidate in kinds:
+        normalized = normalize_entity(candidate, value)
+        if normalized:
+            keys[candidate, normalized] = None
+    return list(keys)
+
+
+class Intel(Mapping):
+    """Extracted entities per kind, read-only.
+
+    Values are kept as tuples (smaller than lists and safe to share);
+    reading it as a mapping or calling ``to_dict`` gives the usual
+    ``{kind: [values]}`` shape.
+    """
+
+    __slots__ = ('_items',)
+
+    def __init__(self, items: Optional[Dict[str, Iterable[str]]] = None):
+        self._items: Dict[str, Tuple[str, ...]] = {
+            kind: tuple(values) for kind, values in (items or {}).items()
+        }
+
+    @classmethod
+    def coerce(cls, value) -> 'Intel':
+        return value if isinstance(value, Intel) else cls(value)
+
+    def __getitem__(self, kind: str) -> Tuple[str, ...]:
+        return self._items[kind]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._items)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __repr__(self):
+        return f'Intel({self.to_dict()!r})'
+
+    def total(self) -> int:
+        """Entities across every kind"""
+        return sum(len(values) for values in self._items.values())
+
+    def to_dict(self) -> Dict[str, list]:
+        return {kind: list(values) for kind, values in self._items.items()}
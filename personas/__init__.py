@@ -1,3 +1,12 @@
-from .ramesh import RameshPersona
+from .base_persona import BasePersona
+from .registry import PersonaRegistry, UnknownPersona, persona_registry
 
-__all__ = ['RameshPersona']
\ No newline at end of file
+__all__ = ['BasePersona', 'PersonaRegistry', 'UnknownPersona', 'persona_registry', 'RameshPersona']
+
+
+def __getattr__(name):
+    # Persona classes are imported on demand so the registry stays lazy
+    if name == 'RameshPersona':
+        from .ramesh import RameshPersona
+        return RameshPersona
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
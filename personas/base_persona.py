@@ -1,16 +1,49 @@
+import logging
+import threading
+from collections import deque
+from functools import cached_property
+
+from config import Config
+from llm import estimate_tokens, llm_gateway
+from utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
 class BasePersona:
-    """Base class for all personas"""
-    
-    def __init__(self, name, age, occupation, location):
+    """Base class for all personas
+
+    The system prompt is rendered once per persona and sent as a fixed
+    system message, so the provider can cache the prompt prefix. History is
+    sent as chat turns, trimmed to a token budget rather than a turn count.
+    """
+
+    # Appended to the system prompt (kept constant so the prefix stays cacheable)
+    response_instructions = ""
+
+    # Reply used when the LLM call fails
+    fallback_response = "Sorry, I am not understanding. Can you please explain again?"
+
+    def __init__(self, name, age, occupation, location, llm=None):
         self.name = name
         self.age = age
         self.occupation = occupation
         self.location = location
-    
+        self.llm = llm or llm_gateway
+        self._metrics_lock = threading.Lock()
+        self._totals = {
+            'calls': 0,
+            'errors': 0,
+            'prompt_tokens': 0,
+            'completion_tokens': 0,
+            'latency_ms': 0.0
+        }
+        self.recent_calls = deque(maxlen=Config.PERSONA_METRICS_WINDOW)
+
     def get_system_prompt(self):
         """Return the system prompt for this persona"""
         raise NotImplementedError
-    
+
     def get_profile(self):
         """Return persona profile"""
         return {
@@ -18,4 +51,117 @@ class BasePersona:
             'age': self.age,
             'occupation': self.occupation,
             'location': self.location
-        }
\ No newline at end of file
+        }
+
+    @cached_property
+    def system_message(self):
+        """The rendered system message, built on first use"""
+        content = self.get_system_prompt()
+        if self.response_instructions:
+            content = f"{content}\n{self.response_instructions}"
+        return {'role': 'system', 'content': content}
+
+    @cached_property
+    def system_tokens(self):
+        return estimate_tokens(self.system_message['content'])
+
+    def trim_history(self, history, budget=None):
+        """Most recent whole turns whose estimated size fits the token budget"""
+        budget = Config.PERSONA_HISTORY_TOKEN_BUDGET if budget is None else budget
+        kept = []
+        used = 0
+        for turn in reversed(history or []):
+            cost = estimate_tokens(turn['scammer']) + estimate_tokens(turn['agent'])
+            if used + cost > budget:
+                break
+            kept.append(turn)
+            used += cost
+        kept.reverse()
+        return kept, used
+
+    def build_messages(self, scammer_message, conversation):
+        """Chat messages for one reply plus the estimated prompt size"""
+        history = conversation.get('history') if conversation else None
+        turns, history_tokens = self.trim_history(history)
+
+        messages = [self.system_message]
+        for turn in turns:
+            messages.append({'role': 'user', 'content': turn['scammer']})
+            messages.append({'role': 'assistant', 'content': turn['agent']})
+        messages.append({'role': 'user', 'content': scammer_message})
+
+        estimated = self.system_tokens + history_tokens + estimate_tokens(scammer_message)
+        return messages, estimated
+
+    @metrics.timed('persona_reply')
+    def generate_response(self, scammer_message, conversation, on_token=None):
+        """Generate the persona's reply to the scammer's latest message
+
+        With ``on_token`` the reply is streamed and each text delta is passed
+        to the callback as it arrives; the full reply is still returned.
+        """
+        messages, estimated_tokens = self.build_messages(scammer_message, conversation)
+        first_token_ms = None
+
+        try:
+            if on_token is None:
+                response = self.llm.complete(
+                    messages=messages,
+                    temperature=Config.TEMPERATURE,
+                    max_tokens=Config.MAX_TOKENS
+                )
+            else:
+                stream = self.llm.stream(
+                    messages=messages,
+                    temperature=Config.TEMPERATURE,
+                    max_tokens=Config.MAX_TOKENS
+                )
+                for text in stream:
+                    on_token(text)
+                response = stream.response
+                first_token_ms = stream.first_token_ms
+        except Exception as e:
+            logger.warning("Error generating response: %s", e, extra={'persona': self.name})
+            self._record_call(None, estimated_tokens)
+            metrics.inc('fallbacks_total', component='persona')
+            return self.fallback_response
+
+        self._record_call(response, estimated_tokens, first_token_ms)
+        return response.text.strip()
+
+    def get_metrics(self):
+        """Totals and averages over every LLM call this persona made"""
+        with self._metrics_lock:
+            totals = dict(self._totals)
+        calls = max(totals['calls'] - totals['errors'], 1)
+        return {
+            **totals,
+            'avg_prompt_tokens': totals['prompt_tokens'] / calls,
+            'avg_completion_tokens': totals['completion_tokens'] / calls,
+            'avg_latency_ms': totals['latency_ms'] / calls
+        }
+
+    def _record_call(self, response, estimated_tokens, first_token_ms=None):
+        """Record prompt/completion tokens and latency for one call"""
+        if response is None:
+            call = {'error': True, 'estimated_prompt_tokens': estimated_tokens}
+        else:
+            call = {
+                'error': False,
+                # Fall back to the local estimate when the provider omits usage
+                'prompt_tokens': response.prompt_tokens if response.prompt_tokens is not None else estimated_tokens,
+                'completion_tokens': response.completion_tokens or estimate_tokens(response.text),
+                'estimated_prompt_tokens': estimated_tokens,
+                'latency_ms': response.latency_ms,
+                'first_token_ms': first_token_ms
+            }
+
+        with self._metrics_lock:
+            self.recent_calls.append(call)
+            self._totals['calls'] += 1
+            if call['error']:
+                self._totals['errors'] += 1
+                return
+            self._totals['prompt_tokens'] += call['prompt_tokens']
+            self._totals['completion_tokens'] += call['completion_tokens']
+            self._totals['latency_ms'] += call['latency_ms']
@@ -1,18 +1,22 @@
 from .base_persona import BasePersona
-from groq import Groq
-from config import Config
 
 class RameshPersona(BasePersona):
     """Ramesh Kumar - Business owner persona"""
     
-    def __init__(self):
+    response_instructions = (
+        "Respond as Ramesh Kumar to the scammer's latest message. Keep it 1-2 sentences ONLY. "
+        "Show interest but confusion. Never agree immediately. Be natural."
+    )
+    fallback_response = "Sorry sir, I am not understanding. Can you please explain again?"
+    
+    def __init__(self, llm=None):
         super().__init__(
             name="Ramesh Kumar",
             age=52,
             occupation="Small Business Owner",
-            location="Mumbai"
+            location="Mumbai",
+            llm=llm
         )
-        self.client = Groq(api_key=Config.GROQ_API_KEY)
     
     def get_system_prompt(self):
         return """You are Ramesh Kumar, a 52-year-old small business owner from Mumbai, India.
@@ -57,37 +61,3 @@ GRAMMAR MISTAKES TO MAKE (naturally):
 - Redundant words: "Please tell me that thing"
 - Wrong prepositions: "I am in shop"
 """
-    
-    def generate_response(self, scammer_message, conversation):
-        """Generate response as Ramesh"""
-        
-        # Build conversation history
-        history_text = ""
-        if conversation and conversation.get('history'):
-            for turn in conversation['history'][-3:]:  # Last 3 turns for context
-                history_text += f"Scammer: {turn['scammer']}\nYou: {turn['agent']}\n\n"
-        
-        # Create prompt
-        prompt = f"""{self.get_system_prompt()}
-
-PREVIOUS CONVERSATION:
-{history_text if history_text else "[This is the first message]"}
-
-SCAMMER'S LATEST MESSAGE: 
-"{scammer_message}"
-
-Respond as Ramesh Kumar. Keep it 1-2 sentences ONLY. Show interest but confusion. Never agree immediately. Be natural."""
-
-        try:
-            response = self.client.chat.completions.create(
-                model=Config.GROQ_MODEL,
-                messages=[{"role": "user", "content": prompt}],
-                temperature=Config.TEMPERATURE,
-                max_tokens=Config.MAX_TOKENS
-            )
-            
-            return response.choices[0].message.content.strip()
-            
-        except Exception as e:
-            print(f"Error generating response: {e}")
-            return "Sorry sir, I am not understanding. Can you please explain again?"
\ No newline at end of file
@@ -0,0 +1,92 @@
+import importlib
+import pkgutil
+import threading
+
+from config import Config
+from llm import llm_gateway
+
+from .base_persona import BasePersona
+
+# Which persona engages which scam type (anything else gets DEFAULT_PERSONA)
+SCAM_TYPE_PERSONAS = {
+    'banking': 'sharma',
+    'tech_support': 'sharma',
+    'romance': 'sharma',
+    'lottery': 'sunita',
+    'payment_fraud': 'ramesh',
+    'job': 'priya',
+    'phishing': 'priya',
+}
+
+
+class UnknownPersona(KeyError):
+    """Raised when no persona module exists for a name"""
+
+
+class PersonaRegistry:
+    """Lazily loaded personas, keyed by module name.
+
+    A persona module is imported and its persona created only the first time
+    it is asked for, so unused personas cost nothing at startup. Every
+    persona shares the same LLM client.
+    """
+
+    def __init__(self, package='personas', llm=None, routes=None, default=None):
+        self.package = package
+        self.llm = llm or llm_gateway
+        self.routes = SCAM_TYPE_PERSONAS if routes is None else routes
+        self.default = default or Config.DEFAULT_PERSONA
+        self._personas = {}
+        self._lock = threading.Lock()
+
+    def available(self):
+        """Names of all persona modules in the package (nothing is imported)"""
+        package = importlib.import_module(self.package)
+        return sorted(
+            info.name for info in pkgutil.iter_modules(package.__path__)
+            if not info.ispkg and info.name not in ('base_persona', 'registry')
+        )
+
+    def get(self, name=None):
+        """The persona called ``name``, created on first use"""
+        name = name or self.default
+        persona = self._personas.get(name)
+        if persona is None:
+            with self._lock:
+                persona = self._personas.get(name)
+                if persona is None:
+                    persona = self._load(name)(llm=self.llm)
+                    self._personas[name] = persona
+        return persona
+
+    def name_for(self, scam_type):
+        return self.routes.get(scam_type, self.default)
+
+    def for_scam_type(self, scam_type):
+        """The persona routed to engage ``scam_type``"""
+        return self.get(self.name_for(scam_type))
+
+    def loaded(self):
+        return sorted(self._personas)
+
+    def get_metrics(self):
+        """Per-persona LLM call metrics, for personas that have been loaded"""
+        return {name: persona.get_metrics() for name, persona in list(self._personas.items())}
+
+    def _load(self, name):
+        try:
+            module = importlib.import_module(f'{self.package}.{name}')
+        except ModuleNotFoundError as e:
+            if e.name != f'{self.package}.{name}':
+                raise
+            raise UnknownPersona(name) from None
+
+        for value in vars(module).values():
+            if (isinstance(value, type) and issubclass(value, BasePersona)
+                    and value.__module__ == module.__name__):
+                return value
+        raise UnknownPersona(name)
+
+
+# Global instance
+persona_registry = PersonaRegistry()
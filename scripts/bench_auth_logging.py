@@ -0,0 +1,172 @@
+"""Authenticated-endpoint throughput: print() debugging vs structured queue logging.
+
+Drives a small authenticated endpoint through the Flask test client with
+several threads, writing all output to a pipe drained by a child process
+(like gunicorn's captured, flushed stdout). Each variant runs twice: once
+against the bare pipe and once with every flush delayed by --flush-us
+microseconds, modelling a log collector or disk that is slow to accept
+writes. Variants:
+
+  legacy prints   the old require_api_key: five flushed print() calls per request
+  no request log  the current require_api_key, nothing logged on success
+  queue logging   current decorator plus one INFO access log per request,
+                  handed to the background writer via QueueHandler
+  sync logging    same access log, but written by a StreamHandler inline
+
+Usage: python scripts/bench_auth_logging.py [--requests 10000] [--threads 8] [--flush-us 200] [--repeat 3]
+"""
+import argparse
+import io
+import logging
+import logging.handlers
+import os
+import queue
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import wraps
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Measure logging only; rate limiting would turn most requests into 429s
+os.environ.setdefault('RATE_LIMIT_BACKEND', 'none')
+
+from flask import Flask, jsonify, request
+
+from config import Config
+from utils.auth import require_api_key
+from utils.log import DroppingQueueHandler, JsonFormatter, RedactingFilter
+
+
+API_KEY = Config.API_KEY.strip()
+
+
+def legacy_require_api_key(f):
+    """The decorator as it was, prints included"""
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        api_key = request.headers.get('X-API-Key', '').strip()
+        print(f"🔍 Received API key: '{api_key}'", flush=True)
+        print(f"🔍 Received key length: {len(api_key)}", flush=True)
+        print(f"🔍 Expected API key: '{API_KEY}'", flush=True)
+        print(f"🔍 Expected key length: {len(API_KEY)}", flush=True)
+        print(f"🔍 Match: {api_key == API_KEY}", flush=True)
+        if api_key != API_KEY:
+            return jsonify({'error': 'Invalid API key'}), 403
+        return f(*args, **kwargs)
+    return decorated_function
+
+
+def make_app(decorator, access_log=None):
+    app = Flask(__name__)
+
+    @app.route('/item/<item_id>')
+    @decorator
+    def item(item_id):
+        if access_log is not None:
+            access_log.info("request served", extra={'path': request.path, 'item_id': item_id})
+        return jsonify({'status': 'success', 'id': item_id})
+
+    return app
+
+
+def output_handler(sink):
+    handler = logging.StreamHandler(sink)
+    handler.addFilter(RedactingFilter([API_KEY]))
+    handler.setFormatter(JsonFormatter())
+    return handler
+
+
+class SlowSink(io.TextIOBase):
+    """Text stream whose flush (one write syscall) blocks for a fixed delay"""
+
+    def __init__(self, stream, delay):
+        self.stream = stream
+        self.delay = delay
+
+    def writable(self):
+        return True
+
+    def write(self, text):
+        return self.stream.write(text)
+
+    def flush(self):
+        if self.delay:
+            time.sleep(self.delay)
+        self.stream.flush()
+
+
+def run(app, requests, threads):
+    local = threading.local()
+    headers = {'X-API-Key': API_KEY}
+
+    def call(i):
+        if not hasattr(local, 'client'):
+            local.client = app.test_client()
+        return local.client.get(f'/item/{i}', headers=headers).status_code
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(threads) as pool:
+        statuses = list(pool.map(call, range(requests)))
+    elapsed = time.perf_counter() - start
+    assert all(s == 200 for s in statuses)
+    return requests / elapsed
+
+
+def bench(sink, requests, threads, repeat):
+    """Best-of-``repeat`` req/s for each variant, all output going to ``sink``"""
+    def best(app):
+        return max(run(app, requests, threads) for _ in range(repeat))
+
+    results = {}
+    real_stdout = sys.stdout
+    sys.stdout = sink
+    try:
+        results['legacy prints'] = best(make_app(legacy_require_api_key))
+    finally:
+        sys.stdout = real_stdout
+
+    results['no request log'] = best(make_app(require_api_key))
+
+    access_log = logging.getLogger('bench.access')
+    access_log.setLevel(logging.INFO)
+    access_log.propagate = False
+
+    queue_handler = DroppingQueueHandler(queue.Queue(maxsize=requests * repeat))
+    listener = logging.handlers.QueueListener(queue_handler.queue, output_handler(sink))
+    listener.start()
+    access_log.handlers = [queue_handler]
+    results['queue logging'] = best(make_app(require_api_key, access_log))
+    listener.stop()
+
+    access_log.handlers = [output_handler(sink)]
+    results['sync logging'] = best(make_app(require_api_key, access_log))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--requests', type=int, default=10000)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--flush-us', type=int, default=200)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    drain = subprocess.Popen(['cat'], stdin=subprocess.PIPE, stdout=subprocess.DEVNULL)
+    pipe = io.TextIOWrapper(drain.stdin, line_buffering=True)
+
+    for label, sink in (('pipe', pipe), (f'pipe + {args.flush_us}us per flush', SlowSink(pipe, args.flush_us / 1e6))):
+        results = bench(sink, args.requests, args.threads, args.repeat)
+        baseline = results['legacy prints']
+        print(f'\n{label}:')
+        for name, per_sec in results.items():
+            print(f'  {name:<15}: {per_sec:>9,.0f} req/s  ({per_sec / baseline:.2f}x)')
+
+    pipe.close()
+    drain.wait()
+
+
+if __name__ == '__main__':
+    main()
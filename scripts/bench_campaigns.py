@@ -0,0 +1,94 @@
+"""Campaign clustering benchmark: throughput and quality at scale.
+
+Generates --campaigns synthetic scam templates (plus the simulator's
+scripted messages), streams --messages template variants through
+CampaignClusterer.assign and reports per-chunk assignment time, which
+should stay flat as campaigns accumulate, as well as how well clusters match
+the true templates (purity: share of messages in their cluster's majority
+template; fragmentation: clusters per template).
+
+Usage: python scripts/bench_campaigns.py [--messages 200000] [--campaigns 2000]
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from collections import Counter, defaultdict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from detection.campaigns import CampaignClusterer
+from simulator.dialogues import DEFAULT_CORPUS_PATH, campaign_variables
+
+VOCAB = (
+    'urgent account blocked kyc update verify prize winner lottery refund customs parcel '
+    'police case arrest aadhaar pan card bank sbi hdfc icici officer manager job offer '
+    'salary daily task review hotel rating earn bonus investment crypto double money '
+    'loan approved instant credit limit electricity bill disconnect tonight pay fee '
+    'processing charge transfer immediately call whatsapp click link secure claim today '
+    'sir madam dear customer congratulations selected lucky draw reward cashback offer'
+).split()
+GREETINGS = ['Dear customer,', 'Hello sir,', 'Namaste ji,', 'URGENT:', 'Hi,']
+SLOTS = ['{upi}', '{phone}', '{url}', 'Rs {fee}', 'Rs {amount}', 'ID {id}']
+
+
+def templates(count, rng):
+    """The simulator's scripted messages plus random synthetic ones"""
+    with open(DEFAULT_CORPUS_PATH, encoding='utf-8') as f:
+        scripts = json.load(f)['scripts']
+    found = [s['opening'] for s in scripts]
+    found += [node['message'] for s in scripts for node in s['nodes'].values()]
+    while len(found) < count:
+        words = rng.choices(VOCAB, k=rng.randint(12, 30))
+        for slot in rng.sample(SLOTS, 2):
+            words.insert(rng.randrange(len(words)), slot)
+        found.append(' '.join(words))
+    return found
+
+
+def variant(template, rng):
+    words = template.format(**campaign_variables(rng)).split()
+    if rng.random() < 0.5:
+        words.insert(0, rng.choice(GREETINGS))
+    if rng.random() < 0.3 and len(words) > 8:
+        del words[rng.randrange(len(words))]
+    return ' '.join(words)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--messages', type=int, default=200000)
+    parser.add_argument('--campaigns', type=int, default=2000)
+    parser.add_argument('--chunks', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    pool = templates(args.campaigns, rng)
+    clusterer = CampaignClusterer(max_campaigns=max(args.campaigns * 4, 1000))
+    members = defaultdict(Counter)
+    chunk = args.messages // args.chunks
+
+    print(f'{args.messages:,} messages from {len(pool):,} templates')
+    print(f'{"messages":>10}  {"campaigns":>10}  {"us/message":>11}')
+    for n in range(args.chunks):
+        messages = [(t, variant(pool[t], rng)) for t in (rng.randrange(len(pool)) for _ in range(chunk))]
+        start = time.perf_counter()
+        for template, message in messages:
+            members[clusterer.assign(message)][template] += 1
+        elapsed = time.perf_counter() - start
+        print(f'{(n + 1) * chunk:>10,}  {len(members):>10,}  {elapsed / chunk * 1e6:>11.1f}')
+
+    total = sum(sum(c.values()) for c in members.values())
+    purity = sum(c.most_common(1)[0][1] for c in members.values()) / total
+    per_template = Counter(c.most_common(1)[0][0] for c in members.values())
+    stats = clusterer.stats(top=1)
+    print(f'\npurity {purity:.4f}; {len(per_template):,} templates found, '
+          f'{len(members) / max(len(per_template), 1):.2f} clusters per template')
+    print(f'assigned: {stats["assigned"]}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,268 @@
+"""Local scam classifier benchmark: accuracy, LLM calls saved and throughput.
+
+Builds a synthetic labelled set from the simulator's scripted scam
+messages, the scam templates below and benign messages (bank alerts,
+deliveries, family and work chat), with fresh names, numbers and links
+per variant. --novel of the templates are held out entirely; the model
+trains on variants of the rest. Two test sets are scored separately:
+fresh variants of the known templates (repeat campaigns, the bulk of
+honeypot traffic) and variants of the novel templates (wordings the model
+never saw). For each the report covers:
+
+* quality (accuracy, ROC AUC, share decided outside the uncertain band);
+* LLM detection calls through ScamDetector.detect_batch with and without
+  the classifier (the LLM is a counting stand-in that answers with the
+  true label);
+* prediction throughput by batch size, and model file size / load time.
+
+Synthetic templates are a stand-in for real traffic: train the production
+model with scripts/train_classifier.py on LLM-labelled messages.
+
+Usage: python scripts/bench_classifier.py [--variants 40] [--bits 18] [--out report.json]
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from detection.classifier import ScamClassifier, evaluate, train
+from detection.detector import ScamDetector
+from llm.gateway import LLMResponse
+from simulator.dialogues import DEFAULT_CORPUS_PATH, campaign_variables
+
+SCAM_TEMPLATES = [
+    "Hello dear, I am HR from {company}. We have part time work from home, earn {amount} daily by liking videos. Interested?",
+    "Your parcel is held at customs, pay clearance charges of Rs {fee} at {url} to release it today.",
+    "Dear user your electricity connection will be disconnected tonight at 9.30 pm as last month bill was not updated. Contact officer {phone}",
+    "Hi mom, my phone broke, this is my new number. Can you send Rs {fee} urgently, I will explain later.",
+    "This is {name} from the cyber crime cell. A case is registered against your Aadhaar, call {phone} immediately to avoid arrest.",
+    "Get a pre approved personal loan of Rs {amount} at 0% interest, no documents needed. Apply now {url}",
+    "Your SIM card will be blocked in 24 hours due to pending KYC. Call {phone} to update.",
+    "Invest Rs {fee} in our crypto plan and get double returns in 7 days. Guaranteed profit! Join {url}",
+    "Hello sir, I am calling from {company} customer care. Your refund of Rs {amount} is pending, share the OTP you received to process it.",
+    "Congrats! You are selected for a free iPhone in our anniversary offer. Pay only delivery charges Rs {fee} at {url}",
+    "Sir I am army officer posted at border, want to buy your sofa listed on OLX. Send your QR code, I will pay Rs {amount} advance.",
+    "Your Netflix membership is on hold. Update payment details within 24 hours at {url} to continue watching.",
+    "Dear customer, your {bank} credit card reward points worth Rs {amount} expire today. Redeem now: {url}",
+    "Madam your son is arrested by police in a drugs case. Transfer Rs {amount} to {upi} now if you want him released quietly.",
+    "Income tax refund of Rs {amount} has been approved. Verify your account number at {url} to receive it.",
+    "We noticed unusual login on your account. If this was not you, share your details with our security team at {phone}.",
+    "Earn Rs {amount} per day just by rating hotels on Google. Task based job, joining bonus Rs {fee}. WhatsApp {phone}",
+    "Your FASTag KYC is incomplete and the tag will be deactivated. Complete KYC here {url}",
+    "Dear winner, your mobile number won {amount} in the international lottery. Send your name, address and processing fee of Rs {fee}.",
+    "I am a doctor working in UK, I have sent you a gift parcel with dollars. Pay customs duty Rs {fee} to {upi} to receive it.",
+    "Hurry! Only few slots left in our trading group, members made {amount} profit this week. Join now {url}",
+    "Your gas connection subsidy is pending. Fill the form at {url} and pay Rs {fee} registration charge.",
+    "Hello, I accidentally sent Rs {amount} to your UPI. Please return it to {upi}, it was for my mother's hospital bill.",
+    "Your PAN card is linked to suspicious transactions. Our officer will call you on video, do not disconnect or you will be arrested.",
+    "Dear student, you are eligible for a government scholarship of Rs {amount}. Pay Rs {fee} verification fee to {upi}.",
+    "Your account has been credited with a cashback of Rs {amount}. Click {url} and enter UPI PIN to receive.",
+    "Free recharge of Rs {fee} for all users on the occasion of elections. Claim from {url}",
+    "I saw your profile, I am a fund manager and can grow your savings 3x in a month. Start with just Rs {fee}.",
+    "Sir your insurance policy bonus of Rs {amount} is ready for release. Pay GST of Rs {fee} first, call {phone}.",
+    "Your courier could not be delivered due to incomplete address. Update it here within 12 hours {url}",
+    "Work from home opportunity! Copy paste job, weekly payment Rs {amount}. Registration fee Rs {fee} only.",
+    "Dear customer your {bank} debit card is blocked. Please share card number and CVV to unblock immediately.",
+    "Electricity department: your meter is due for update, pay Rs {fee} today or power will be cut. Contact {phone}",
+    "Hi, I got your number from a friend. I make good money from an app, want me to show you how? {url}",
+    "This is TRAI. Your number will be suspended in 2 hours because of illegal activity. Press 9 to talk to the officer.",
+]
+
+BENIGN_TEMPLATES = [
+    "Hi {name}, are we still meeting for lunch at {time} tomorrow?",
+    "Your order #{id} from {company} has been shipped and will be delivered by {day}.",
+    "Rs {amount} debited from your {bank} account XX{last4} on {date}. Not you? Call the number on the back of your card.",
+    "Mom, I reached the hostel safely. Will call you tonight after dinner.",
+    "Reminder: your dentist appointment is on {day} at {time}. Reply C to confirm.",
+    "{otp} is your OTP for login. Do not share it with anyone. {bank} never asks for your OTP.",
+    "Can you pick up milk and bread on the way back home?",
+    "The meeting has been moved to {time}, conference room 2. Please bring the quarterly numbers.",
+    "Happy birthday {name}! Have a wonderful year ahead.",
+    "Your electricity bill of Rs {fee} for {month} is generated. Due date {date}. Pay via the official app or website.",
+    "Thanks for shopping with us! Your invoice for order #{id} is attached.",
+    "Hey, did you watch the match yesterday? What a finish!",
+    "Your cab is arriving in 4 minutes. Driver {name}, vehicle number ending {last4}.",
+    "Salary of Rs {amount} credited to your account XX{last4}. Available balance updated.",
+    "Please send me the notes from today's class when you get a chance.",
+    "Your appointment for passport verification is confirmed for {date} at {time} at the local police station.",
+    "Dad's medicines are over, I will get them from the pharmacy near the office.",
+    "Your {company} subscription renews on {date}. Manage it anytime in the app settings.",
+    "Good morning! Don't forget we have the parent teacher meeting on {day}.",
+    "I transferred Rs {fee} for the dinner split, check your account.",
+    "Flight {flight} to Delhi is delayed by 40 minutes. New departure time {time}.",
+    "Your complaint #{id} has been resolved. Rate our service in the app.",
+    "Hi {name}, the plumber will come at {time}, can someone be at home?",
+    "Your library book is due on {date}. Renew online to avoid late fees.",
+    "Congratulations on your promotion! Let's celebrate this weekend.",
+    "Can we reschedule our call to {day}? Something urgent came up at work.",
+    "Your {bank} credit card statement for {month} is ready. Minimum due Rs {fee} by {date}.",
+    "We are out of rice, please order some from the grocery app.",
+    "The society maintenance for {month} is Rs {fee}. Please pay to the secretary by {date}.",
+    "Your package was delivered and handed to the security guard at {time}.",
+    "Bro, send me the photos from the trip.",
+    "Your vaccination certificate is available for download on the official portal.",
+    "Thank you for your payment of Rs {fee}. Your recharge is successful, validity 28 days.",
+    "The train is running 20 minutes late, I will reach the station by {time}.",
+    "Team, please submit your timesheets before {day} evening.",
+    "Your gym membership expires on {date}. Visit the front desk to renew.",
+    "Grandma is asking when you are visiting next. Call her when free.",
+    "Your refund of Rs {amount} for order #{id} has been processed to the original payment method.",
+    "Please find the revised quotation attached. Let me know if you have questions.",
+    "Hi, this is {name} from the school office. Tomorrow is a holiday due to heavy rain.",
+    "Your table for 4 at {company} is booked for {day} {time}.",
+    "Did you lock the car? I can't find the keys.",
+    "The electrician fixed the fan, paid him Rs {fee}.",
+    "Your account password was changed successfully. If this wasn't you, reset it from the app.",
+    "Please call me when you are free, need to discuss the rent agreement.",
+    "Exam results will be announced on {date} on the university website.",
+    "Your {company} order is out for delivery. Track it in the app.",
+    "Our sprint review is at {time}. Demo links are in the team channel.",
+    "Auntie is coming to stay with us for a week from {day}.",
+    "Loan EMI of Rs {fee} will be auto debited on {date} from account XX{last4}.",
+]
+
+NAMES = ['Rahul', 'Priya', 'Amit', 'Sneha', 'Vikram', 'Anjali', 'Ravi', 'Pooja', 'Arjun', 'Neha']
+COMPANIES = ['Amazon', 'Flipkart', 'Swiggy', 'Zomato', 'Myntra', 'Paytm', 'Airtel', 'Jio', 'Meesho']
+BANKS = ['SBI', 'HDFC', 'ICICI', 'Axis', 'Kotak', 'PNB']
+DAYS = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+MONTHS = ['January', 'March', 'June', 'August', 'October', 'December']
+GREETINGS = ['Hi,', 'Hello,', 'Dear customer,', 'Sir,', 'Namaste,', 'Good morning,']
+
+
+class CountingLLM:
+    """Stand-in LLM answering detection prompts with the true label"""
+
+    def __init__(self, labels):
+        self.labels = labels
+        self.calls = 0
+
+    def complete(self, messages, **kwargs):
+        self.calls += 1
+        message = messages[-1]['content'].split('Message: "', 1)[1].split('"\n', 1)[0]
+        is_scam = self.labels[message]
+        verdict = {'is_scam': is_scam, 'confidence': 0.9,
+                   'scam_type': 'fraud' if is_scam else 'none', 'reasoning': 'label'}
+        return LLMResponse(text=json.dumps(verdict), prompt_tokens=0, completion_tokens=0)
+
+
+def variant(template, rng):
+    values = campaign_variables(rng)
+    values.update(
+        name=rng.choice(NAMES), company=rng.choice(COMPANIES), bank=rng.choice(BANKS),
+        day=rng.choice(DAYS), month=rng.choice(MONTHS), time=f'{rng.randint(1, 12)}:{rng.choice(["00", "15", "30", "45"])} pm',
+        date=f'{rng.randint(1, 28)}/{rng.randint(1, 12)}', last4=f'{rng.randint(0, 9999):04d}',
+        otp=f'{rng.randint(0, 999999):06d}', flight=f'6E {rng.randint(100, 999)}'
+    )
+    words = template.format(**values).split()
+    if rng.random() < 0.3:
+        words.insert(0, rng.choice(GREETINGS))
+    if rng.random() < 0.3 and len(words) > 8:
+        del words[rng.randrange(len(words))]
+    return ' '.join(words)
+
+
+def dataset(variants, novel, seed):
+    """(train, known test, novel test) lists of (message, is_scam)"""
+    with open(DEFAULT_CORPUS_PATH, encoding='utf-8') as f:
+        scripts = json.load(f)['scripts']
+    scams = [s['opening'] for s in scripts] + [n['message'] for s in scripts for n in s['nodes'].values()]
+    templates = [(t, True) for t in scams + SCAM_TEMPLATES] + [(t, False) for t in BENIGN_TEMPLATES]
+    rng = random.Random(seed)
+    rng.shuffle(templates)
+    cut = int(len(templates) * (1 - novel))
+
+    def expand(group, count):
+        rows = [(variant(t, rng), label) for t, label in group for _ in range(count)]
+        rng.shuffle(rows)
+        return rows
+    return (expand(templates[:cut], variants), expand(templates[:cut], max(variants // 4, 1)),
+            expand(templates[cut:], max(variants // 4, 1)))
+
+
+def llm_calls(model, rows):
+    """LLM calls and accuracy of detect_batch over rows, without and with the model"""
+    truth = dict(rows)
+    found = {}
+    for name, classifier in (('without', None), ('with', model)):
+        llm = CountingLLM(truth)
+        detector = ScamDetector(verdict_cache=None, llm=llm, campaigns=None, classifier=classifier)
+        results = detector.detect_batch([m for m, _ in rows])
+        found[name] = {
+            'llm_calls': llm.calls,
+            'accuracy': round(sum(r['is_scam'] == y for r, (_, y) in zip(results, rows)) / len(rows), 4)
+        }
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--variants', type=int, default=40, help='training messages per template')
+    parser.add_argument('--novel', type=float, default=0.2, help='share of templates held out')
+    parser.add_argument('--bits', type=int, default=18)
+    parser.add_argument('--epochs', type=int, default=8)
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--out', help='also write the report as JSON')
+    args = parser.parse_args()
+
+    train_rows, known_rows, novel_rows = dataset(args.variants, args.novel, args.seed)
+    start = time.perf_counter()
+    trained = train([m for m, _ in train_rows], [y for _, y in train_rows], bits=args.bits,
+                    epochs=args.epochs, seed=args.seed)
+    train_seconds = time.perf_counter() - start
+
+    path = os.path.join(tempfile.mkdtemp(prefix='scam_classifier_'), 'model.bin')
+    trained.save(path)
+    start = time.perf_counter()
+    model = ScamClassifier.load(path)
+    load_ms = (time.perf_counter() - start) * 1000
+
+    tests = {}
+    for name, rows in (('known templates', known_rows), ('novel templates', novel_rows)):
+        tests[name] = evaluate(model, [m for m, _ in rows], [y for _, y in rows])
+        tests[name]['detect_batch'] = llm_calls(model, rows)
+
+    messages = [m for m, _ in known_rows + novel_rows]
+    throughput = {}
+    for size in (1, 64, 1024):
+        batches = [messages[i:i + size] for i in range(0, min(len(messages), size * 50), size)]
+        start = time.perf_counter()
+        for batch in batches:
+            model.predict_proba(batch)
+        throughput[size] = round(sum(map(len, batches)) / (time.perf_counter() - start))
+
+    report = {
+        'train': {'messages': len(train_rows), 'seconds': round(train_seconds, 2)},
+        'test': tests,
+        'messages_per_second': throughput,
+        'model': {'bytes': os.path.getsize(path), 'load_ms': round(load_ms, 2)}
+    }
+    os.remove(path)
+
+    print(f'trained on {len(train_rows):,} messages in {train_seconds:.1f}s')
+    for name, quality in tests.items():
+        calls = quality['detect_batch']
+        without, with_model = calls['without']['llm_calls'], calls['with']['llm_calls']
+        print(f'\n{name}: {quality["examples"]:,} messages')
+        print(f'  accuracy {quality["accuracy"]}, precision {quality["precision"]}, '
+              f'recall {quality["recall"]}, ROC AUC {quality["roc_auc"]}')
+        print(f'  band {quality["band"]}: {quality["decided_rate"]:.1%} decided locally at '
+              f'{quality["decided_accuracy"]} accuracy; {quality["scams_cleared"]} scams cleared, '
+              f'{quality["false_alarms"]} false alarms')
+        print(f'  detect_batch LLM calls: {without:,} without the model, {with_model:,} with it '
+              f'({without / max(with_model, 1):.1f}x fewer); accuracy '
+              f'{calls["without"]["accuracy"]} -> {calls["with"]["accuracy"]}')
+    print('\npredict_proba messages/s by batch size: '
+          + ', '.join(f'{size}: {rate:,}' for size, rate in throughput.items()))
+    print(f'model file {report["model"]["bytes"] / 1024:.0f} KiB, loaded in {load_ms:.2f} ms')
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
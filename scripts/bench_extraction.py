@@ -0,0 +1,104 @@
+"""Benchmark: full re-extraction every turn vs incremental extraction sessions.
+
+Replays a synthetic N-turn conversation the way autonomous_engage does and
+counts LLM calls, characters scanned by the regexes and wall time. The AI
+pass is stubbed; --llm-latency simulates the round trip.
+
+Usage: python scripts/bench_extraction.py [--turns 50] [--llm-latency 0.0]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from extraction.extractor import IntelligenceExtractor
+
+SCAMMER_LINES = [
+    "Sir please hurry! Send Rs {n}000 processing fee to winner{n}@paytm to claim your prize.",
+    "Just send your bank account number and IFSC code. Our account is {acct}, IFSC SBIN0{n:06d}.",
+    "Click this link: http://fake-lottery-claim-{n}.com/verify or call me at 98765{n:05d}.",
+    "No need to ask your son sir, this is 100% government approved. Offer expires today!",
+]
+AGENT_LINES = [
+    "Really sir? But how I will get the money? Please explain slowly.",
+    "My son knows computer, let me ask him first. What is this fee for?",
+    "Acha, thik hai. Which bank you are from sir?",
+]
+
+
+class CountingExtractor(IntelligenceExtractor):
+    """Extractor with the LLM stubbed out and work counters attached"""
+
+    def __init__(self, llm_latency):
+        self.llm_latency = llm_latency
+        self.llm_calls = 0
+        self.chars_scanned = 0
+
+    def _regex_extraction(self, text):
+        self.chars_scanned += len(text)
+        return super()._regex_extraction(text)
+
+    def _ai_extraction(self, text):
+        self.llm_calls += 1
+        time.sleep(self.llm_latency)
+        return {}
+
+
+def make_history(turns):
+    return [
+        {
+            'scammer': SCAMMER_LINES[i % len(SCAMMER_LINES)].format(n=i, acct=10 ** 11 + i),
+            'agent': AGENT_LINES[i % len(AGENT_LINES)],
+            'timestamp': '2026-01-28T10:30:00',
+        }
+        for i in range(turns)
+    ]
+
+
+def run_full(history, llm_latency):
+    extractor = CountingExtractor(llm_latency)
+    conversation = {'history': []}
+    start = time.perf_counter()
+    for turn in history:
+        conversation['history'].append(turn)
+        extractor.extract(conversation)
+    result = extractor.extract(conversation)
+    return extractor, time.perf_counter() - start, result
+
+
+def run_incremental(history, llm_latency):
+    extractor = CountingExtractor(llm_latency)
+    conversation = {'history': []}
+    start = time.perf_counter()
+    session = extractor.start_session()
+    for turn in history:
+        conversation['history'].append(turn)
+        session.update(conversation)
+    result = session.finalize(conversation)
+    return extractor, time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--turns', type=int, default=50)
+    parser.add_argument('--llm-latency', type=float, default=0.0)
+    args = parser.parse_args()
+
+    history = make_history(args.turns)
+    full, full_time, full_result = run_full(history, args.llm_latency)
+    inc, inc_time, inc_result = run_incremental(history, args.llm_latency)
+
+    same = {k: sorted(v) for k, v in full_result.items()} == {k: sorted(v) for k, v in inc_result.items()}
+    print(f"{'✅' if same else '❌'} Final intel identical: {same}")
+    print(f"{'':24}{'full re-scan':>16}{'incremental':>16}")
+    print(f"{'LLM calls':24}{full.llm_calls:>16,}{inc.llm_calls:>16,}")
+    print(f"{'Regex chars scanned':24}{full.chars_scanned:>16,}{inc.chars_scanned:>16,}")
+    print(f"{'Wall time (ms)':24}{full_time * 1000:>16.1f}{inc_time * 1000:>16.1f}")
+    if not same:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
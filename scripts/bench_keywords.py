@@ -0,0 +1,107 @@
+"""Micro-benchmark: per-keyword substring scans vs the compiled keyword matcher.
+
+Usage: python scripts/bench_keywords.py [--messages 20000] [--repeat 3]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from detection.detector import ScamDetector
+from detection.keywords import (
+    HIGH_CONFIDENCE_KEYWORDS,
+    SCAM_KEYWORDS,
+    SCAM_TYPES,
+    SPECIAL_PATTERNS,
+)
+
+TEMPLATES = [
+    "Congratulations! You won Rs {amount} in the lucky draw. Send processing fee to {name}@paytm to claim prize.",
+    "Dear customer your SBI bank account will be blocked today. Update KYC immediately at http://sbi-kyc-{n}.in",
+    "URGENT: Your account is suspended. Verify your details within 24 hours or call {phone}.",
+    "Hi {name}, are we still meeting for lunch tomorrow?",
+    "Work from home job offer! Earn money part time, {amount} rupees per day. Contact us on WhatsApp {phone}.",
+    "Your Microsoft computer has a virus. Call technical support now at {phone}.",
+    "Your order #{n} has been shipped and will arrive on Monday.",
+    "Transfer Rs {amount} to account number {acct} IFSC SBIN0001234 to reactivate your payment wallet.",
+    "Hello dear, I feel lonely. Would you like dating? I love long talks.",
+    "You have won rupees {amount}! Click here: http://claim-{n}.xyz before it expires today.",
+]
+NAMES = ['rahul', 'priya', 'winner2024', 'amit.k', 'refund-desk', 'sunita']
+
+
+def legacy_keyword_check(message):
+    """The original implementation: one substring scan per keyword"""
+    message_lower = message.lower()
+    high_matches = sum(1 for kw in HIGH_CONFIDENCE_KEYWORDS if kw in message_lower)
+    all_matches = sum(1 for kw in SCAM_KEYWORDS if kw in message_lower)
+    score = min((high_matches * 0.3) + (all_matches * 0.15), 0.9)
+
+    scam_type = None
+    for stype, keywords in SCAM_TYPES.items():
+        if any(kw in message_lower for kw in keywords):
+            scam_type = stype
+            break
+
+    if any(p in message_lower for p in SPECIAL_PATTERNS['payment_handle']):
+        score = max(score, 0.8)
+        scam_type = scam_type or 'payment_fraud'
+
+    if any(p in message_lower for p in SPECIAL_PATTERNS['prize_claim']):
+        score = max(score, 0.8)
+        scam_type = 'lottery'
+
+    return score, scam_type
+
+
+def make_corpus(size, seed=42):
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(size):
+        corpus.append(rng.choice(TEMPLATES).format(
+            amount=rng.randint(100, 10_000_000),
+            name=rng.choice(NAMES),
+            n=rng.randint(1, 99999),
+            phone=f"9{rng.randint(100000000, 999999999)}",
+            acct=rng.randint(10 ** 10, 10 ** 14),
+        ))
+    return corpus
+
+
+def throughput(fn, corpus, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for message in corpus:
+            fn(message)
+        best = min(best, time.perf_counter() - start)
+    return len(corpus) / best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--messages', type=int, default=20000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    corpus = make_corpus(args.messages)
+    detector = ScamDetector.__new__(ScamDetector)  # keyword path only, no LLM client
+
+    mismatches = [m for m in corpus if legacy_keyword_check(m) != detector._keyword_check(m)]
+    if mismatches:
+        print(f"❌ {len(mismatches)} messages scored differently, e.g. {mismatches[0]!r}")
+        sys.exit(1)
+    print(f"✅ Identical scores on {len(corpus)} messages")
+
+    before = throughput(legacy_keyword_check, corpus, args.repeat)
+    after = throughput(detector._keyword_check, corpus, args.repeat)
+    print(f"Legacy substring scans : {before:12,.0f} msg/s")
+    print(f"Compiled matcher       : {after:12,.0f} msg/s")
+    print(f"Speedup                : {after / before:12.2f}x")
+
+
+if __name__ == '__main__':
+    main()
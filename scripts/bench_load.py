@@ -0,0 +1,352 @@
+"""End-to-end load benchmark for the honeypot API.
+
+Starts the local scammer simulator and the app (gunicorn by default) with
+the stub LLM backend, drives a weighted mix of /api/process-message,
+/api/autonomous-engage, /api/stats and /api/conversations at a fixed
+concurrency, and reports throughput, p50/p95/p99 latency per endpoint and
+the server's resident memory. Results are written as JSON so runs can be
+compared:
+
+    python scripts/bench_load.py --concurrency 32 --duration 30
+    python scripts/bench_load.py --server flask --output bench_results/flask.json
+    python scripts/bench_load.py --compare bench_results/before.json
+
+--url http://host:port targets an already running app instead (no
+processes are started and memory is not sampled). Rate limiting is
+switched off for the spawned app; other settings (STORE_BACKEND, ...)
+are taken from the environment.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import httpx
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from simulator.dialogues import DialogueCorpus
+
+API_KEY = os.getenv('API_KEY', 'scam-honeypot-secret-key-12345')
+ENDPOINTS = ('process', 'engage', 'stats', 'conversations')
+BENIGN = ['Hi, are we still meeting for lunch tomorrow?', 'Your order has been delivered.',
+          'Happy birthday! Have a great day.', 'Meeting moved to 4 pm, see you there.']
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def rss_mb(pid):
+    """Resident memory of a process and its children, from /proc (Linux only)"""
+    children = {}
+    try:
+        for entry in os.listdir('/proc'):
+            if entry.isdigit():
+                with open(f'/proc/{entry}/stat') as f:
+                    ppid = int(f.read().rsplit(')', 1)[1].split()[1])
+                children.setdefault(ppid, []).append(int(entry))
+    except OSError:
+        return None
+
+    total_kb, stack = 0, [pid]
+    while stack:
+        current = stack.pop()
+        stack.extend(children.get(current, []))
+        try:
+            with open(f'/proc/{current}/status') as f:
+                for line in f:
+                    if line.startswith('VmRSS:'):
+                        total_kb += int(line.split()[1])
+        except OSError:
+            pass
+    return round(total_kb / 1024, 1)
+
+
+def wait_ready(url, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            if httpx.get(url, timeout=1).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f'{url} did not come up within {timeout}s')
+
+
+def start_servers(args, workdir):
+    """Launch the simulator and the app; returns (base_url, app_process, processes)"""
+    sim_port, app_port = free_port(), free_port()
+    log = open(os.path.join(workdir, 'servers.log'), 'w')
+    simulator = subprocess.Popen(
+        [sys.executable, '-m', 'simulator.server', '--port', str(sim_port),
+         '--latency-ms', str(args.scammer_latency_ms), '--jitter-ms', str(args.scammer_latency_ms / 4),
+         '--concurrency', '512'],
+        cwd=ROOT, stdout=log, stderr=log
+    )
+
+    env = dict(os.environ,
+               LLM_BACKEND='stub',
+               LLM_STUB_LATENCY=str(args.llm_latency_ms / 1000),
+               MOCK_SCAMMER_API_URL=f'http://127.0.0.1:{sim_port}',
+               RATE_LIMIT_BACKEND='none',
+               LOG_LEVEL=os.getenv('LOG_LEVEL', 'warning'))
+    env.setdefault('STORE_PATH', os.path.join(workdir, 'conversations.db'))
+    env.setdefault('VERDICT_CACHE_PATH', os.path.join(workdir, 'verdict_cache.db'))
+
+    if args.server == 'gunicorn':
+        command = [sys.executable, '-m', 'gunicorn', '-b', f'127.0.0.1:{app_port}',
+                   '-w', str(args.workers), '--threads', str(args.threads),
+                   '-k', 'gthread', '--keep-alive', '60', 'app:app']
+    else:
+        command = [sys.executable, '-m', 'flask', '--app', 'app', 'run',
+                   '--port', str(app_port), '--with-threads', '--no-reload', '--no-debugger']
+    app = subprocess.Popen(command, cwd=ROOT, env=env, stdout=log, stderr=log)
+
+    base_url = f'http://127.0.0.1:{app_port}'
+    wait_ready(f'http://127.0.0.1:{sim_port}/health')
+    wait_ready(f'{base_url}/api/health')
+    return base_url, app, [app, simulator]
+
+
+class LoadRun:
+    """Drives the endpoint mix from ``concurrency`` workers and records latencies"""
+
+    def __init__(self, base_url, mix, concurrency, engage_turns, seed):
+        self.base_url = base_url
+        self.endpoints = [name for name in ENDPOINTS if mix.get(name)]
+        self.weights = [mix[name] for name in self.endpoints]
+        self.concurrency = concurrency
+        self.engage_turns = engage_turns
+        self.rng = random.Random(seed)
+        self.scam_messages = [script['opening'].format_map(_Placeholder())
+                              for script in DialogueCorpus.load().scripts]
+        self.samples = {name: [] for name in self.endpoints}
+        self.errors = {name: 0 for name in self.endpoints}
+
+    def request_for(self, endpoint):
+        headers = {'X-API-Key': API_KEY}
+        if endpoint == 'process':
+            text = self.rng.choice(self.scam_messages if self.rng.random() < 0.8 else BENIGN)
+            return 'POST', '/api/process-message', {
+                'sessionId': f'bench_{self.rng.randrange(10 ** 6)}',
+                'message': {'sender': 'scammer', 'text': text, 'timestamp': int(time.time() * 1000)},
+                'conversationHistory': []
+            }, {}
+        if endpoint == 'engage':
+            return 'POST', '/api/autonomous-engage', {
+                'initial_message': self.rng.choice(self.scam_messages),
+                'max_turns': self.engage_turns
+            }, headers
+        if endpoint == 'stats':
+            return 'GET', '/api/stats', None, headers
+        return 'GET', '/api/conversations?limit=20', None, headers
+
+    async def worker(self, client, deadline, record_after):
+        while time.perf_counter() < deadline:
+            endpoint = self.rng.choices(self.endpoints, self.weights)[0]
+            method, path, body, headers = self.request_for(endpoint)
+            start = time.perf_counter()
+            try:
+                response = await client.request(method, path, json=body, headers=headers)
+                ok = response.status_code < 400
+            except httpx.HTTPError:
+                ok = False
+            if start >= record_after:
+                self.samples[endpoint].append(time.perf_counter() - start)
+                if not ok:
+                    self.errors[endpoint] += 1
+
+    async def run(self, duration, warmup):
+        limits = httpx.Limits(max_connections=self.concurrency, max_keepalive_connections=self.concurrency)
+        async with httpx.AsyncClient(base_url=self.base_url, limits=limits, timeout=120) as client:
+            start = time.perf_counter()
+            record_after = start + warmup
+            deadline = record_after + duration
+            await asyncio.gather(*[self.worker(client, deadline, record_after)
+                                   for _ in range(self.concurrency)])
+            return time.perf_counter() - record_after
+
+
+class _Placeholder(dict):
+    """Fills corpus templates with plausible fixed values"""
+
+    def __missing__(self, key):
+        return {'amount': '10,00,000', 'phone': '9876543210', 'upi': 'winner@paytm',
+                'url': 'http://claim-prize.in/verify'}.get(key, '1234')
+
+
+def summarize(latencies, errors, elapsed):
+    if not latencies:
+        return {'requests': 0, 'errors': errors}
+    ordered = sorted(latencies)
+
+    def pct(p):
+        return round(ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))] * 1000, 2)
+
+    return {
+        'requests': len(ordered),
+        'errors': errors,
+        'throughput_rps': round(len(ordered) / elapsed, 1),
+        'mean_ms': round(sum(ordered) / len(ordered) * 1000, 2),
+        'p50_ms': pct(50),
+        'p95_ms': pct(95),
+        'p99_ms': pct(99),
+        'max_ms': round(ordered[-1] * 1000, 2)
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_report(result, baseline=None):
+    print(f"\n{'endpoint':<15}{'req':>8}{'err':>6}{'rps':>9}{'p50':>9}{'p95':>9}{'p99':>9}  (ms)")
+    for name, stats in result['endpoints'].items():
+        if not stats['requests']:
+            continue
+        line = (f"{name:<15}{stats['requests']:>8}{stats['errors']:>6}{stats['throughput_rps']:>9}"
+                f"{stats['p50_ms']:>9}{stats['p95_ms']:>9}{stats['p99_ms']:>9}")
+        before = (baseline or {}).get('endpoints', {}).get(name)
+        if before and before.get('requests'):
+            line += (f"   vs baseline: rps {_delta(stats['throughput_rps'], before['throughput_rps'])}"
+                     f", p99 {_delta(stats['p99_ms'], before['p99_ms'])}")
+        print(line)
+    memory = result['memory']
+    if memory.get('peak_mb') is not None:
+        print(f"\nServer RSS: start {memory['start_mb']} MB, peak {memory['peak_mb']} MB, "
+              f"end {memory['end_mb']} MB")
+
+
+def _delta(now, before):
+    return f'{(now - before) / before * 100:+.1f}%' if before else 'n/a'
+
+
+async def sample_memory(pid, samples, stop):
+    while not stop.is_set():
+        samples.append(rss_mb(pid))
+        try:
+            await asyncio.wait_for(stop.wait(), 0.5)
+        except asyncio.TimeoutError:
+            pass
+
+
+async def run_with_memory(load, args, app_pid):
+    samples, stop = [], asyncio.Event()
+    sampler = asyncio.create_task(sample_memory(app_pid, samples, stop)) if app_pid else None
+    elapsed = await load.run(args.duration, args.warmup)
+    stop.set()
+    if sampler:
+        await sampler
+    return elapsed, [s for s in samples if s is not None]
+
+
+def parse_mix(text):
+    mix = {}
+    for part in text.split(','):
+        name, _, weight = part.partition('=')
+        if name not in ENDPOINTS:
+            raise argparse.ArgumentTypeError(f'unknown endpoint {name!r}; choose from {", ".join(ENDPOINTS)}')
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--server', choices=['gunicorn', 'flask'], default='gunicorn')
+    parser.add_argument('--url', help='benchmark a running app instead of starting one')
+    parser.add_argument('--workers', type=int, default=2, help='gunicorn workers')
+    parser.add_argument('--threads', type=int, default=16, help='gunicorn threads per worker')
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--duration', type=float, default=20, help='measured seconds')
+    parser.add_argument('--warmup', type=float, default=3, help='unmeasured seconds first')
+    parser.add_argument('--mix', type=parse_mix, default='process=70,engage=5,stats=10,conversations=15')
+    parser.add_argument('--engage-turns', type=int, default=3)
+    parser.add_argument('--llm-latency-ms', type=float, default=200, help='stub LLM time per reply')
+    parser.add_argument('--scammer-latency-ms', type=float, default=50, help='simulator time per reply')
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--output', help='result JSON (default bench_results/load_<time>.json)')
+    parser.add_argument('--compare', help='earlier result JSON to diff against')
+    args = parser.parse_args()
+
+    processes, app_pid = [], None
+    with tempfile.TemporaryDirectory(prefix='honeypot_bench_') as workdir:
+        try:
+            if args.url:
+                base_url = args.url.rstrip('/')
+            else:
+                base_url, app, processes = start_servers(args, workdir)
+                app_pid = app.pid
+
+            start_mb = rss_mb(app_pid) if app_pid else None
+            load = LoadRun(base_url, args.mix, args.concurrency, args.engage_turns, args.seed)
+            print(f'Running {args.duration:.0f}s against {base_url} at concurrency {args.concurrency}...')
+            elapsed, memory = asyncio.run(run_with_memory(load, args, app_pid))
+            end_mb = rss_mb(app_pid) if app_pid else None
+        finally:
+            for process in processes:
+                process.terminate()
+            for process in processes:
+                try:
+                    process.wait(timeout=10)
+                except subprocess.TimeoutExpired:
+                    process.kill()
+
+    endpoints = {name: summarize(load.samples[name], load.errors[name], elapsed) for name in load.endpoints}
+    all_latencies = [s for samples in load.samples.values() for s in samples]
+    result = {
+        'meta': {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'commit': git_commit(),
+            'python': platform.python_version(),
+            'server': 'external' if args.url else args.server,
+            'workers': args.workers if args.server == 'gunicorn' and not args.url else 1,
+            'threads': args.threads if args.server == 'gunicorn' and not args.url else None,
+            'concurrency': args.concurrency,
+            'duration_s': round(elapsed, 2),
+            'mix': args.mix,
+            'engage_turns': args.engage_turns,
+            'llm_latency_ms': args.llm_latency_ms,
+            'scammer_latency_ms': args.scammer_latency_ms
+        },
+        'endpoints': endpoints,
+        'total': summarize(all_latencies, sum(load.errors.values()), elapsed),
+        'memory': {
+            'start_mb': start_mb,
+            'peak_mb': max(memory + [end_mb or 0]) if memory else None,
+            'end_mb': end_mb
+        }
+    }
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    print_report(result, baseline)
+
+    output = args.output or os.path.join(
+        ROOT, 'bench_results', f"load_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(result, f, indent=2)
+    print(f'\nSaved {output}')
+
+
+if __name__ == '__main__':
+    main()
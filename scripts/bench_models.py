@@ -0,0 +1,125 @@
+"""Memory benchmark: dict conversations vs the compact models in models/.
+
+Fills a store with --turns turns (in conversations of --turns-per-conv),
+once with the original dict layout (ISO timestamp strings per turn) and
+once with ConversationStore's Conversation/Turn/Intel models, each in a
+fresh subprocess, and reports resident memory per 100k turns. Runs with
+unique message text per turn (realistic) and with shared text, which
+isolates the per-turn structure cost.
+
+Usage: python scripts/bench_models.py [--turns 300000] [--turns-per-conv 6]
+"""
+import argparse
+import gc
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from datetime import datetime
+from functools import partial
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+SCAMMER = "Sir please hurry! Send Rs {n} processing fee to winner{n}@paytm to claim your prize."
+AGENT = "Really sir? But how I will get the money? Please explain slowly, turn {n}."
+STATUSES = ['completed', 'completed', 'completed', 'failed', 'active']
+SCAM_TYPES = ['lottery', 'banking', 'payment_fraud', 'tech_support', 'job']
+
+
+def rss_mb():
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith('VmRSS:'):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def fill_dicts(turns, per_conv, text, rng):
+    """The original in-memory layout: nested dicts, ISO timestamp strings"""
+    conversations = {}
+    for start in range(0, turns, per_conv):
+        conv_id = f'conv_{start:08x}'
+        conversation = {
+            'id': conv_id, 'history': [], 'extracted_intel': {},
+            'scam_type': None, 'created_at': datetime.now().isoformat(), 'status': 'active'
+        }
+        for n in range(start, min(start + per_conv, turns)):
+            conversation['history'].append({
+                'scammer': text(SCAMMER, n), 'agent': text(AGENT, n),
+                'timestamp': datetime.now().isoformat()
+            })
+        # Values decoded from JSON / LLM output are fresh (non-interned) strings
+        conversation.update(json.loads(json.dumps({
+            'status': rng.choice(STATUSES), 'scam_type': rng.choice(SCAM_TYPES),
+            'extracted_intel': {'upi_ids': [f'winner{start}@paytm'], 'phone_numbers': []}
+        })))
+        conversations[conv_id] = conversation
+    return conversations
+
+
+def fill_models(store, turns, per_conv, text, rng):
+    for start in range(0, turns, per_conv):
+        conv_id = f'conv_{start:08x}'
+        store.create(conv_id)
+        for n in range(start, min(start + per_conv, turns)):
+            store.add_turn(conv_id, text(SCAMMER, n), text(AGENT, n))
+        store.update(conv_id, **json.loads(json.dumps({
+            'status': rng.choice(STATUSES), 'scam_type': rng.choice(SCAM_TYPES),
+            'extracted_intel': {'upi_ids': [f'winner{start}@paytm'], 'phone_numbers': []}
+        })))
+    return store
+
+
+def child(layout, turns, per_conv, unique):
+    """Measure one layout in this (fresh) process and print JSON"""
+    rng = random.Random(1)
+    shared = {SCAMMER: SCAMMER.format(n=0), AGENT: AGENT.format(n=0)}
+    text = (lambda template, n: template.format(n=n)) if unique else (lambda template, n: shared[template])
+    if layout == 'models':
+        from storage.memory_store import ConversationStore  # import cost outside the measurement
+        fill = partial(fill_models, ConversationStore())
+    else:
+        fill = fill_dicts
+    gc.collect()
+    before = rss_mb()
+    start = time.perf_counter()
+    data = fill(turns, per_conv, text, rng)
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    used = rss_mb() - before
+    print(json.dumps({'mb': used, 'seconds': elapsed}))
+    del data
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--turns', type=int, default=300000)
+    parser.add_argument('--turns-per-conv', type=int, default=6)
+    parser.add_argument('--child', nargs=2, metavar=('LAYOUT', 'TEXT'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child[0], args.turns, args.turns_per_conv, args.child[1] == 'unique')
+        return
+
+    per_100k = 100000 / args.turns
+    print(f'{args.turns:,} turns, {args.turns_per_conv} per conversation; RSS per 100k turns')
+    for text in ('unique', 'shared'):
+        results = {}
+        for layout in ('dicts', 'models'):
+            out = subprocess.check_output([
+                sys.executable, os.path.abspath(__file__), '--turns', str(args.turns),
+                '--turns-per-conv', str(args.turns_per_conv), '--child', layout, text
+            ], text=True)
+            results[layout] = json.loads(out)
+        dicts, models = results['dicts'], results['models']
+        print(f'\n{text} message text:')
+        for name, r in (('dict layout', dicts), ('compact models', models)):
+            print(f'  {name:<15}: {r["mb"] * per_100k:7.1f} MB  (filled in {r["seconds"]:.2f}s)')
+        print(f'  saving         : {(1 - models["mb"] / dicts["mb"]) * 100:.0f}%')
+
+
+if __name__ == '__main__':
+    main()
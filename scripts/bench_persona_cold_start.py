@@ -0,0 +1,83 @@
+"""Cold-start benchmark: lazy persona registry vs importing every persona.
+
+Generates a throwaway package of N persona modules (copies of Ramesh) and,
+for each N, starts a fresh interpreter that brings up one persona and
+renders its system message. "lazy" goes through PersonaRegistry, "eager"
+imports and instantiates every persona up front like a static registry
+would. Bytecode caching is disabled so each run pays the full import cost.
+
+Usage: python scripts/bench_persona_cold_start.py [--counts 4,64,512] [--runs 5]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = r'''
+import importlib, json, resource, sys, time
+sys.path[:0] = [sys.argv[1], sys.argv[2]]
+start = time.perf_counter()
+from personas.registry import PersonaRegistry
+mode, count = sys.argv[3], int(sys.argv[4])
+if mode == 'lazy':
+    registry = PersonaRegistry(package='bench_personas')
+    persona = registry.get('p0')
+else:
+    personas = {}
+    for i in range(count):
+        module = importlib.import_module(f'bench_personas.p{i}')
+        personas[f'p{i}'] = module.BenchPersona()
+    persona = personas['p0']
+persona.system_message
+elapsed = (time.perf_counter() - start) * 1000
+rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+print(json.dumps({'ms': elapsed, 'rss_mb': rss}))
+'''
+
+
+def make_package(base, count):
+    with open(os.path.join(ROOT, 'personas', 'ramesh.py')) as f:
+        source = f.read().replace('from .base_persona', 'from personas.base_persona')
+        source = source.replace('class RameshPersona', 'class BenchPersona')
+
+    package = os.path.join(base, 'bench_personas')
+    os.makedirs(package)
+    open(os.path.join(package, '__init__.py'), 'w').close()
+    for i in range(count):
+        with open(os.path.join(package, f'p{i}.py'), 'w') as f:
+            f.write(source)
+
+
+def run_child(base, mode, count):
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE='1', LLM_BACKEND='stub')
+    out = subprocess.run(
+        [sys.executable, '-c', CHILD, ROOT, base, mode, str(count)],
+        env=env, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--counts', default='4,64,512')
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'personas':>8}  {'mode':<5}  {'median ms':>9}  {'max rss MB':>10}")
+    for count in (int(c) for c in args.counts.split(',')):
+        with tempfile.TemporaryDirectory() as base:
+            make_package(base, count)
+            for mode in ('lazy', 'eager'):
+                results = [run_child(base, mode, count) for _ in range(args.runs)]
+                ms = statistics.median(r['ms'] for r in results)
+                rss = max(r['rss_mb'] for r in results)
+                print(f'{count:>8}  {mode:<5}  {ms:>9.1f}  {rss:>10.1f}')
+
+
+if __name__ == '__main__':
+    main()
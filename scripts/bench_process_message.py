@@ -0,0 +1,147 @@
+"""Benchmark /api/process-message: legacy if/elif chain vs compiled rule table.
+
+Checks that the rule table gives the same scam flag and reply as the old
+handler on a generated corpus and times reply selection alone. It then
+repeats the timing with a larger generated table (--rules) against a
+per-keyword ``in`` loop, since the single scan pays off as tables grow.
+Finally it drives the full Flask handler through the test client and
+prints the endpoint's p50/p95/p99 from the latency histogram.
+
+Usage: python scripts/bench_process_message.py [--messages 20000] [--requests 20000] [--rules 200]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api.quick_reply import REPLY_RULES, SCAM_FLAG_KEYWORDS, QuickReplyEngine
+
+FILLER = ['sir', 'please', 'your', 'today', 'immediately', 'dear', 'customer', 'rs', '5000',
+          'hello', 'kindly', 'share', 'details', 'number', 'team', 'support', 'now']
+TRIGGERS = sorted({kw for rule in REPLY_RULES for kw in rule['keywords']} | set(SCAM_FLAG_KEYWORDS)
+                  | {'payments', 'callback', 'Blocked', 'BANKING', 'linked', 'upi@paytm'})
+
+
+def legacy_reply(message):
+    """The original handler's selection logic, kept verbatim for comparison"""
+    msg = message.lower()
+    scam_keywords = [
+        'blocked', 'verify', 'urgent', 'account',
+        'bank', 'otp', 'prize', 'lottery',
+        'upi', 'paytm', 'payment', 'money'
+    ]
+    is_scam = any(k in msg for k in scam_keywords)
+    if 'blocked' in msg or 'suspended' in msg:
+        reply = "Oh no! My account blocked? But sir, I not do anything wrong."
+    elif 'verify' in msg:
+        reply = "Verify again? But I already did KYC."
+    elif 'bank' in msg:
+        reply = "Which bank sir? I have SBI only."
+    elif 'prize' in msg or 'lottery' in msg:
+        reply = "Really? I won? I not remember applying."
+    elif 'upi' in msg or 'paytm' in msg:
+        reply = "UPI I not know properly. My son handles phone."
+    elif 'urgent' in msg:
+        reply = "So urgent? I am busy now."
+    elif 'link' in msg:
+        reply = "Link? Please explain slowly."
+    elif 'call' in msg:
+        reply = "Is this official number sir?"
+    elif 'pay' in msg or 'money' in msg:
+        reply = "Why I need to pay money?"
+    else:
+        reply = "Sir, please explain again."
+    return is_scam, reply
+
+
+def make_corpus(n, rng):
+    corpus = []
+    for _ in range(n):
+        words = rng.choices(FILLER, k=rng.randint(4, 30))
+        for _ in range(rng.randint(0, 3)):
+            words.insert(rng.randrange(len(words) + 1), rng.choice(TRIGGERS))
+        corpus.append(' '.join(words))
+    return corpus
+
+
+def naive_responder(rules, scam_keywords, default_reply):
+    """Data-driven but unscanned: one ``in`` check per keyword, rule by rule"""
+    def respond(message):
+        msg = message.lower()
+        is_scam = any(k in msg for k in scam_keywords)
+        for rule in rules:
+            if any(k in msg for k in rule['keywords']):
+                return is_scam, rule['reply']
+        return is_scam, default_reply
+    return respond
+
+
+def make_rules(n, rng):
+    letters = 'abcdefghijklmnopqrstuvwxyz'
+    rules = list(REPLY_RULES)
+    while len(rules) < n:
+        keywords = [''.join(rng.choices(letters, k=rng.randint(5, 9))) for _ in range(3)]
+        rules.append({'name': f'rule{len(rules)}', 'keywords': keywords, 'reply': f'reply {len(rules)}'})
+    return rules
+
+
+def rate(fn, corpus):
+    start = time.perf_counter()
+    for message in corpus:
+        fn(message)
+    elapsed = time.perf_counter() - start
+    return len(corpus) / elapsed, elapsed / len(corpus) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--messages', type=int, default=20000)
+    parser.add_argument('--requests', type=int, default=20000)
+    parser.add_argument('--rules', type=int, default=200)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    corpus = make_corpus(args.messages, rng)
+    engine = QuickReplyEngine()
+
+    mismatches = [m for m in corpus if engine.respond(m) != legacy_reply(m)]
+    if mismatches:
+        print(f'❌ {len(mismatches)} mismatches, e.g. {mismatches[0]!r}')
+        sys.exit(1)
+    print(f'✅ Identical flag and reply on {len(corpus)} messages')
+
+    for name, fn in (('Legacy if/elif chain', legacy_reply), ('Compiled rule table', engine.respond)):
+        per_sec, us = rate(fn, corpus)
+        print(f'{name:<22}: {per_sec:>12,.0f} msg/s  ({us:.2f} us/msg)')
+
+    rules = make_rules(args.rules, rng)
+    big_engine = QuickReplyEngine(rules=rules)
+    naive = naive_responder(rules, SCAM_FLAG_KEYWORDS, big_engine.default_reply)
+    assert all(big_engine.respond(m) == naive(m) for m in corpus)
+    print(f'\nWith {len(rules)} rules:')
+    for name, fn in (('Per-keyword in loop', naive), ('Compiled rule table', big_engine.respond)):
+        per_sec, us = rate(fn, corpus)
+        print(f'{name:<22}: {per_sec:>12,.0f} msg/s  ({us:.2f} us/msg)')
+
+    from app import app
+    from utils.latency import endpoint_latency
+
+    client = app.test_client()
+    payloads = [{'sessionId': 'bench', 'message': {'sender': 'scammer', 'text': m}}
+                for m in corpus[:args.requests]]
+    start = time.perf_counter()
+    for payload in payloads:
+        client.post('/api/process-message', json=payload)
+    elapsed = time.perf_counter() - start
+
+    snap = endpoint_latency.get('process_message').snapshot()
+    print(f'\nFull handler via test client: {len(payloads) / elapsed:,.0f} req/s (one thread)')
+    print(f"Handler latency: p50 {snap['p50_ms']:.3f} ms  p95 {snap['p95_ms']:.3f} ms  "
+          f"p99 {snap['p99_ms']:.3f} ms  max {snap['max_ms']:.3f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,142 @@
+"""Retention benchmark: resident memory under sustained inserts.
+
+Writes --conversations finished conversations (--turns turns each) into a
+memory store, once keeping everything in memory and once with a
+compressed archive (STORE_MAX_RESIDENT=--max-resident), each in a fresh
+subprocess. RSS is sampled every --sample-every conversations; with the
+archive it should level off once the resident limit is reached. Eviction
+runs on the store's sweeper thread, which a tight insert loop outruns, so
+every max_resident / 2 inserts the loop waits for it to catch up (as a
+server's slower request rate would). Every
+conversation is then read back and checked, and get() latency is
+reported for resident and archived ones.
+
+Usage: python scripts/bench_retention.py [--conversations 100000] [--max-resident 5000]
+"""
+import argparse
+import gc
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+SCAMMER = "Sir please hurry! Send Rs {n} processing fee to winner{n}@paytm to claim your prize."
+AGENT = "Really sir? But how I will get the money? Please explain slowly, turn {n}."
+
+
+def rss_mb():
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith('VmRSS:'):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def child(mode, conversations, turns, max_resident, sample_every):
+    """Fill one store in this (fresh) process and print JSON"""
+    from storage.archive import ConversationArchive
+    from storage.memory_store import ConversationStore
+
+    directory = tempfile.mkdtemp(prefix='honeypot_archive_')
+    archive = ConversationArchive(directory) if mode == 'archive' else None
+    store = ConversationStore(archive=archive, idle_ttl=3600, max_resident=max_resident,
+                              sweep_interval=3600)
+    gc.collect()
+    base = rss_mb()
+    samples = []
+    settle_every = max(max_resident // 2, 1)
+
+    def settle():
+        deadline = time.monotonic() + 10
+        while len(store.conversations) > max_resident and time.monotonic() < deadline:
+            time.sleep(0.001)
+
+    start = time.perf_counter()
+    for i in range(conversations):
+        conv_id = f'conv_{i:08x}'
+        store.create(conv_id)
+        for n in range(turns):
+            store.add_turn(conv_id, SCAMMER.format(n=i * turns + n), AGENT.format(n=i * turns + n))
+        store.update(conv_id, scam_type='lottery', status='completed',
+                     extracted_intel={'upi_ids': [f'winner{i}@paytm']})
+        if archive is not None and (i + 1) % settle_every == 0:
+            settle()
+        if (i + 1) % sample_every == 0:
+            samples.append([i + 1, round(rss_mb() - base, 1)])
+    fill_seconds = time.perf_counter() - start
+
+    # Every conversation must still be retrievable, resident or archived
+    rng = random.Random(1)
+    missing = 0
+    for i in range(conversations):
+        conversation = store.get(f'conv_{i:08x}')
+        if conversation is None or len(conversation['history']) != turns:
+            missing += 1
+    stats = store.get_stats()
+
+    def get_us(ids):
+        begin = time.perf_counter()
+        for conv_id in ids:
+            store.get(conv_id)
+        return (time.perf_counter() - begin) / len(ids) * 1e6
+
+    recent = [f'conv_{i:08x}' for i in rng.sample(range(conversations - min(max_resident, conversations), conversations), 1000)]
+    oldest = [f'conv_{i:08x}' for i in rng.sample(range(min(conversations, 10 * max_resident)), 1000)]
+    print(json.dumps({
+        'samples': samples,
+        'fill_seconds': fill_seconds,
+        'missing': missing,
+        'total_conversations': stats['total_conversations'],
+        'resident': len(store.conversations),
+        'archive': archive.stats() if archive else None,
+        'get_recent_us': get_us(recent),
+        'get_old_us': get_us(oldest)
+    }))
+    shutil.rmtree(directory, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--conversations', type=int, default=100000)
+    parser.add_argument('--turns', type=int, default=5)
+    parser.add_argument('--max-resident', type=int, default=5000)
+    parser.add_argument('--sample-every', type=int, default=10000)
+    parser.add_argument('--child', metavar='MODE', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child, args.conversations, args.turns, args.max_resident, args.sample_every)
+        return
+
+    results = {}
+    for mode in ('memory', 'archive'):
+        out = subprocess.check_output([
+            sys.executable, os.path.abspath(__file__), '--conversations', str(args.conversations),
+            '--turns', str(args.turns), '--max-resident', str(args.max_resident),
+            '--sample-every', str(args.sample_every), '--child', mode
+        ], text=True)
+        results[mode] = json.loads(out)
+
+    print(f'{args.conversations:,} finished conversations x {args.turns} turns; '
+          f'max resident {args.max_resident:,}')
+    print(f'\n{"inserted":>10}  {"all in memory":>14}  {"with archive":>13}   (RSS growth, MB)')
+    for (n, plain), (_, archived) in zip(results['memory']['samples'], results['archive']['samples']):
+        print(f'{n:>10,}  {plain:>14.1f}  {archived:>13.1f}')
+    for mode, r in results.items():
+        archive = r['archive']
+        print(f'\n{mode}: filled in {r["fill_seconds"]:.1f}s, {r["resident"]:,} resident, '
+              f'{r["missing"]} missing of {r["total_conversations"]:,} counted')
+        if archive:
+            print(f'  archive: {archive["conversations"]:,} conversations, '
+                  f'{archive["bytes"] / 1024 / 1024:.1f} MB in {archive["segments"]} segment(s)')
+        print(f'  get(): recent {r["get_recent_us"]:.1f} us, old {r["get_old_us"]:.1f} us')
+
+
+if __name__ == '__main__':
+    main()
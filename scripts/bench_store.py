@@ -0,0 +1,94 @@
+"""Load benchmark: in-memory dict store vs SQLite store.
+
+Inserts N turns (in conversations of --turns-per-conv), tags every
+conversation with intel, then measures get(), find_by_entity(),
+lookup_entity(), top_entities() and get_stats() latency.
+
+Usage: python scripts/bench_store.py [--turns 1000000] [--turns-per-conv 10] [--path bench_store.db]
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from storage.memory_store import ConversationStore
+from storage.sqlite_store import SQLiteConversationStore
+
+SCAMMER = "Sir please hurry! Send Rs 1000 processing fee to winner{n}@paytm to claim your prize."
+AGENT = "Really sir? But how I will get the money? Please explain slowly."
+
+
+def percentile(samples, pct):
+    samples = sorted(samples)
+    return samples[min(int(len(samples) * pct / 100), len(samples) - 1)]
+
+
+def timed(fn, calls):
+    samples = []
+    for args in calls:
+        start = time.perf_counter()
+        fn(*args)
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def run(store, conversations, turns_per_conv, queries):
+    turns = [(SCAMMER.format(n=i), AGENT) for i in range(turns_per_conv)]
+
+    start = time.perf_counter()
+    for c in range(conversations):
+        conv_id = f'conv_{c:08x}'
+        store.create(conv_id)
+        store.add_turns(conv_id, turns)
+        store.update(conv_id, status='completed', scam_type='lottery',
+                     extracted_intel={'upi_ids': [f'winner{c % 1000}@paytm']})
+    insert_time = time.perf_counter() - start
+
+    rng = random.Random(1)
+    ids = [(f'conv_{rng.randrange(conversations):08x}',) for _ in range(queries)]
+    values = [(f'winner{rng.randrange(1000)}@paytm',) for _ in range(queries)]
+    return {
+        'insert_turns_per_sec': conversations * turns_per_conv / insert_time,
+        'get': timed(store.get, ids),
+        'find_by_entity': timed(store.find_by_entity, values[:max(queries // 10, 1)]),
+        'lookup_entity': timed(lambda value: store.lookup_entity(value, limit=20), values),
+        'top_entities': timed(store.top_entities, [(20,)] * max(queries // 10, 1)),
+        'get_stats': timed(store.get_stats, [()] * 5),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--turns', type=int, default=1_000_000)
+    parser.add_argument('--turns-per-conv', type=int, default=10)
+    parser.add_argument('--queries', type=int, default=1000)
+    parser.add_argument('--path', default='bench_store.db')
+    args = parser.parse_args()
+
+    for suffix in ('', '-wal', '-shm'):
+        if os.path.exists(args.path + suffix):
+            os.remove(args.path + suffix)
+
+    conversations = args.turns // args.turns_per_conv
+    results = {
+        'dict': run(ConversationStore(), conversations, args.turns_per_conv, args.queries),
+        'sqlite': run(SQLiteConversationStore(args.path), conversations, args.turns_per_conv, args.queries),
+    }
+
+    print(f"{conversations * args.turns_per_conv:,} turns in {conversations:,} conversations")
+    print(f"{'':28}{'dict':>14}{'sqlite':>14}")
+    print(f"{'insert (turns/s)':28}" + ''.join(f"{r['insert_turns_per_sec']:>14,.0f}" for r in results.values()))
+    for op in ('get', 'find_by_entity', 'lookup_entity', 'top_entities', 'get_stats'):
+        for label, pct in (('p50', 50), ('p99', 99)):
+            row = ''.join(f"{percentile(r[op], pct):>14.3f}" for r in results.values())
+            print(f"{op + ' ' + label + ' (ms)':28}{row}")
+        mean = ''.join(f"{statistics.mean(r[op]):>14.3f}" for r in results.values())
+        print(f"{op + ' mean (ms)':28}{mean}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,157 @@
+"""Consistency check: running store aggregates vs a full recount.
+
+Applies a random mix of create / add_turn / add_turns / update operations
+to each store backend (and to a memory store that archives finished
+conversations) and compares get_stats() and the entity index with
+values recomputed from get_all() after every batch. Exits non-zero on
+the first mismatch.
+
+Usage: python scripts/check_stats_consistency.py [--ops 5000] [--seed 7]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models import entity_keys
+from storage.archive import ConversationArchive
+from storage.memory_store import ConversationStore
+from storage.sqlite_store import SQLiteConversationStore
+
+STATUSES = ['active', 'queued', 'completed', 'failed', 'not_a_scam']
+SCAM_TYPES = [None, 'lottery', 'banking', 'payment_fraud', 'phishing']
+
+
+def recount(store):
+    """Statistics computed the old way, by walking every conversation"""
+    conversations = store.get_all()
+    scam_types = {}
+    for c in conversations:
+        key = c.get('scam_type') or 'unknown'
+        scam_types[key] = scam_types.get(key, 0) + 1
+    total_turns = sum(len(c['history']) for c in conversations)
+    return {
+        'total_conversations': len(conversations),
+        'active_conversations': sum(1 for c in conversations if c['status'] == 'active'),
+        'total_intel_extracted': sum(len(c.get('extracted_intel', {})) for c in conversations),
+        'total_intel_items': sum(
+            sum(len(v) for v in c.get('extracted_intel', {}).values()) for c in conversations
+        ),
+        'scam_types_breakdown': scam_types,
+        'avg_turns_per_conversation': total_turns / max(len(conversations), 1),
+    }
+
+
+def recount_entities(store):
+    """Conversations per normalized entity, by walking every conversation"""
+    counts = {}
+    for c in store.get_all():
+        for key in entity_keys(c.get('extracted_intel')):
+            counts[key] = counts.get(key, 0) + 1
+    return counts
+
+
+def indexed_entities(store):
+    return {
+        (e['kind'], e['value']): e['conversations']
+        for e in store.top_entities(limit=1_000_000)
+    }
+
+
+def random_intel(rng):
+    return {
+        kind: [f'{kind}-{rng.randrange(50)}'.upper() if rng.random() < 0.3 else f'{kind}-{rng.randrange(50)}'
+               for _ in range(rng.randrange(3))]
+        for kind in rng.sample(['upi_ids', 'bank_accounts', 'phone_numbers', 'urls'], rng.randrange(5))
+    }
+
+
+def exercise(store, ops, seed):
+    rng = random.Random(seed)
+    ids = []
+    sweep = getattr(store, 'sweep', lambda: 0)  # Archiving stores evict only when swept
+    for i in range(ops):
+        op = rng.random()
+        if op < 0.15 or not ids:
+            # Occasionally re-create an existing id to exercise replacement
+            conv_id = rng.choice(ids) if ids and rng.random() < 0.1 else f'conv_{i}'
+            store.create(conv_id)
+            if conv_id not in ids:
+                ids.append(conv_id)
+        elif op < 0.55:
+            store.add_turn(rng.choice(ids), 'scammer says', 'agent says')
+        elif op < 0.65:
+            conv_id = f'conv_implicit_{i}'  # add_turns creates missing conversations
+            store.add_turns(conv_id, [('s', 'a')] * rng.randrange(1, 4))
+            ids.append(conv_id)
+        else:
+            fields = {}
+            if rng.random() < 0.6:
+                fields['status'] = rng.choice(STATUSES)
+            if rng.random() < 0.4:
+                fields['scam_type'] = rng.choice(SCAM_TYPES)
+            if rng.random() < 0.4:
+                fields['extracted_intel'] = random_intel(rng)
+            if rng.random() < 0.2:
+                fields['error'] = 'boom'
+            store.update(rng.choice(ids), **fields)
+        sweep()
+
+        if i % 250 == 0 or i == ops - 1:
+            expected, actual = recount(store), store.get_stats()
+            if expected != actual:
+                return f'after {i + 1} ops:\n  recount   {expected}\n  aggregate {actual}'
+            if recount_entities(store) != indexed_entities(store):
+                return f'after {i + 1} ops: entity index differs from a recount of stored intel'
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--ops', type=int, default=5000)
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        stores = {
+            'memory': ConversationStore(),
+            # Evicts finished conversations on every sweep; they still count
+            'memory+archive': ConversationStore(
+                archive=ConversationArchive(os.path.join(tmp, 'archive'), block_records=8),
+                idle_ttl=0, max_resident=50, sweep_interval=0
+            ),
+            'sqlite': SQLiteConversationStore(os.path.join(tmp, 'stats.db')),
+        }
+        failed = False
+        for name, store in stores.items():
+            error = exercise(store, args.ops, args.seed)
+            print(f"{'❌' if error else '✅'} {name}: {error or 'aggregates match full recount'}")
+            failed = failed or bool(error)
+
+        # A restart keeps the archived conversations, rebuilt from the archive index
+        restarted = ConversationStore(archive=ConversationArchive(os.path.join(tmp, 'archive')),
+                                      sweep_interval=0)
+        if recount(restarted) != restarted.get_stats():
+            print("❌ memory+archive: aggregates differ after reloading the archive")
+            failed = True
+        if recount_entities(restarted) != indexed_entities(restarted):
+            print("❌ memory+archive: entity index differs after reloading the archive")
+            failed = True
+
+        # Re-opening a database must rebuild nothing and agree with a recount
+        reopened = SQLiteConversationStore(os.path.join(tmp, 'stats.db'))
+        if recount(reopened) != reopened.get_stats():
+            print("❌ sqlite: aggregates differ after re-opening the database")
+            failed = True
+        if recount_entities(reopened) != indexed_entities(reopened):
+            print("❌ sqlite: entity index differs after re-opening the database")
+            failed = True
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
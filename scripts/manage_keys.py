@@ -0,0 +1,60 @@
+"""Issue, list and revoke per-client API keys.
+
+SQLite registry (API_KEYS_BACKEND=sqlite, API_KEYS_PATH=api_keys.db):
+    python scripts/manage_keys.py add partner-a [--rate 60] [--burst 10]
+    python scripts/manage_keys.py list
+    python scripts/manage_keys.py revoke partner-a
+
+JSON file registry (API_KEYS_BACKEND=file): print an entry to append to
+the file at API_KEYS_PATH, plus the raw key to hand to the client:
+    python scripts/manage_keys.py entry partner-a [--rate 60] [--burst 10]
+
+Raw keys are shown once and never stored.
+"""
+import argparse
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config
+from utils.keys import SQLiteKeyRegistry, generate_key, hash_key
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    sub = parser.add_subparsers(dest='command', required=True)
+    for name in ('add', 'entry'):
+        p = sub.add_parser(name)
+        p.add_argument('client')
+        p.add_argument('--rate', type=float, help='requests per minute (default RATE_LIMIT_PER_MINUTE)')
+        p.add_argument('--burst', type=float, help='bucket size (default RATE_LIMIT_BURST)')
+    sub.add_parser('list')
+    sub.add_parser('revoke').add_argument('client')
+    args = parser.parse_args()
+
+    if args.command == 'entry':
+        raw_key = generate_key()
+        entry = {'client': args.client, 'key_sha256': hash_key(raw_key)}
+        if args.rate:
+            entry['rate_per_minute'] = args.rate
+        if args.burst:
+            entry['burst'] = args.burst
+        print(json.dumps(entry))
+        print(f'API key for {args.client}: {raw_key}', file=sys.stderr)
+        return
+
+    registry = SQLiteKeyRegistry(Config.API_KEYS_PATH or 'api_keys.db')
+    if args.command == 'add':
+        raw_key = registry.add_key(args.client, args.rate, args.burst)
+        print(f'API key for {args.client}: {raw_key}')
+    elif args.command == 'list':
+        for key in registry.list_keys():
+            print(json.dumps(key))
+    elif args.command == 'revoke':
+        print(f'Revoked {registry.revoke(args.client)} key(s) for {args.client}')
+
+
+if __name__ == '__main__':
+    main()
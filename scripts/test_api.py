@@ -23,8 +23,12 @@ response = requests.post(
     f'{BASE_URL}/process-message',
     headers=headers,
     json={
-        'message': 'Congratulations! You won Rs 10 lakhs. Send bank details to claim prize at winner@paytm or call 9876543210!',
-        'auto_engage': False
+        'sessionId': 'smoke_test',
+        'message': {
+            'sender': 'scammer',
+            'text': 'Congratulations! You won Rs 10 lakhs. Send bank details to claim prize at winner@paytm or call 9876543210!'
+        },
+        'conversationHistory': []
     }
 )
 print(json.dumps(response.json(), indent=2))
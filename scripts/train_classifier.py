@@ -0,0 +1,81 @@
+"""Train or evaluate the local scam classifier (detection/classifier.py).
+
+Training data is JSON lines with a ``message`` (or ``text``) and an
+``is_scam`` label, e.g. messages labelled by the LLM: run them through
+/api/detect-batch with CLASSIFIER_MODEL_PATH='' and keep each message
+with its result's ``is_scam``.
+
+    python scripts/train_classifier.py train labelled.jsonl [more.jsonl] [--out scam_classifier.bin]
+    python scripts/train_classifier.py evaluate labelled.jsonl [--model scam_classifier.bin]
+
+``train`` holds out --holdout of the data, prints the evaluation report
+for it, then writes the model trained on the rest. Workers pick the model
+up from CLASSIFIER_MODEL_PATH on their next start.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config
+from detection.classifier import ScamClassifier, evaluate, train
+
+
+def load_examples(paths):
+    messages, labels = [], []
+    for path in paths:
+        with open(path, encoding='utf-8') as f:
+            for n, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                message = record.get('message', record.get('text'))
+                if not isinstance(message, str) or not isinstance(record.get('is_scam'), bool):
+                    sys.exit(f'{path}:{n}: need a "message" string and an "is_scam" boolean')
+                messages.append(message)
+                labels.append(record['is_scam'])
+    return messages, labels
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    sub = parser.add_subparsers(dest='command', required=True)
+    p = sub.add_parser('train')
+    p.add_argument('data', nargs='+')
+    p.add_argument('--out', default=Config.CLASSIFIER_MODEL_PATH or 'scam_classifier.bin')
+    p.add_argument('--bits', type=int, default=18, help='2**bits hashed feature columns')
+    p.add_argument('--epochs', type=int, default=8)
+    p.add_argument('--learning-rate', type=float, default=0.5)
+    p.add_argument('--l2', type=float, default=1e-6)
+    p.add_argument('--holdout', type=float, default=0.1, help='share kept back for the report')
+    p.add_argument('--seed', type=int, default=0)
+    p = sub.add_parser('evaluate')
+    p.add_argument('data', nargs='+')
+    p.add_argument('--model', default=Config.CLASSIFIER_MODEL_PATH or 'scam_classifier.bin')
+    args = parser.parse_args()
+
+    messages, labels = load_examples(args.data)
+    if args.command == 'evaluate':
+        print(json.dumps(evaluate(ScamClassifier.load(args.model), messages, labels), indent=2))
+        return
+
+    order = list(range(len(messages)))
+    random.Random(args.seed).shuffle(order)
+    cut = int(len(order) * (1 - args.holdout))
+    fit, held = order[:cut], order[cut:]
+    model = train([messages[i] for i in fit], [labels[i] for i in fit], bits=args.bits,
+                  epochs=args.epochs, learning_rate=args.learning_rate, l2=args.l2, seed=args.seed)
+    if held:
+        report = evaluate(model, [messages[i] for i in held], [labels[i] for i in held])
+        model.info['holdout'] = report
+        print(json.dumps(report, indent=2))
+    model.save(args.out)
+    print(f'wrote {args.out} ({os.path.getsize(args.out) / 1024:.0f} KiB, '
+          f'{len(fit):,} training messages)')
+
+
+if __name__ == '__main__':
+    main()
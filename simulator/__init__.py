@@ -0,0 +1,3 @@
+from .dialogues import DialogueCorpus, ScammerSession, ScammerSimulator
+
+__all__ = ['DialogueCorpus', 'ScammerSession', 'ScammerSimulator']
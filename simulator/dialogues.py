@@ -0,0 +1,183 @@
+import hashlib
+import json
+import os
+import random
+import string
+import threading
+from collections import OrderedDict
+
+from config import Config
+
+DEFAULT_CORPUS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'corpus.json')
+
+_NAMES = ['winner', 'prize', 'kbc', 'refund', 'support', 'helpdesk', 'rajesh', 'amit', 'sbi.kyc', 'customs']
+_PSPS = ['paytm', 'ybl', 'okaxis', 'oksbi', 'ibl', 'axl']
+_BANKS = ['SBIN', 'HDFC', 'ICIC', 'PUNB', 'UTIB', 'BARB']
+_URL_WORDS = ['secure', 'verify', 'claim', 'kyc', 'update', 'prize', 'refund', 'support', 'bank', 'help']
+_TLDS = ['com', 'in', 'net', 'online', 'xyz', 'info']
+_AMOUNTS = ['25,00,000', '10,00,000', '5,00,000', '50,000', '1,50,000', '7,500']
+
+
+def campaign_variables(rng):
+    """Fresh scammer details (UPI, phone, account, link...) for one conversation"""
+    return {
+        'upi': f'{rng.choice(_NAMES)}{rng.randint(10, 9999)}@{rng.choice(_PSPS)}',
+        'phone': f'{rng.choice("6789")}{rng.randint(0, 999999999):09d}',
+        'account': str(rng.randint(10 ** 10, 10 ** 15)),
+        'ifsc': f'{rng.choice(_BANKS)}0{rng.randint(0, 999999):06d}',
+        'url': f'http://{rng.choice(_URL_WORDS)}-{rng.choice(_URL_WORDS)}.{rng.choice(_TLDS)}/'
+               f'{"".join(rng.choices(string.ascii_lowercase, k=6))}',
+        'amount': rng.choice(_AMOUNTS),
+        'fee': str(rng.choice([499, 999, 1500, 2500, 4999, 9999])),
+        'id': str(rng.randint(1000, 99999))
+    }
+
+
+class DialogueCorpus:
+    """Scripted, branching scam dialogues.
+
+    Each script has an ``opening`` message, a ``start`` node and ``nodes``.
+    A node holds a ``message`` template and either ``end: true`` or a
+    ``next`` list of ``{"if": [keywords], "goto": node}`` transitions; the
+    first transition with a keyword in the agent's reply is taken, and one
+    without ``if`` always matches.
+    """
+
+    def __init__(self, scripts):
+        self.scripts = scripts
+        self._by_type = {}
+        for script in scripts:
+            self._validate(script)
+            self._by_type.setdefault(script['scam_type'], []).append(script)
+
+    @classmethod
+    def load(cls, path=None):
+        with open(path or Config.SCAMMER_CORPUS_PATH or DEFAULT_CORPUS_PATH, encoding='utf-8') as f:
+            return cls(json.load(f)['scripts'])
+
+    def pick(self, key, scam_type=None):
+        """Stable script choice for a conversation id (optionally of one scam type)"""
+        scripts = self._by_type.get(scam_type) or self.scripts
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=8).digest()
+        return scripts[int.from_bytes(digest, 'big') % len(scripts)]
+
+    def scam_types(self):
+        return sorted(self._by_type)
+
+    @staticmethod
+    def _validate(script):
+        nodes = script['nodes']
+        if script['start'] not in nodes:
+            raise ValueError(f"Script {script['id']}: unknown start node {script['start']}")
+        for name, node in nodes.items():
+            if not node.get('end') and not node.get('next'):
+                raise ValueError(f"Script {script['id']}: node {name} has no way forward")
+            for transition in node.get('next', []):
+                if transition['goto'] not in nodes:
+                    raise ValueError(f"Script {script['id']}: {name} -> unknown node {transition['goto']}")
+
+
+class ScammerSession:
+    """One scammer working through a script; replies until an end node is sent"""
+
+    def __init__(self, script, variables):
+        self.script = script
+        self.variables = variables
+        self.node = None
+        self.ended = False
+        self.turns = 0
+
+    def opening(self):
+        return self.script['opening'].format_map(self.variables)
+
+    def reply(self, agent_message):
+        """Next scammer message, or None once the script has ended"""
+        if self.ended:
+            return None
+
+        nodes = self.script['nodes']
+        if self.node is None:
+            self.node = self.script['start']
+        else:
+            self.node = self._transition(nodes[self.node], (agent_message or '').lower())
+
+        node = nodes[self.node]
+        self.ended = bool(node.get('end'))
+        self.turns += 1
+        return node['message'].format_map(self.variables)
+
+    @staticmethod
+    def _transition(node, message_lower):
+        for transition in node['next']:
+            keywords = transition.get('if')
+            if not keywords or any(k in message_lower for k in keywords):
+                return transition['goto']
+        return node['next'][-1]['goto']
+
+
+class ScammerSimulator:
+    """Scammer sessions keyed by conversation id.
+
+    A conversation's script and details are derived from its id, so the
+    same id always replays the same scammer. At most ``max_sessions`` are
+    kept; the least recently used is dropped first.
+    """
+
+    def __init__(self, corpus=None, max_sessions=100000, seed=0):
+        self.corpus = corpus or DialogueCorpus.load()
+        self.max_sessions = max_sessions
+        self.seed = seed
+        self.started = 0
+        self.ended = 0
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+
+    def start(self, conversation_id, scam_type=None):
+        """Open a conversation and return the scammer's first message"""
+        session = self._session(conversation_id, scam_type)
+        return self._response(session, session.opening())
+
+    def respond(self, conversation_id, agent_message):
+        """Scammer's reply to the agent (``message`` is None after the script ends)"""
+        session = self._session(conversation_id)
+        with self._lock:
+            was_ended = session.ended
+            message = session.reply(agent_message)
+            if session.ended and not was_ended:
+                self.ended += 1
+        return self._response(session, message)
+
+    def stats(self):
+        return {
+            'sessions': len(self._sessions),
+            'started': self.started,
+            'ended': self.ended,
+            'scripts': len(self.corpus.scripts)
+        }
+
+    def _session(self, conversation_id, scam_type=None):
+        with self._lock:
+            session = self._sessions.get(conversation_id)
+            if session is not None:
+                self._sessions.move_to_end(conversation_id)
+                return session
+
+            rng = random.Random(f'{self.seed}:{conversation_id}')
+            session = ScammerSession(
+                self.corpus.pick(conversation_id, scam_type), campaign_variables(rng)
+            )
+            self._sessions[conversation_id] = session
+            self.started += 1
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+            return session
+
+    @staticmethod
+    def _response(session, message):
+        return {
+            'message': message,
+            'scammer_id': f"sim_{session.script['id']}",
+            'scam_type': session.script['scam_type'],
+            'turn': session.turns,
+            'end': session.ended
+        }
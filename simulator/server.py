@@ -0,0 +1,147 @@
+"""Local scammer simulator service.
+
+Speaks the Mock Scammer API (POST /respond) by replaying the branching
+dialogues in the corpus, with configurable response latency and a cap on
+requests served at once, so the honeypot can be load-tested offline.
+
+    python -m simulator.server --port 5055 --latency-ms 400 --jitter-ms 150 --concurrency 64
+
+then run the honeypot with MOCK_SCAMMER_API_URL=http://127.0.0.1:5055.
+This serves through a single threaded gunicorn worker. Sessions live in
+process memory, so when running gunicorn by hand keep to one worker:
+
+    SIM_LATENCY_MS=400 gunicorn -w 1 --threads 128 --keep-alive 60 'simulator.server:create_app()'
+
+Endpoints:
+    POST /respond  {"conversation_id", "message"} -> {"message", "scammer_id", ...}
+    POST /start    {"conversation_id"?, "scam_type"?} -> opening message
+    GET  /stats    sessions, requests, in-flight and rejected counts
+    GET  /health
+"""
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+
+from flask import Flask, jsonify, request
+
+if __package__ in (None, ''):
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from simulator.dialogues import DialogueCorpus, ScammerSimulator
+
+
+def create_app(simulator=None, latency_ms=None, jitter_ms=None, concurrency=None,
+               queue_timeout=None, api_key=None):
+    """Build the simulator app; unset options come from SIM_* environment variables"""
+    simulator = simulator or ScammerSimulator(
+        DialogueCorpus.load(os.getenv('SIM_CORPUS_PATH') or None)
+    )
+    latency = float(os.getenv('SIM_LATENCY_MS', 0) if latency_ms is None else latency_ms) / 1000
+    jitter = float(os.getenv('SIM_JITTER_MS', 0) if jitter_ms is None else jitter_ms) / 1000
+    concurrency = int(os.getenv('SIM_CONCURRENCY', 256) if concurrency is None else concurrency)
+    queue_timeout = float(os.getenv('SIM_QUEUE_TIMEOUT', 30) if queue_timeout is None else queue_timeout)
+    api_key = os.getenv('SIM_API_KEY') if api_key is None else api_key
+
+    app = Flask(__name__)
+    slots = threading.BoundedSemaphore(concurrency)
+    counters = {'requests': 0, 'in_flight': 0, 'rejected': 0}
+    counters_lock = threading.Lock()
+
+    def count(key, delta=1):
+        with counters_lock:
+            counters[key] += delta
+
+    def authorized():
+        return not api_key or request.headers.get('Authorization') == f'Bearer {api_key}'
+
+    def serve(handler):
+        """Hold one of ``concurrency`` slots for the simulated think time"""
+        if not authorized():
+            return jsonify({'error': 'Unauthorized'}), 401
+        if not slots.acquire(timeout=queue_timeout):
+            count('rejected')
+            return jsonify({'error': 'Simulator busy'}), 503
+        count('in_flight')
+        try:
+            delay = latency + random.uniform(-jitter, jitter)
+            if delay > 0:
+                time.sleep(delay)
+            return jsonify(handler(request.get_json(silent=True) or {}))
+        finally:
+            count('in_flight', -1)
+            count('requests')
+            slots.release()
+
+    @app.route('/respond', methods=['POST'])
+    def respond():
+        return serve(lambda data: simulator.respond(
+            data.get('conversation_id') or 'anonymous', data.get('message', '')
+        ))
+
+    @app.route('/start', methods=['POST'])
+    def start():
+        def handler(data):
+            conv_id = data.get('conversation_id') or f'sim_{uuid.uuid4().hex[:8]}'
+            return {'conversation_id': conv_id, **simulator.start(conv_id, data.get('scam_type'))}
+        return serve(handler)
+
+    @app.route('/stats', methods=['GET'])
+    def stats():
+        with counters_lock:
+            snapshot = dict(counters)
+        return jsonify({
+            **simulator.stats(), **snapshot,
+            'latency_ms': latency * 1000, 'jitter_ms': jitter * 1000, 'concurrency': concurrency
+        })
+
+    @app.route('/health', methods=['GET'])
+    def health():
+        return jsonify({'status': 'healthy', 'scam_types': simulator.corpus.scam_types()})
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Local scammer simulator')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=5055)
+    parser.add_argument('--corpus', help='dialogue corpus JSON (default SCAMMER_CORPUS_PATH)')
+    parser.add_argument('--latency-ms', type=float, default=0)
+    parser.add_argument('--jitter-ms', type=float, default=0)
+    parser.add_argument('--concurrency', type=int, default=256, help='requests served at once')
+    parser.add_argument('--queue-timeout', type=float, default=30, help='seconds to wait for a slot before 503')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    simulator = ScammerSimulator(DialogueCorpus.load(args.corpus), seed=args.seed)
+    app = create_app(simulator, args.latency_ms, args.jitter_ms, args.concurrency, args.queue_timeout)
+    serve_forever(app, args.host, args.port, threads=args.concurrency)
+
+
+def serve_forever(app, host, port, threads):
+    """Serve with one threaded gunicorn worker (keeps connections alive);
+    the Flask dev server closes every connection, so it is only a fallback"""
+    try:
+        from gunicorn.app.base import BaseApplication
+    except ImportError:
+        app.run(host=host, port=port, threaded=True)
+        return
+
+    class Server(BaseApplication):
+        def load_config(self):
+            for key, value in {'bind': f'{host}:{port}', 'workers': 1, 'threads': threads,
+                               'worker_class': 'gthread', 'keepalive': 60}.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            return app
+
+    Server().run()
+
+
+if __name__ == '__main__':
+    main()
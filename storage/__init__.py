@@ -1,3 +1,15 @@
-from .memory_store import ConversationStore, conversation_store
+from .archive import ConversationArchive, create_archive
+from .base_store import BaseConversationStore
+from .memory_store import ConversationStore
+from .sqlite_store import SQLiteConversationStore
+from .factory import create_conversation_store, conversation_store
 
-__all__ = ['ConversationStore', 'conversation_store']
\ No newline at end of file
+__all__ = [
+    'BaseConversationStore',
+    'ConversationArchive',
+    'create_archive',
+    'ConversationStore',
+    'SQLiteConversationStore',
+    'create_conversation_store',
+    'conversation_store'
+]
@@ -0,0 +1,233 @@
+import glob
+import gzip
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from config import Config
+
+_LINE_BITS = 16
+_LINE_MASK = (1 << _LINE_BITS) - 1
+
+
+class _Gzip:
+    suffix = 'gz'
+
+    @staticmethod
+    def compress(data: bytes) -> bytes:
+        return gzip.compress(data, compresslevel=6, mtime=0)
+
+    @staticmethod
+    def decompress(data: bytes) -> bytes:
+        return gzip.decompress(data)
+
+
+class _Zstd:
+    suffix = 'zst'
+
+    def __init__(self):
+        import zstandard  # Optional dependency, only needed for zstd archives
+        self._compressor = zstandard.ZstdCompressor(level=3)
+        self._decompressor = zstandard.ZstdDecompressor()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def decompress(self, data: bytes) -> bytes:
+        return self._decompressor.decompress(data)
+
+
+class ConversationArchive:
+    """Append-only, compressed JSONL segments with an offset index.
+
+    ``append`` compresses records in blocks of up to ``block_records``
+    (each a gzip member or zstd frame) at the end of the current segment
+    file, so segments stay valid ``.jsonl.gz``/``.jsonl.zst`` files. A
+    sidecar ``.idx`` file gets one ``id<TAB>offset<TAB>length<TAB>line``
+    row per record, optionally followed by a ``<TAB>summary`` JSON column
+    the caller supplies; those rows are loaded at startup into the
+    in-memory index, which lets ``get`` read and decompress just one block
+    (the last ``cache_blocks`` blocks read stay decompressed). A record
+    archived again later supersedes the earlier copy.
+    """
+
+    def __init__(self, directory: str, compression: Optional[str] = None,
+                 segment_bytes: Optional[int] = None, block_records: Optional[int] = None,
+                 cache_blocks: int = 8):
+        self.directory = directory
+        compression = compression or Config.STORE_ARCHIVE_COMPRESSION
+        if compression not in ('gzip', 'zstd'):
+            raise ValueError(f'Unknown archive compression: {compression}')
+        self.codec = _Zstd() if compression == 'zstd' else _Gzip()
+        self.segment_bytes = segment_bytes or Config.STORE_ARCHIVE_SEGMENT_MB * 1024 * 1024
+        self.block_records = block_records or Config.STORE_ARCHIVE_BLOCK_RECORDS
+        self._segments: List[str] = []
+        self._blocks: List[Tuple[int, int, int]] = []  # (segment, offset, length)
+        self._index: Dict[str, int] = {}  # id -> block number << _LINE_BITS | line
+        self._current = None
+        self.cache_blocks = cache_blocks
+        self._block_cache: 'OrderedDict[int, List[bytes]]' = OrderedDict()  # Most recently read last
+        self._lock = threading.Lock()
+        self._cache_lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self._load_index()
+
+    def append(self, records: Iterable[dict], summaries: Optional[Iterable[dict]] = None) -> int:
+        """Archive a batch of conversation dicts (each with an 'id').
+
+        ``summaries`` (one JSON-serialisable dict per record) are stored in
+        the index rows, so ``iter_summaries`` can read them back without
+        decompressing any block.
+        """
+        records = list(records)
+        summaries = list(summaries) if summaries is not None else [None] * len(records)
+        with self._lock:
+            written = set()
+            for start in range(0, len(records), self.block_records):
+                end = start + self.block_records
+                path = self._append_block(records[start:end], summaries[start:end])
+                written.update((path, self._idx_path(path)))
+            for path in written:
+                with open(path, 'rb') as f:
+                    os.fsync(f.fileno())
+        return len(records)
+
+    def get(self, conv_id: str) -> Optional[dict]:
+        entry = self._index.get(conv_id)
+        if entry is None:
+            return None
+        return json.loads(self._read_block(entry >> _LINE_BITS)[entry & _LINE_MASK])
+
+    def __contains__(self, conv_id: str) -> bool:
+        return conv_id in self._index
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def ids(self) -> List[str]:
+        """Archived ids in the order they were first archived"""
+        return list(self._index)
+
+    def iter_summaries(self) -> Iterator[Tuple[str, Optional[dict]]]:
+        """(id, summary) of every current record, in archive order.
+
+        The summary is None for records appended without one (or whose
+        index row was torn); read those with ``get``.
+        """
+        blocks = {(segment, offset): n for n, (segment, offset, _) in enumerate(self._blocks)}
+        for segment, path in enumerate(list(self._segments)):
+            for conv_id, offset, _, line, summary in self._read_idx(path):
+                entry = blocks.get((segment, offset))
+                if entry is None or self._index.get(conv_id) != entry << _LINE_BITS | line:
+                    continue  # Superseded by a later copy
+                try:
+                    yield conv_id, json.loads(summary) if summary else None
+                except ValueError:
+                    yield conv_id, None
+
+    def iter_records(self) -> Iterator[dict]:
+        """Every current archived record, block by block"""
+        for entry in sorted(self._index.values()):
+            yield json.loads(self._read_block(entry >> _LINE_BITS)[entry & _LINE_MASK])
+
+    def stats(self) -> dict:
+        return {
+            'conversations': len(self._index),
+            'segments': len(self._segments),
+            'bytes': sum(os.path.getsize(p) for p in self._segments if os.path.exists(p))
+        }
+
+    def _read_block(self, block_no: int) -> List[bytes]:
+        with self._cache_lock:
+            lines = self._block_cache.get(block_no)
+            if lines is not None:
+                self._block_cache.move_to_end(block_no)
+                return lines
+        segment, offset, length = self._blocks[block_no]
+        with open(self._segments[segment], 'rb') as f:
+            f.seek(offset)
+            lines = self.codec.decompress(f.read(length)).splitlines()
+        with self._cache_lock:
+            self._block_cache[block_no] = lines
+            while len(self._block_cache) > self.cache_blocks:
+                self._block_cache.popitem(last=False)
+        return lines
+
+    def _append_block(self, records: List[dict], summaries: List[Optional[dict]]) -> str:
+        block = self.codec.compress(
+            b''.join(json.dumps(r, ensure_ascii=False).encode('utf-8') + b'\n' for r in records)
+        )
+        segment = self._writable_segment(len(block))
+        path = self._segments[segment]
+        with open(path, 'ab') as f:
+            offset = f.tell()
+            f.write(block)
+        with open(self._idx_path(path), 'a', encoding='utf-8') as f:
+            f.writelines(
+                f"{r['id']}\t{offset}\t{len(block)}\t{line}"
+                + (f"\t{json.dumps(summary, separators=(',', ':'))}\n" if summary is not None else '\n')
+                for line, (r, summary) in enumerate(zip(records, summaries))
+            )
+        block_no = self._add_block(segment, offset, len(block))
+        for line, record in enumerate(records):
+            self._index[record['id']] = block_no << _LINE_BITS | line
+        return path
+
+    def _add_block(self, segment: int, offset: int, length: int) -> int:
+        self._blocks.append((segment, offset, length))
+        return len(self._blocks) - 1
+
+    def _writable_segment(self, incoming: int) -> int:
+        if self._current is not None:
+            path = self._segments[self._current]
+            if os.path.getsize(path) + incoming <= self.segment_bytes:
+                return self._current
+        # One writer per segment: the name carries the creation time and pid
+        name = f'segment_{int(time.time() * 1000):013d}_{os.getpid()}.jsonl.{self.codec.suffix}'
+        self._segments.append(os.path.join(self.directory, name))
+        open(self._segments[-1], 'ab').close()
+        self._current = len(self._segments) - 1
+        return self._current
+
+    def _load_index(self):
+        blocks = {}
+        for path in sorted(glob.glob(os.path.join(self.directory, f'segment_*.jsonl.{self.codec.suffix}'))):
+            segment = len(self._segments)
+            self._segments.append(path)
+            for conv_id, offset, length, line, _ in self._read_idx(path):
+                key = (segment, offset)
+                if key not in blocks:
+                    blocks[key] = self._add_block(segment, offset, length)
+                # Keep first-archived order, newest copy (as append does)
+                self._index[conv_id] = blocks[key] << _LINE_BITS | line
+
+    def _read_idx(self, segment_path: str) -> Iterator[Tuple[str, int, int, int, Optional[str]]]:
+        """(id, offset, length, line, summary JSON or None) per index row"""
+        try:
+            with open(self._idx_path(segment_path), encoding='utf-8') as f:
+                for row in f:
+                    if not row.endswith('\n'):
+                        continue  # Torn write from a crashed process
+                    parts = row[:-1].split('\t')
+                    if len(parts) not in (4, 5):
+                        continue
+                    try:
+                        offset, length, line = int(parts[1]), int(parts[2]), int(parts[3])
+                    except ValueError:
+                        continue
+                    yield parts[0], offset, length, line, parts[4] if len(parts) == 5 else None
+        except FileNotFoundError:
+            return
+
+    @staticmethod
+    def _idx_path(segment_path: str) -> str:
+        return segment_path.rsplit('.jsonl.', 1)[0] + '.idx'
+
+
+def create_archive(directory=None):
+    """Archive for evicted conversations, or None when retention is off"""
+    directory = directory if directory is not None else Config.STORE_ARCHIVE_DIR
+    return ConversationArchive(directory) if directory else None
@@ -0,0 +1,94 @@
+from itertools import islice
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+
+def intel_counts(intel) -> Tuple[int, int]:
+    """(categories, items) contributed by an extracted_intel dict"""
+    intel = intel or {}
+    return len(intel), sum(len(items) for items in intel.values())
+
+
+def build_stats(total, active, intel_kinds, intel_items, total_turns, scam_types) -> dict:
+    """Shape running aggregates into the /api/stats payload"""
+    return {
+        'total_conversations': total,
+        'active_conversations': active,
+        'total_intel_extracted': intel_kinds,
+        'total_intel_items': intel_items,
+        'scam_types_breakdown': {k: v for k, v in scam_types.items() if v},
+        'avg_turns_per_conversation': total_turns / max(total, 1)
+    }
+
+
+class BaseConversationStore:
+    """Interface every conversation store backend implements"""
+    
+    def create(self, conv_id: str) -> dict:
+        """Create new conversation"""
+        raise NotImplementedError
+    
+    def get(self, conv_id: str) -> Optional[dict]:
+        """Get conversation by ID"""
+        raise NotImplementedError
+    
+    def update(self, conv_id: str, **fields) -> None:
+        """Set top-level fields (status, scam_type, extracted_intel, ...)"""
+        raise NotImplementedError
+    
+    def add_turn(self, conv_id: str, scammer_msg: str, agent_msg: str):
+        """Add conversation turn"""
+        raise NotImplementedError
+    
+    def add_turns(self, conv_id: str, turns: Iterable[Tuple[str, str]]):
+        """Add several (scammer_msg, agent_msg) turns at once"""
+        for scammer_msg, agent_msg in turns:
+            self.add_turn(conv_id, scammer_msg, agent_msg)
+    
+    def find_by_entity(self, value: str) -> List[str]:
+        """IDs of conversations whose extracted intel contains value"""
+        raise NotImplementedError
+    
+    def lookup_entity(self, value: str, kind: Optional[str] = None, limit: int = 100) -> List[dict]:
+        """Indexed entities matching value (normalized, any kind unless given).
+        
+        One dict per match: kind, normalized value, number of conversations,
+        first_seen/last_seen and up to ``limit`` conversation_ids, most
+        recently linked first.
+        """
+        raise NotImplementedError
+    
+    def top_entities(self, limit: int = 20, kind: Optional[str] = None) -> List[dict]:
+        """Entities mentioned in the most conversations (same shape, no ids)"""
+        raise NotImplementedError
+    
+    def get_all(self) -> List[dict]:
+        """Get all conversations"""
+        raise NotImplementedError
+    
+    def iter_conversations(self, status: Optional[str] = None, scam_type: Optional[str] = None,
+                           since: Optional[str] = None, until: Optional[str] = None,
+                           after: Optional[str] = None,
+                           include_history: bool = True) -> Iterator[Tuple[str, dict]]:
+        """Yield (cursor, conversation) in creation order, lazily.
+        
+        Filters match exactly on status/scam_type and on created_at in
+        [since, until). ``after`` resumes from a cursor returned earlier.
+        """
+        raise NotImplementedError
+    
+    def list_conversations(self, limit: int, **filters) -> Tuple[List[dict], Optional[str]]:
+        """One page of conversations plus the cursor for the next page"""
+        page = list(islice(self.iter_conversations(**filters), limit + 1))
+        next_cursor = page[limit - 1][0] if len(page) > limit else None
+        return [conversation for _, conversation in page[:limit]], next_cursor
+    
+    def get_stats(self) -> dict:
+        """Get statistics from running aggregates (constant time).
+        
+        Conversations without a scam_type are counted as 'unknown'.
+        """
+        raise NotImplementedError
+    
+    def retention_stats(self) -> Optional[dict]:
+        """Eviction/archive counters, for backends that evict (else None)"""
+        return None
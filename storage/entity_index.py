@@ -0,0 +1,113 @@
+import threading
+import time
+from datetime import datetime
+from itertools import islice
+from typing import Dict, List, Optional, Tuple
+
+from models import entity_keys, lookup_keys
+from utils.ranking import CountRanking
+
+Key = Tuple[str, str]  # (kind, normalized value)
+
+
+def _iso(timestamp: float) -> str:
+    return datetime.fromtimestamp(timestamp).isoformat()
+
+
+class _Entity:
+    __slots__ = ('conversations', 'first_seen', 'last_seen')
+
+    def __init__(self, now: float):
+        self.conversations: Dict[str, None] = {}  # Ordered by when the link was made
+        self.first_seen = now
+        self.last_seen = now
+
+
+class EntityIndex:
+    """Inverted index: normalized entity -> conversations that mention it.
+
+    Kept per process alongside the in-memory store and updated whenever a
+    conversation's ``extracted_intel`` is stored: ``update`` diffs the old
+    and new entity sets, so each write costs O(entities changed). Lookups
+    are a handful of dict probes; ``top`` reads the count buckets.
+    Entities whose last conversation dropped them stay indexed so their
+    first/last-seen times are not lost, but are not returned until a
+    conversation mentions them again.
+    """
+
+    def __init__(self):
+        self._entities: Dict[Key, _Entity] = {}
+        self._ranking = CountRanking()
+        self._by_kind: Dict[str, CountRanking] = {}
+        self._lock = threading.Lock()
+
+    def update(self, conv_id: str, old_intel, new_intel, now: Optional[float] = None):
+        """Re-index one conversation whose intel changed from old to new"""
+        now = time.time() if now is None else now
+        old_keys = set(entity_keys(old_intel))
+        new_keys = entity_keys(new_intel)
+        with self._lock:
+            for key in old_keys.difference(new_keys):
+                entity = self._entities.get(key)
+                if entity is not None and conv_id in entity.conversations:
+                    del entity.conversations[conv_id]
+                    self._moved(key, len(entity.conversations) + 1, len(entity.conversations))
+            for key in new_keys:
+                entity = self._entities.get(key)
+                if entity is None:
+                    entity = self._entities[key] = _Entity(now)
+                entity.last_seen = max(entity.last_seen, now)
+                entity.first_seen = min(entity.first_seen, now)
+                if conv_id not in entity.conversations:
+                    entity.conversations[conv_id] = None
+                    self._moved(key, len(entity.conversations) - 1, len(entity.conversations))
+
+    def lookup(self, value: str, kind: Optional[str] = None, limit: int = 100) -> List[dict]:
+        """Every indexed entity the raw value normalizes to, newest links first"""
+        with self._lock:
+            return [
+                self._describe(key, self._entities[key], limit)
+                for key in lookup_keys(value, kind)
+                if key in self._entities and self._entities[key].conversations
+            ]
+
+    def find(self, value: str) -> List[str]:
+        """Conversation ids linked to value under any kind"""
+        ids = {}
+        with self._lock:
+            for key in lookup_keys(value):
+                entity = self._entities.get(key)
+                if entity is not None:
+                    ids.update(entity.conversations)
+        return list(ids)
+
+    def top(self, limit: int = 20, kind: Optional[str] = None) -> List[dict]:
+        """Entities linked to the most conversations"""
+        with self._lock:
+            ranking = self._ranking if kind is None else self._by_kind.get(kind)
+            if ranking is None:
+                return []
+            return [self._describe(key, self._entities[key], 0) for key in ranking.top(limit)]
+
+    def __len__(self) -> int:
+        return len(self._entities)
+
+    def _moved(self, key: Key, old: int, new: int):
+        self._ranking.move(key, old, new)
+        ranking = self._by_kind.get(key[0])
+        if ranking is None:
+            ranking = self._by_kind[key[0]] = CountRanking()
+        ranking.move(key, old, new)
+
+    @staticmethod
+    def _describe(key: Key, entity: _Entity, limit: int) -> dict:
+        data = {
+            'kind': key[0],
+            'value': key[1],
+            'conversations': len(entity.conversations),
+            'first_seen': _iso(entity.first_seen),
+            'last_seen': _iso(entity.last_seen)
+        }
+        if limit:
+            data['conversation_ids'] = list(islice(reversed(entity.conversations), limit))
+        return data
@@ -0,0 +1,19 @@
+from config import Config
+
+from .archive import create_archive
+from .memory_store import ConversationStore
+from .sqlite_store import SQLiteConversationStore
+
+
+def create_conversation_store(backend=None):
+    """Build the conversation store configured in Config"""
+    backend = backend or Config.STORE_BACKEND
+    if backend == 'memory':
+        return ConversationStore(archive=create_archive())
+    if backend == 'sqlite':
+        return SQLiteConversationStore(Config.STORE_PATH)
+    raise ValueError(f'Unknown conversation store backend: {backend}')
+
+
+# Global instance
+conversation_store = create_conversation_store()
@@ -1,56 +1,288 @@
-from datetime import datetime
-from typing import Dict, List, Optional
+import logging
+import os
+import threading
+import time
+from collections import Counter, OrderedDict
+from typing import Dict, Iterator, List, Optional, Tuple
 
-class ConversationStore:
-    """In-memory conversation storage"""
+from config import Config
+from models import Conversation, Intel
+from .base_store import BaseConversationStore, build_stats
+from .entity_index import EntityIndex
+
+logger = logging.getLogger(__name__)
+
+# Statuses no engagement writes past (api.events.TERMINAL_STATUSES)
+FINISHED_STATUSES = ('completed', 'not_a_scam', 'failed')
+RESIDENT_LOW_WATER = 0.9  # Fraction of max_resident left after a size-triggered sweep
+
+
+class ConversationStore(BaseConversationStore):
+    """In-memory conversation storage (process-local)
+    
+    Conversations are compact ``Conversation`` models that read like the
+    API's conversation dicts and are serialised only when returned.
+    Statistics are kept as running aggregates, updated on every write.
+    Writes must go through the store methods rather than by mutating the
+    returned models, or the aggregates drift. Extracted entities are kept
+    in an ``EntityIndex`` the same way.
+    
+    With an ``archive`` (see storage.archive), finished conversations are
+    evicted to it once idle for ``idle_ttl`` seconds, or least recently
+    written first while more than ``max_resident`` are held, keeping
+    memory bounded. Evicted conversations still count in the statistics
+    and are read back from the archive; writing to one makes it resident
+    again. Sweeps run on a daemon thread every ``sweep_interval`` seconds
+    (woken early when a write takes the store past ``max_resident``), so
+    writers never compress or fsync; with ``sweep_interval <= 0`` there is
+    no thread and the caller runs ``sweep``. Each archived record carries
+    a summary (status, scam type, turns, intel) in the archive index, from
+    which a restart rebuilds the statistics and entity index without
+    decompressing the archive.
+    """
     
-    def __init__(self):
-        self.conversations: Dict[str, dict] = {}
+    def __init__(self, archive=None, idle_ttl: Optional[float] = None,
+                 max_resident: Optional[int] = None, sweep_interval: Optional[float] = None):
+        self.conversations: Dict[str, Conversation] = {}
+        self._order: List[str] = []  # Creation order; cursors index into it
+        self._totals = Counter()
+        self._scam_types = Counter()
+        self._lock = threading.Lock()
+        self.entities = EntityIndex()
+        self.archive = archive
+        self.idle_ttl = Config.STORE_IDLE_TTL if idle_ttl is None else idle_ttl
+        self.max_resident = Config.STORE_MAX_RESIDENT if max_resident is None else max_resident
+        self.sweep_interval = Config.STORE_SWEEP_INTERVAL if sweep_interval is None else sweep_interval
+        self._finished: 'OrderedDict[str, float]' = OrderedDict()  # id -> last write, oldest first
+        self._sweep_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._evicted = 0
+        if archive is not None and len(archive):
+            self._load_archived()
+        if archive is not None and self.sweep_interval > 0:
+            self._start_sweeper()
+            os.register_at_fork(after_in_child=self._start_sweeper)
     
-    def create(self, conv_id: str) -> dict:
+    def create(self, conv_id: str) -> Conversation:
         """Create new conversation"""
-        self.conversations[conv_id] = {
-            'id': conv_id,
-            'history': [],
-            'extracted_intel': {},
-            'scam_type': None,
-            'created_at': datetime.now().isoformat(),
-            'status': 'active'
-        }
-        return self.conversations[conv_id]
+        conversation = Conversation(conv_id)
+        with self._lock:
+            previous = self.conversations.get(conv_id)
+            if previous is None and self.archive is not None and conv_id in self.archive:
+                previous = Conversation.from_dict(self.archive.get(conv_id))
+            if previous is not None:
+                self._account(previous, -1)
+                self.entities.update(conv_id, previous.extracted_intel, None)
+                self._finished.pop(conv_id, None)
+            else:
+                self._order.append(conv_id)
+            self.conversations[conv_id] = conversation
+            self._account(conversation, 1)
+        self._maybe_sweep()
+        return conversation
     
-    def get(self, conv_id: str) -> Optional[dict]:
+    def get(self, conv_id: str) -> Optional[Conversation]:
         """Get conversation by ID"""
-        return self.conversations.get(conv_id)
+        conversation = self.conversations.get(conv_id)
+        if conversation is None and self.archive is not None and conv_id in self.archive:
+            return Conversation.from_dict(self.archive.get(conv_id))
+        return conversation
+    
+    def update(self, conv_id: str, **fields) -> None:
+        """Set top-level fields (status, scam_type, extracted_intel, ...)"""
+        with self._lock:
+            conversation = self._resident(conv_id)
+            if conversation is None:
+                raise KeyError(conv_id)
+            intel = conversation.extracted_intel
+            self._account(conversation, -1)
+            conversation.set(**fields)
+            self._account(conversation, 1)
+            if 'extracted_intel' in fields:
+                self.entities.update(conv_id, intel, conversation.extracted_intel)
+            self._touch(conversation)
+        self._maybe_sweep()
     
     def add_turn(self, conv_id: str, scammer_msg: str, agent_msg: str):
         """Add conversation turn"""
-        if conv_id not in self.conversations:
+        with self._lock:
+            conversation = self._resident(conv_id)
+        if conversation is None:
             self.create(conv_id)
         
-        self.conversations[conv_id]['history'].append({
-            'scammer': scammer_msg,
-            'agent': agent_msg,
-            'timestamp': datetime.now().isoformat()
-        })
+        with self._lock:
+            conversation = self._resident(conv_id)
+            conversation.add_turn(scammer_msg, agent_msg)
+            self._totals['turns'] += 1
+            self._touch(conversation)
+    
+    def find_by_entity(self, value: str) -> List[str]:
+        """IDs of conversations whose extracted intel contains value"""
+        return self.entities.find(value)
     
-    def get_all(self) -> List[dict]:
+    def lookup_entity(self, value: str, kind: Optional[str] = None, limit: int = 100) -> List[dict]:
+        """Indexed entities matching value, with first/last seen and conversations"""
+        return self.entities.lookup(value, kind, limit)
+    
+    def top_entities(self, limit: int = 20, kind: Optional[str] = None) -> List[dict]:
+        """Entities mentioned in the most conversations"""
+        return self.entities.top(limit, kind)
+    
+    def get_all(self) -> List[Conversation]:
         """Get all conversations"""
-        return list(self.conversations.values())
+        return [c for _, c in self.iter_conversations()]
+    
+    def iter_conversations(self, status: Optional[str] = None, scam_type: Optional[str] = None,
+                           since: Optional[str] = None, until: Optional[str] = None,
+                           after: Optional[str] = None,
+                           include_history: bool = True) -> Iterator[Tuple[str, dict]]:
+        """Yield (cursor, conversation) in creation order, lazily"""
+        position = int(after) + 1 if after else 0
+        while position < len(self._order):
+            conversation = self.get(self._order[position])
+            position += 1
+            if conversation is None:
+                continue
+            if status is not None and conversation.status != status:
+                continue
+            if scam_type is not None and conversation.scam_type != scam_type:
+                continue
+            if since is not None and conversation.created_at_iso < since:
+                continue
+            if until is not None and conversation.created_at_iso >= until:
+                continue
+            if not include_history:
+                conversation = conversation.to_dict(include_history=False)
+            yield str(position - 1), conversation
     
     def get_stats(self) -> dict:
-        """Get statistics"""
-        return {
-            'total_conversations': len(self.conversations),
-            'active_conversations': sum(
-                1 for c in self.conversations.values() 
-                if c['status'] == 'active'
-            ),
-            'total_intel_extracted': sum(
-                len(c.get('extracted_intel', {})) 
-                for c in self.conversations.values()
+        """Get statistics from running aggregates (constant time)"""
+        with self._lock:
+            totals = self._totals
+            return build_stats(
+                totals['conversations'], totals['active'], totals['intel_kinds'],
+                totals['intel_items'], totals['turns'], dict(self._scam_types)
             )
+    
+    def retention_stats(self) -> dict:
+        """Resident/archived counts for /api/stats"""
+        stats = {
+            'resident': len(self.conversations),
+            'finished_resident': len(self._finished),
+            'evicted': self._evicted,
+            'idle_ttl': self.idle_ttl,
+            'max_resident': self.max_resident
         }
+        if self.archive is not None:
+            stats['archive'] = self.archive.stats()
+        return stats
+    
+    def sweep(self, now: Optional[float] = None) -> int:
+        """Archive idle or excess finished conversations; returns how many"""
+        if self.archive is None or not self._sweep_lock.acquire(blocking=False):
+            return 0  # Another sweep is running; it covers this one
+        try:
+            now = time.monotonic() if now is None else now
+            with self._lock:
+                excess = 0
+                if len(self.conversations) > self.max_resident:
+                    # Down to a low-water mark, so evictions go out in batches
+                    excess = len(self.conversations) - int(self.max_resident * RESIDENT_LOW_WATER)
+                victims = []
+                for conv_id, touched in self._finished.items():
+                    if now - touched < self.idle_ttl and len(victims) >= excess:
+                        break
+                    victims.append((conv_id, touched))
+            if not victims:
+                return 0
+            # Serialise a block's worth at a time so writers are not held up for the whole batch
+            records, summaries = [], []
+            for start in range(0, len(victims), self.archive.block_records):
+                with self._lock:
+                    for conv_id, touched in victims[start:start + self.archive.block_records]:
+                        if self._finished.get(conv_id) == touched:
+                            conversation = self.conversations[conv_id]
+                            records.append(conversation.to_dict())
+                            summaries.append(_summary(conversation))
+            # Write outside the store lock; skip any conversation written meanwhile
+            self.archive.append(records, summaries)
+            evicted = 0
+            with self._lock:
+                for conv_id, touched in victims:
+                    if self._finished.get(conv_id) == touched:
+                        del self._finished[conv_id]
+                        del self.conversations[conv_id]
+                        evicted += 1
+                self._evicted += evicted
+            return evicted
+        finally:
+            self._sweep_lock.release()
+    
+    def _resident(self, conv_id: str) -> Optional[Conversation]:
+        """The resident model, loading it back from the archive if needed (lock held)"""
+        conversation = self.conversations.get(conv_id)
+        if conversation is None and self.archive is not None and conv_id in self.archive:
+            conversation = self.conversations[conv_id] = Conversation.from_dict(self.archive.get(conv_id))
+        return conversation
+    
+    def _touch(self, conversation: Conversation):
+        """Track finished conversations in least-recently-written order (lock held)"""
+        if conversation.status in FINISHED_STATUSES:
+            self._finished[conversation.id] = time.monotonic()
+            self._finished.move_to_end(conversation.id)
+        else:
+            self._finished.pop(conversation.id, None)
+    
+    def _maybe_sweep(self):
+        """Wake the sweeper when a write took the store past max_resident"""
+        if self.archive is not None and self._finished and len(self.conversations) > self.max_resident:
+            self._wake.set()
+    
+    def _start_sweeper(self):
+        def run():
+            while True:
+                self._wake.wait(self.sweep_interval)
+                self._wake.clear()
+                try:
+                    self.sweep()
+                except Exception:
+                    logger.exception("Archive sweep failed")
+        
+        threading.Thread(target=run, name='store-sweep', daemon=True).start()
+    
+    def _load_archived(self):
+        """Resume from an existing archive: its ids, statistics and entities"""
+        for conv_id, summary in self.archive.iter_summaries():
+            if summary is None:  # Archived without a summary: read the record
+                summary = _summary(Conversation.from_dict(self.archive.get(conv_id)))
+            intel = Intel.coerce(summary['intel'])
+            self._add(summary['status'], summary['scam_type'], intel, summary['turns'], 1)
+            self.entities.update(conv_id, None, intel, summary['seen'])
+        self._order.extend(self.archive.ids())
+    
+    def _account(self, conversation: Conversation, sign: int):
+        """Add (sign=1) or remove (sign=-1) a conversation's contribution"""
+        self._add(conversation.status, conversation.scam_type, conversation.extracted_intel,
+                  len(conversation.history), sign)
+    
+    def _add(self, status: str, scam_type: Optional[str], intel: Intel, turns: int, sign: int):
+        totals = self._totals
+        totals['conversations'] += sign
+        totals['active'] += sign * (status == 'active')
+        totals['intel_kinds'] += sign * len(intel)
+        totals['intel_items'] += sign * intel.total()
+        totals['turns'] += sign * turns
+        self._scam_types[scam_type or 'unknown'] += sign
+
 
-# Global instance
-conversation_store = ConversationStore()
\ No newline at end of file
+def _summary(conversation: Conversation) -> dict:
+    """What a restart needs from an archived conversation, without its history"""
+    # When the intel was stored is not kept; the last turn is close
+    seen = conversation.history[-1].timestamp if conversation.history else conversation.created_at
+    return {
+        'status': conversation.status,
+        'scam_type': conversation.scam_type,
+        'turns': len(conversation.history),
+        'intel': conversation.extracted_intel.to_dict(),
+        'seen': seen
+    }
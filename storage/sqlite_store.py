@@ -0,0 +1,442 @@
+import json
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from models import entity_keys, lookup_keys
+from .base_store import BaseConversationStore, build_stats, intel_counts
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS conversations (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    scam_type TEXT,
+    created_at TEXT NOT NULL,
+    extracted_intel TEXT NOT NULL DEFAULT '{}',
+    extra TEXT NOT NULL DEFAULT '{}'
+);
+CREATE INDEX IF NOT EXISTS idx_conversations_status ON conversations(status);
+CREATE INDEX IF NOT EXISTS idx_conversations_scam_type ON conversations(scam_type);
+CREATE INDEX IF NOT EXISTS idx_conversations_created_at ON conversations(created_at);
+
+CREATE TABLE IF NOT EXISTS turns (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    conv_id TEXT NOT NULL,
+    scammer TEXT NOT NULL,
+    agent TEXT NOT NULL,
+    timestamp TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_turns_conv_id ON turns(conv_id, seq);
+
+CREATE TABLE IF NOT EXISTS entity_links (
+    kind TEXT NOT NULL,
+    value TEXT NOT NULL,
+    conv_id TEXT NOT NULL,
+    linked_at TEXT NOT NULL,
+    PRIMARY KEY (kind, value, conv_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_entity_links_conv_id ON entity_links(conv_id);
+CREATE INDEX IF NOT EXISTS idx_entity_links_recent ON entity_links(kind, value, linked_at);
+
+CREATE TABLE IF NOT EXISTS entity_stats (
+    kind TEXT NOT NULL,
+    value TEXT NOT NULL,
+    conversations INTEGER NOT NULL,
+    first_seen TEXT NOT NULL,
+    last_seen TEXT NOT NULL,
+    PRIMARY KEY (kind, value)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_entity_stats_top ON entity_stats(conversations, last_seen);
+CREATE INDEX IF NOT EXISTS idx_entity_stats_kind_top ON entity_stats(kind, conversations, last_seen);
+
+CREATE TABLE IF NOT EXISTS stats (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS scam_type_counts (
+    scam_type TEXT PRIMARY KEY,
+    count INTEGER NOT NULL
+) WITHOUT ROWID;
+'''
+
+_STAT_NAMES = ('conversations', 'active', 'intel_kinds', 'intel_items', 'turns')
+
+# Fields stored in their own columns; everything else goes into `extra`
+_COLUMNS = ('status', 'scam_type', 'created_at', 'extracted_intel')
+
+
+class SQLiteConversationStore(BaseConversationStore):
+    """Conversation storage in a SQLite database (WAL mode).
+
+    Every gunicorn worker can open the same file: WAL lets readers run
+    alongside the single writer, and busy writers wait up to ``timeout``
+    seconds. Connections are per thread and re-opened after a fork.
+    Statistics are running aggregates in the ``stats`` and
+    ``scam_type_counts`` tables, updated in the same transaction as
+    each write. Extracted entities are indexed the same way: normalized
+    values link to conversations in ``entity_links``, with per-entity
+    counts and first/last-seen times in ``entity_stats``.
+    """
+
+    def __init__(self, path: str, timeout: float = 10.0):
+        self.path = path
+        self.timeout = timeout
+        self._local = threading.local()
+        conn = self._conn()
+        conn.executescript(SCHEMA)
+        if conn.execute('SELECT COUNT(*) FROM stats').fetchone()[0] == 0:
+            self._rebuild_stats()
+        if conn.execute('SELECT COUNT(*) FROM entity_stats').fetchone()[0] == 0:
+            self._rebuild_entities()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute('PRAGMA foreign_keys=OFF')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    @contextmanager
+    def _write(self):
+        """Write transaction; takes the write lock up front to avoid upgrades"""
+        conn = self._conn()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            yield conn
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        conn.execute('COMMIT')
+
+    def create(self, conv_id: str) -> dict:
+        """Create new conversation (replacing any existing one)"""
+        created_at = datetime.now().isoformat()
+        with self._write() as conn:
+            previous = self._contribution(conn, conv_id)
+            if previous is not None:
+                self._apply(conn, previous, -1)
+            conn.execute('DELETE FROM turns WHERE conv_id = ?', (conv_id,))
+            self._index_entities(conn, conv_id, None, created_at)
+            # Upsert rather than REPLACE: the rowid is the listing cursor, so a
+            # re-created conversation keeps its position (as in the memory store)
+            conn.execute(
+                'INSERT INTO conversations (id, status, scam_type, created_at) '
+                "VALUES (?, 'active', NULL, ?) "
+                "ON CONFLICT(id) DO UPDATE SET status = 'active', scam_type = NULL, "
+                "created_at = excluded.created_at, extracted_intel = '{}', extra = '{}'",
+                (conv_id, created_at)
+            )
+            self._apply(conn, ('active', None, {}, 0), 1)
+        return {
+            'id': conv_id,
+            'history': [],
+            'extracted_intel': {},
+            'scam_type': None,
+            'created_at': created_at,
+            'status': 'active'
+        }
+
+    def get(self, conv_id: str) -> Optional[dict]:
+        """Get conversation by ID"""
+        conn = self._conn()
+        row = conn.execute(
+            'SELECT id, status, scam_type, created_at, extracted_intel, extra '
+            'FROM conversations WHERE id = ?', (conv_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        turns = conn.execute(
+            'SELECT scammer, agent, timestamp FROM turns WHERE conv_id = ? ORDER BY seq',
+            (conv_id,)
+        ).fetchall()
+        return self._to_dict(row, turns)
+
+    def update(self, conv_id: str, **fields) -> None:
+        """Set top-level fields (status, scam_type, extracted_intel, ...)"""
+        with self._write() as conn:
+            previous = self._contribution(conn, conv_id)
+            if previous is None:
+                raise KeyError(conv_id)
+            status, scam_type, intel, turns = previous
+            extra = json.loads(conn.execute(
+                'SELECT extra FROM conversations WHERE id = ?', (conv_id,)
+            ).fetchone()[0])
+            assignments, params = [], []
+            for key, value in fields.items():
+                if key in ('id', 'history'):
+                    continue
+                if key == 'extracted_intel':
+                    assignments.append('extracted_intel = ?')
+                    params.append(json.dumps(value))
+                    self._index_entities(conn, conv_id, value, datetime.now().isoformat())
+                    intel = value
+                elif key in _COLUMNS:
+                    assignments.append(f'{key} = ?')
+                    params.append(value)
+                    if key == 'status':
+                        status = value
+                    elif key == 'scam_type':
+                        scam_type = value
+                else:
+                    extra[key] = value
+
+            assignments.append('extra = ?')
+            params.append(json.dumps(extra))
+            conn.execute(
+                f'UPDATE conversations SET {", ".join(assignments)} WHERE id = ?',
+                (*params, conv_id)
+            )
+            self._apply(conn, previous, -1)
+            self._apply(conn, (status, scam_type, intel, turns), 1)
+
+    def add_turn(self, conv_id: str, scammer_msg: str, agent_msg: str):
+        """Add conversation turn"""
+        self.add_turns(conv_id, [(scammer_msg, agent_msg)])
+
+    def add_turns(self, conv_id: str, turns: Iterable[Tuple[str, str]]):
+        """Add several (scammer_msg, agent_msg) turns in one transaction"""
+        timestamp = datetime.now().isoformat()
+        with self._write() as conn:
+            created = conn.execute(
+                'INSERT OR IGNORE INTO conversations (id, status, scam_type, created_at) '
+                "VALUES (?, 'active', NULL, ?)",
+                (conv_id, timestamp)
+            ).rowcount
+            if created:
+                self._apply(conn, ('active', None, {}, 0), 1)
+            added = conn.executemany(
+                'INSERT INTO turns (conv_id, scammer, agent, timestamp) VALUES (?, ?, ?, ?)',
+                ((conv_id, scammer_msg, agent_msg, timestamp) for scammer_msg, agent_msg in turns)
+            ).rowcount
+            self._bump(conn, {'turns': added})
+
+    def find_by_entity(self, value: str) -> List[str]:
+        """IDs of conversations whose extracted intel contains value"""
+        conn = self._conn()
+        ids = {}
+        for key in lookup_keys(value):
+            ids.update(conn.execute(
+                'SELECT conv_id, NULL FROM entity_links WHERE kind = ? AND value = ?', key
+            ).fetchall())
+        return list(ids)
+
+    def lookup_entity(self, value: str, kind: Optional[str] = None, limit: int = 100) -> List[dict]:
+        """Indexed entities matching value, with first/last seen and conversations"""
+        conn = self._conn()
+        matches = []
+        for key in lookup_keys(value, kind):
+            row = conn.execute(
+                'SELECT kind, value, conversations, first_seen, last_seen '
+                'FROM entity_stats WHERE kind = ? AND value = ? AND conversations > 0', key
+            ).fetchone()
+            if row is None:
+                continue
+            entity = self._entity_dict(row)
+            entity['conversation_ids'] = [r[0] for r in conn.execute(
+                'SELECT conv_id FROM entity_links WHERE kind = ? AND value = ? '
+                'ORDER BY linked_at DESC LIMIT ?', (*key, limit)
+            )]
+            matches.append(entity)
+        return matches
+
+    def top_entities(self, limit: int = 20, kind: Optional[str] = None) -> List[dict]:
+        """Entities mentioned in the most conversations"""
+        where, params = ('WHERE kind = ? AND conversations > 0', (kind,)) if kind else ('WHERE conversations > 0', ())
+        rows = self._conn().execute(
+            'SELECT kind, value, conversations, first_seen, last_seen FROM entity_stats '
+            f'{where} ORDER BY conversations DESC, last_seen DESC LIMIT ?', (*params, limit)
+        ).fetchall()
+        return [self._entity_dict(row) for row in rows]
+
+    def get_all(self) -> List[dict]:
+        """Get all conversations"""
+        conn = self._conn()
+        histories = {}
+        for conv_id, scammer, agent, timestamp in conn.execute(
+            'SELECT conv_id, scammer, agent, timestamp FROM turns ORDER BY seq'
+        ):
+            histories.setdefault(conv_id, []).append((scammer, agent, timestamp))
+
+        rows = conn.execute(
+            'SELECT id, status, scam_type, created_at, extracted_intel, extra '
+            'FROM conversations ORDER BY created_at'
+        ).fetchall()
+        return [self._to_dict(row, histories.get(row[0], [])) for row in rows]
+
+    def iter_conversations(self, status: Optional[str] = None, scam_type: Optional[str] = None,
+                           since: Optional[str] = None, until: Optional[str] = None,
+                           after: Optional[str] = None,
+                           include_history: bool = True,
+                           chunk_size: int = 200) -> Iterator[Tuple[str, dict]]:
+        """Yield (cursor, conversation) in creation order, lazily.
+        
+        Keyset pagination on rowid in short chunks, so no read transaction
+        stays open while the caller consumes results.
+        """
+        conditions, params = [], []
+        for clause, value in (('status = ?', status), ('scam_type = ?', scam_type),
+                              ('created_at >= ?', since), ('created_at < ?', until)):
+            if value is not None:
+                conditions.append(clause)
+                params.append(value)
+        where = ''.join(f' AND {c}' for c in conditions)
+
+        last = int(after) if after else 0
+        conn = self._conn()
+        while True:
+            rows = conn.execute(
+                'SELECT rowid, id, status, scam_type, created_at, extracted_intel, extra '
+                f'FROM conversations WHERE rowid > ?{where} ORDER BY rowid LIMIT ?',
+                (last, *params, chunk_size)
+            ).fetchall()
+            for rowid, *row in rows:
+                turns = conn.execute(
+                    'SELECT scammer, agent, timestamp FROM turns WHERE conv_id = ? ORDER BY seq',
+                    (row[0],)
+                ).fetchall() if include_history else []
+                conversation = self._to_dict(row, turns)
+                if not include_history:
+                    del conversation['history']
+                yield str(rowid), conversation
+            if len(rows) < chunk_size:
+                return
+            last = rows[-1][0]
+
+    def get_stats(self) -> dict:
+        """Get statistics from running aggregates (constant time)"""
+        conn = self._conn()
+        totals = dict(conn.execute('SELECT name, value FROM stats').fetchall())
+        scam_types = dict(conn.execute('SELECT scam_type, count FROM scam_type_counts').fetchall())
+        return build_stats(
+            totals.get('conversations', 0), totals.get('active', 0),
+            totals.get('intel_kinds', 0), totals.get('intel_items', 0),
+            totals.get('turns', 0), scam_types
+        )
+
+    def _contribution(self, conn, conv_id):
+        """(status, scam_type, intel, turns) for a stored conversation"""
+        row = conn.execute(
+            'SELECT status, scam_type, extracted_intel FROM conversations WHERE id = ?',
+            (conv_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        turns = conn.execute(
+            'SELECT COUNT(*) FROM turns WHERE conv_id = ?', (conv_id,)
+        ).fetchone()[0]
+        return row[0], row[1], json.loads(row[2]), turns
+
+    def _apply(self, conn, contribution, sign):
+        """Add (sign=1) or remove (sign=-1) a conversation's contribution"""
+        status, scam_type, intel, turns = contribution
+        kinds, items = intel_counts(intel)
+        self._bump(conn, {
+            'conversations': sign,
+            'active': sign * (status == 'active'),
+            'intel_kinds': sign * kinds,
+            'intel_items': sign * items,
+            'turns': sign * turns
+        })
+        conn.execute(
+            'INSERT INTO scam_type_counts (scam_type, count) VALUES (?, ?) '
+            'ON CONFLICT(scam_type) DO UPDATE SET count = count + excluded.count',
+            (scam_type or 'unknown', sign)
+        )
+
+    def _bump(self, conn, deltas):
+        conn.executemany(
+            'INSERT INTO stats (name, value) VALUES (?, ?) '
+            'ON CONFLICT(name) DO UPDATE SET value = value + excluded.value',
+            [(name, delta) for name, delta in deltas.items() if delta]
+        )
+
+    def _rebuild_stats(self):
+        """Recompute the aggregates from scratch (new or pre-aggregate databases)"""
+        with self._write() as conn:
+            conn.execute('DELETE FROM stats')
+            conn.execute('DELETE FROM scam_type_counts')
+            conn.executemany(
+                'INSERT INTO stats (name, value) VALUES (?, 0)', [(n,) for n in _STAT_NAMES]
+            )
+            turns = dict(conn.execute('SELECT conv_id, COUNT(*) FROM turns GROUP BY conv_id'))
+            for conv_id, status, scam_type, intel in conn.execute(
+                'SELECT id, status, scam_type, extracted_intel FROM conversations'
+            ).fetchall():
+                self._apply(conn, (status, scam_type, json.loads(intel), turns.get(conv_id, 0)), 1)
+
+    def _rebuild_entities(self):
+        """Index the intel of every stored conversation (new or pre-index databases)"""
+        with self._write() as conn:
+            conn.execute('DROP TABLE IF EXISTS entities')  # Un-normalized predecessor
+            conn.execute('DELETE FROM entity_links')
+            conn.execute('DELETE FROM entity_stats')
+            # When intel was stored is not recorded; the last turn is close
+            last_turn = dict(conn.execute('SELECT conv_id, MAX(timestamp) FROM turns GROUP BY conv_id'))
+            for conv_id, created_at, intel in conn.execute(
+                "SELECT id, created_at, extracted_intel FROM conversations WHERE extracted_intel != '{}'"
+            ).fetchall():
+                self._index_entities(conn, conv_id, json.loads(intel), last_turn.get(conv_id, created_at))
+
+    def _index_entities(self, conn, conv_id, intel, seen_at):
+        """Re-link a conversation's entities, adjusting counts by the difference"""
+        old = set(conn.execute(
+            'SELECT kind, value FROM entity_links WHERE conv_id = ?', (conv_id,)
+        ).fetchall())
+        new = entity_keys(intel)
+        removed = old.difference(new)
+        conn.executemany(
+            'DELETE FROM entity_links WHERE kind = ? AND value = ? AND conv_id = ?',
+            ((kind, value, conv_id) for kind, value in removed)
+        )
+        conn.executemany(
+            'UPDATE entity_stats SET conversations = conversations - 1 WHERE kind = ? AND value = ?',
+            removed
+        )
+        conn.executemany(
+            'INSERT OR IGNORE INTO entity_links (kind, value, conv_id, linked_at) VALUES (?, ?, ?, ?)',
+            ((kind, value, conv_id, seen_at) for kind, value in new if (kind, value) not in old)
+        )
+        conn.executemany(
+            'INSERT INTO entity_stats (kind, value, conversations, first_seen, last_seen) '
+            'VALUES (?, ?, ?, ?, ?) ON CONFLICT(kind, value) DO UPDATE SET '
+            'conversations = conversations + excluded.conversations, '
+            'first_seen = MIN(first_seen, excluded.first_seen), '
+            'last_seen = MAX(last_seen, excluded.last_seen)',
+            ((kind, value, int((kind, value) not in old), seen_at, seen_at) for kind, value in new)
+        )
+
+    @staticmethod
+    def _entity_dict(row) -> dict:
+        kind, value, conversations, first_seen, last_seen = row
+        return {
+            'kind': kind,
+            'value': value,
+            'conversations': conversations,
+            'first_seen': first_seen,
+            'last_seen': last_seen
+        }
+
+    @staticmethod
+    def _to_dict(row, turns) -> dict:
+        conv_id, status, scam_type, created_at, intel, extra = row
+        conversation = {
+            'id': conv_id,
+            'history': [
+                {'scammer': scammer, 'agent': agent, 'timestamp': timestamp}
+                for scammer, agent, timestamp in turns
+            ],
+            'extracted_intel': json.loads(intel),
+            'scam_type': scam_type,
+            'created_at': created_at,
+            'status': status
+        }
+        conversation.update(json.loads(extra))
+        return conversation
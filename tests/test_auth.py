@@ -0,0 +1,121 @@
+import json
+import os
+
+import pytest
+from flask import Flask, g, jsonify
+
+import utils.auth
+from utils.auth import require_api_key
+from utils.keys import FileKeyRegistry, SQLiteKeyRegistry, hash_key
+from utils.rate_limit import MemoryRateLimiter, SQLiteRateLimiter
+
+DEFAULT_KEY = 'env-default-key'
+
+
+def write_keys(path, entries, mtime=None):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(entries if isinstance(entries, str) else json.dumps(entries))
+    if mtime is not None:
+        os.utime(path, (mtime, mtime))
+
+
+@pytest.fixture
+def keys_file(tmp_path):
+    path = str(tmp_path / 'keys.json')
+    write_keys(path, [
+        {'client': 'partner-a', 'key_sha256': hash_key('key-a'), 'rate_per_minute': 60, 'burst': 5},
+        {'client': 'partner-b', 'key_sha256': hash_key('key-b'), 'enabled': False},
+    ], mtime=1_000_000)
+    return path
+
+
+def test_file_registry_looks_up_by_hash(keys_file):
+    registry = FileKeyRegistry(keys_file, default_key=DEFAULT_KEY)
+    record = registry.verify('key-a')
+    assert (record.client, record.key_hash, record.rate_per_minute, record.burst) == \
+        ('partner-a', hash_key('key-a'), 60, 5)
+    assert registry.verify(DEFAULT_KEY).client == 'default'
+    assert registry.verify('key-b') is None  # Disabled
+    assert registry.verify('unknown') is None
+    assert registry.verify(hash_key('key-a')) is None  # The digest is not a key
+
+
+def test_file_registry_keeps_last_good_keys(keys_file):
+    registry = FileKeyRegistry(keys_file, default_key=DEFAULT_KEY, cache_ttl=0)
+    assert registry.verify('key-a').client == 'partner-a'
+
+    write_keys(keys_file, '[{"client": "partner-a", "key_sha', mtime=1_000_001)  # Half written
+    assert registry.verify('key-a').client == 'partner-a'
+    assert registry.verify(DEFAULT_KEY).client == 'default'
+
+    write_keys(keys_file, [{'client': 'no-hash'}], mtime=1_000_002)
+    assert registry.verify('key-a').client == 'partner-a'
+
+    write_keys(keys_file, [{'client': 'partner-c', 'key_sha256': hash_key('key-c')}], mtime=1_000_003)
+    assert registry.verify('key-c').client == 'partner-c'
+    assert registry.verify('key-a') is None
+
+
+def test_negative_results_are_cached(keys_file):
+    registry = FileKeyRegistry(keys_file, default_key=DEFAULT_KEY, cache_ttl=60)
+    assert registry.verify('key-c') is None
+    write_keys(keys_file, [{'client': 'partner-c', 'key_sha256': hash_key('key-c')}], mtime=1_000_001)
+    assert registry.verify('key-c') is None  # Still cached as unknown
+    assert registry.stats()['hits'] == 1
+
+    registry.invalidate()
+    assert registry.verify('key-c').client == 'partner-c'
+
+
+def test_sqlite_registry_add_and_revoke(tmp_path):
+    registry = SQLiteKeyRegistry(str(tmp_path / 'keys.db'), default_key=DEFAULT_KEY)
+    raw = registry.add_key('partner-a', rate_per_minute=30, burst=3)
+    assert registry.verify(raw) == ('partner-a', hash_key(raw), 30, 3)
+    assert registry.revoke('partner-a') == 1
+    assert registry.verify(raw) is None
+    assert registry.list_keys()[0]['enabled'] is False
+
+
+@pytest.mark.parametrize('make_limiter', [
+    lambda tmp_path: MemoryRateLimiter(),
+    lambda tmp_path: SQLiteRateLimiter(str(tmp_path / 'limits.db')),
+])
+def test_bucket_spends_and_refills(tmp_path, monkeypatch, make_limiter):
+    limiter = make_limiter(tmp_path)
+    clock = [1000.0]
+    monkeypatch.setattr('utils.rate_limit.time.monotonic', lambda: clock[0])
+    monkeypatch.setattr('utils.rate_limit.time.time', lambda: clock[0])
+
+    assert [limiter.acquire('a', rate_per_minute=60, burst=3)[0] for _ in range(4)] == [True] * 3 + [False]
+    allowed, retry_after = limiter.acquire('a', rate_per_minute=60, burst=3)
+    assert not allowed and retry_after == pytest.approx(1.0)
+    assert limiter.acquire('b', rate_per_minute=60, burst=3)[0]  # Buckets are per client
+
+    clock[0] += 2  # One token per second
+    assert [limiter.acquire('a', rate_per_minute=60, burst=3)[0] for _ in range(3)] == [True, True, False]
+    clock[0] += 60  # Refills only up to the burst
+    assert limiter.acquire('a', rate_per_minute=60, burst=3, cost=10) == (True, 0.0)
+    assert not limiter.acquire('a', rate_per_minute=60, burst=3)[0]
+    assert limiter.stats()['limited'] == 4
+
+
+def test_require_api_key_returns_429(keys_file, monkeypatch):
+    monkeypatch.setattr(utils.auth, 'key_registry', FileKeyRegistry(keys_file, default_key=DEFAULT_KEY))
+    monkeypatch.setattr(utils.auth, 'rate_limiter', MemoryRateLimiter())
+    app = Flask(__name__)
+
+    @app.route('/ping')
+    @require_api_key(cost=2)
+    def ping():
+        return jsonify({'client': g.api_client})
+
+    client = app.test_client()
+    assert client.get('/ping').status_code == 401
+    assert client.get('/ping', headers={'X-API-Key': 'nope'}).status_code == 403
+
+    headers = {'X-API-Key': 'key-a'}  # burst 5, so two requests of cost 2
+    assert [client.get('/ping', headers=headers).status_code for _ in range(2)] == [200, 200]
+    response = client.get('/ping', headers=headers)
+    assert response.status_code == 429
+    assert response.headers['Retry-After'] == '1'
+    assert client.get('/ping', headers={'X-API-Key': DEFAULT_KEY}).get_json() == {'client': 'default'}
@@ -0,0 +1,316 @@
+import random
+
+import pytest
+
+from detection.campaigns import CampaignClusterer
+from detection.classifier import HashedFeatures, ScamClassifier, create_classifier, train
+from detection.cache import MemoryVerdictCache, SQLiteVerdictCache, message_fingerprint, normalize_message
+from detection.detector import ScamDetector
+from detection.keywords import (
+    HIGH_CONFIDENCE_KEYWORDS,
+    SCAM_KEYWORDS,
+    SCAM_TYPES,
+    SPECIAL_PATTERNS,
+)
+from detection.matcher import TrieMatcher
+
+TEMPLATES = [
+    "Congratulations! You won Rs {amount} in the lucky draw. Send processing fee to {name}@paytm to claim prize.",
+    "Dear customer your SBI bank account will be blocked today. Update KYC immediately at http://sbi-kyc-{n}.in",
+    "URGENT: Your account is suspended. Verify your details within 24 hours or call {phone}.",
+    "Hi {name}, are we still meeting for lunch tomorrow?",
+    "Work from home job offer! Earn money part time, {amount} rupees per day. Contact us on WhatsApp {phone}.",
+    "Your Microsoft computer has a virus. Call technical support now at {phone}.",
+    "Your order #{n} has been shipped and will arrive on Monday.",
+    "Transfer Rs {amount} to account number {acct} IFSC SBIN0001234 to reactivate your payment wallet.",
+    "Hello dear, I feel lonely. Would you like dating? I love long talks.",
+    "You have won rupees {amount}! Click here: http://claim-{n}.xyz before it expires today.",
+]
+SAFE_TEMPLATES = {3, 6}  # Everything else in TEMPLATES is a scam
+NAMES = ['rahul', 'priya', 'winner2024', 'amit.k', 'refund-desk', 'sunita']
+
+
+def legacy_keyword_check(message):
+    """The original implementation: one substring scan per keyword"""
+    message_lower = message.lower()
+    high_matches = sum(1 for kw in HIGH_CONFIDENCE_KEYWORDS if kw in message_lower)
+    all_matches = sum(1 for kw in SCAM_KEYWORDS if kw in message_lower)
+    score = min((high_matches * 0.3) + (all_matches * 0.15), 0.9)
+
+    scam_type = None
+    for stype, keywords in SCAM_TYPES.items():
+        if any(kw in message_lower for kw in keywords):
+            scam_type = stype
+            break
+
+    if any(p in message_lower for p in SPECIAL_PATTERNS['payment_handle']):
+        score = max(score, 0.8)
+        scam_type = scam_type or 'payment_fraud'
+
+    if any(p in message_lower for p in SPECIAL_PATTERNS['prize_claim']):
+        score = max(score, 0.8)
+        scam_type = 'lottery'
+
+    return score, scam_type
+
+
+def make_corpus(size, seed=42):
+    rng = random.Random(seed)
+    return [
+        rng.choice(TEMPLATES).format(
+            amount=rng.randint(100, 10_000_000),
+            name=rng.choice(NAMES),
+            n=rng.randint(1, 99999),
+            phone=f"9{rng.randint(100000000, 999999999)}",
+            acct=rng.randint(10 ** 10, 10 ** 14),
+        )
+        for _ in range(size)
+    ]
+
+
+def keyword_soup(size, seed=7):
+    """Messages built from the keyword lists themselves: overlapping, repeated,
+    glued together and in mixed case, which is where a matcher would diverge"""
+    vocabulary = sorted(
+        set(HIGH_CONFIDENCE_KEYWORDS) | set(SCAM_KEYWORDS)
+        | {kw for keywords in SCAM_TYPES.values() for kw in keywords}
+        | {p for patterns in SPECIAL_PATTERNS.values() for p in patterns}
+    )
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(size):
+        words = rng.sample(vocabulary, rng.randrange(1, 6))
+        words += [rng.choice(['hello', 'the', 'xx', '', '!!', 'rs 500'])]
+        rng.shuffle(words)
+        message = rng.choice([' ', '', '-']).join(words)
+        corpus.append(message.upper() if rng.random() < 0.2 else message)
+    return corpus
+
+
+@pytest.fixture(scope='module')
+def detector():
+    return ScamDetector.__new__(ScamDetector)  # keyword path only, no LLM client
+
+
+def test_keyword_check_matches_legacy_loop(detector):
+    corpus = make_corpus(2000) + keyword_soup(2000) + ['', '   ', 'ok', 'URGENT!!!']
+    for message in corpus:
+        assert detector._keyword_check(message) == legacy_keyword_check(message), message
+
+
+def test_trie_matcher_finds_overlapping_and_nested_words():
+    matcher = TrieMatcher(['bank', 'bank account', 'account', 'count'])
+    mask = matcher.scan('your bank account')
+    assert set(matcher.keywords_in(mask)) == {'bank', 'bank account', 'account', 'count'}
+    assert matcher.scan('nothing here') == 0
+
+
+def test_normalize_message_masks_variable_parts():
+    assert normalize_message('Send  Rs 5000 to Rahul.K@paytm NOW: https://claim-77.xyz/a?b=1') == \
+        'send rs # to <upi> now: <url>'
+    assert normalize_message('Visit www.sbi-kyc.in\n\tcode 1234') == 'visit <url> code #'
+    assert message_fingerprint('You won Rs 500! Pay priya@ybl') == \
+        message_fingerprint('you WON rs 75000!   pay amit@okaxis')
+    assert message_fingerprint('You won Rs 500') != message_fingerprint('You lost Rs 500')
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1_000_000.0]
+    monkeypatch.setattr('detection.cache.time.time', lambda: now[0])
+    return now
+
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def make_cache(request, tmp_path):
+    def make(max_size, ttl):
+        if request.param == 'memory':
+            return MemoryVerdictCache(max_size, ttl)
+        return SQLiteVerdictCache(max_size, ttl, str(tmp_path / 'verdicts.db'))
+    return make
+
+
+def test_verdict_cache_ttl(make_cache, clock):
+    cache = make_cache(10, ttl=60)
+    cache.set('a', {'is_scam': True})
+    clock[0] += 59
+    assert cache.get('a') == {'is_scam': True}
+    clock[0] += 2
+    assert cache.get('a') is None
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['expirations'], stats['size']) == (1, 1, 1, 0)
+
+
+def test_verdict_cache_evicts_least_recently_used(make_cache, clock):
+    cache = make_cache(10, ttl=3600)
+    for n in range(10):
+        cache.set(f'k{n}', {'n': n})
+        clock[0] += 100  # Past the SQLite touch interval
+    assert cache.get('k0') == {'n': 0}  # Now the most recently used
+    clock[0] += 100
+    cache.set('k10', {'n': 10})
+
+    assert cache.get('k1') is None
+    assert cache.get('k0') == {'n': 0}
+    assert cache.get('k10') == {'n': 10}
+    assert cache.stats()['evictions'] == 1
+    assert cache.stats()['size'] == 10
+
+
+class _LLM:
+    """Stands in for the LLM gateway: fails while ``down``, then answers"""
+
+    def __init__(self):
+        self.down = True
+        self.calls = 0
+
+    def complete(self, messages, **kwargs):
+        self.calls += 1
+        if self.down:
+            raise TimeoutError('model unavailable')
+        return type('Response', (), {'text': '{"is_scam": false, "confidence": 0.9, "scam_type": "none"}'})()
+
+
+def test_fallback_verdicts_are_never_cached():
+    llm = _LLM()
+    cache = MemoryVerdictCache(10, 3600)
+    detector = ScamDetector(verdict_cache=cache, llm=llm, campaigns=None, classifier=None)
+    message = 'Hi, are we still meeting for lunch at 1 tomorrow?'
+
+    assert detector.detect(message)['is_scam'] is True  # Cautious fallback
+    assert cache.stats()['size'] == 0
+
+    llm.down = False
+    assert detector.detect(message)['is_scam'] is False
+    assert cache.stats()['size'] == 1
+    assert detector.detect('hi, are we still meeting for lunch at 2 tomorrow?')['is_scam'] is False
+    assert llm.calls == 2  # The variant was answered from the cache
+
+
+LOTTERY = ('Congratulations! You have won Rs {amount} in the lucky draw. '
+           'Pay the processing fee of Rs 500 to {name}@paytm today to claim your prize money.')
+JOB = 'Work from home job offer! Earn {amount} rupees per day part time. Contact HR on WhatsApp {phone} to register.'
+
+
+def test_campaign_assignment_exact_similar_new():
+    clusterer = CampaignClusterer(bands=32, threshold=0.5)
+    first = clusterer.assign(LOTTERY.format(name='rahul', amount=50000), scam_type='lottery')
+    # Same text once numbers and handles are masked
+    assert clusterer.assign(LOTTERY.format(name='priya', amount=75000)) == first
+    # Reworded variant
+    variant = LOTTERY.format(name='amit', amount=1000).replace('today', 'within 24 hours')
+    assert clusterer.assign(variant) == first
+    other = clusterer.assign(JOB.format(amount=3000, phone='9876543210'), scam_type='job')
+    assert other != first
+
+    stats = clusterer.stats(top=5)
+    assert stats['assigned'] == {'exact': 1, 'similar': 1, 'new': 2}
+    assert [(c['campaign_id'], c['messages'], c['scam_type']) for c in stats['top']] == \
+        [(first, 3, 'lottery'), (other, 1, 'job')]
+
+
+def test_campaign_eviction_drops_lsh_buckets():
+    clusterer = CampaignClusterer(bands=32, threshold=0.5, max_campaigns=1)
+    lottery = clusterer.assign(LOTTERY.format(name='rahul', amount=50000))
+    clusterer.assign(JOB.format(amount=3000, phone='9876543210'))
+
+    assert clusterer.stats()['campaigns'] == 1
+    assert all(campaign_id != lottery for campaign_id in clusterer._buckets.values())
+    assert clusterer.match(LOTTERY.format(name='amit', amount=10).replace('today', 'now')) == (None, 0.0)
+    assert [c['messages'] for c in clusterer.stats()['top']] == [1]
+
+
+def test_campaign_verdict_reused_for_close_variants():
+    clusterer = CampaignClusterer(bands=32, threshold=0.5)
+    verdict = {'is_scam': True, 'confidence': 0.95, 'scam_type': 'lottery', 'reasoning': 'prize fee'}
+    clusterer.assign(LOTTERY.format(name='rahul', amount=50000), scam_type='lottery', verdict=verdict)
+    detector = ScamDetector(verdict_cache=None, llm=_LLM(), campaigns=clusterer, classifier=None)
+
+    reused = detector._campaign_verdict(LOTTERY.format(name='priya', amount=20))
+    assert reused == verdict and reused is not verdict
+    assert clusterer.stats()['verdicts_reused'] == 1
+    assert detector._campaign_verdict(JOB.format(amount=3000, phone='9876543210')) is None
+
+
+def csr_rows(features, messages):
+    indices, indptr, scale = features.transform(messages)
+    return [(indices[indptr[i]:indptr[i + 1]].tolist(), scale[i]) for i in range(len(messages))]
+
+
+def test_hashed_features_csr_rows():
+    features = HashedFeatures(bits=12)
+    messages = ['Pay Rs 500 to win@paytm now', '', 'ok', 'pay rs 75000 to lucky@ybl NOW']
+    indices, indptr, scale = features.transform(messages)
+
+    assert indptr.tolist()[0] == 0 and len(indptr) == len(messages) + 1
+    assert len(indices) == indptr[-1] and len(scale) == len(messages)
+    assert indices.min() >= 0 and indices.max() < features.n_features
+    rows = csr_rows(features, messages)
+    for columns, row_scale in rows:
+        assert columns == sorted(set(columns))
+        assert row_scale == pytest.approx(1 / len(columns) ** 0.5 if columns else 0.0)
+    assert rows[1] == ([], 0.0)
+    assert rows[0] == rows[3]  # Same text once masked
+
+
+def test_hashed_features_drop_4grams_across_messages():
+    features = HashedFeatures(bits=16)
+    messages = ['ab', 'cd', '', 'e', 'lottery winner']
+    # Batching must not add 4-grams spanning two neighbouring texts
+    assert csr_rows(features, messages) == [row for m in messages for row in csr_rows(features, [m])]
+
+
+def test_hashed_features_empty_batch():
+    indices, indptr, scale = HashedFeatures(bits=12).transform([])
+    assert (len(indices), indptr.tolist(), len(scale)) == (0, [0], 0)
+
+
+def labelled_corpus(size, seed=3):
+    rng = random.Random(seed)
+    messages, labels = [], []
+    for _ in range(size):
+        n = rng.randrange(len(TEMPLATES))
+        messages.append(TEMPLATES[n].format(
+            amount=rng.randint(100, 10_000_000), name=rng.choice(NAMES), n=rng.randint(1, 99999),
+            phone=f"9{rng.randint(100000000, 999999999)}", acct=rng.randint(10 ** 10, 10 ** 14)
+        ))
+        labels.append(n not in SAFE_TEMPLATES)
+    return messages, labels
+
+
+def test_classifier_train_save_load_triage(tmp_path):
+    messages, labels = labelled_corpus(400)
+    model = train(messages, labels, bits=14, epochs=4)
+    path = str(tmp_path / 'model.bin')
+    model.save(path)
+
+    loaded = create_classifier(path)
+    assert isinstance(loaded, ScamClassifier)
+    assert loaded.bias == pytest.approx(model.bias)
+    assert loaded.features.n_features == model.features.n_features
+    assert loaded.info['examples'] == 400
+    assert loaded.predict_proba(messages).tolist() == pytest.approx(model.predict_proba(messages).tolist())
+
+    test_messages, test_labels = labelled_corpus(50, seed=11)
+    decisions = loaded.triage(test_messages, safe_below=0.2, scam_above=0.8)
+    for (p, decision), label in zip(decisions, test_labels):
+        assert decision == ('scam' if p >= 0.8 else 'not_scam' if p <= 0.2 else None)
+        assert decision in (None, 'scam' if label else 'not_scam')
+    counts = loaded.stats()['decisions']
+    assert sum(counts.values()) == 50
+    assert counts['uncertain'] == sum(1 for _, decision in decisions if decision is None)
+
+    # Everything is uncertain when the band covers all probabilities
+    assert {d for _, d in loaded.triage(test_messages, safe_below=-1, scam_above=2)} == {None}
+
+
+def test_corrupt_classifier_is_disabled(tmp_path):
+    messages, labels = labelled_corpus(50)
+    path = tmp_path / 'model.bin'
+    train(messages, labels, bits=12, epochs=1).save(str(path))
+    data = path.read_bytes()
+
+    for broken in (data[:-100], data[:20], b'NOTAMODEL' + data[9:], data[:12] + b'{' * 40):
+        path.write_bytes(broken)
+        assert create_classifier(str(path)) is None
+    assert create_classifier(str(tmp_path / 'missing.bin')) is None
@@ -0,0 +1,134 @@
+import threading
+import time
+
+import pytest
+
+from api.engagement import Engagement, EngagementScheduler, SchedulerFull
+from storage.memory_store import ConversationStore
+
+
+class _Session:
+    def update(self, conversation):
+        pass
+
+    def intel(self):
+        return {}
+
+    def finalize(self, conversation):
+        return {'upi_ids': []}
+
+
+class _Extractor:
+    def start_session(self):
+        return _Session()
+
+
+class _Persona:
+    def __init__(self, fail=False):
+        self.fail = fail
+
+    def generate_response(self, message, conversation, on_token=None):
+        if self.fail:
+            raise RuntimeError('LLM unavailable')
+        return 'Sir please explain'
+
+
+class _Scammer:
+    def send_message(self, conv_id, message):
+        return {'message': 'Send the fee now'}
+
+
+class _Blocked:
+    """An engagement whose first step waits until released"""
+
+    def __init__(self, conv_id, release):
+        self.conv_id = conv_id
+        self.release = release
+
+    def step(self):
+        self.release.wait(5)
+        return False
+
+    def finish(self):
+        pass
+
+
+def engagement(store, conv_id, persona, max_turns=2):
+    store.create(conv_id)
+    return Engagement(conv_id, 'You won a lottery', max_turns, persona, _Extractor(), store, _Scammer())
+
+
+def wait_idle(scheduler):
+    for _ in range(500):
+        if not scheduler.stats()['running']:
+            return
+        time.sleep(0.01)
+    raise AssertionError('scheduler did not finish')
+
+
+def test_rejects_jobs_beyond_max_jobs():
+    scheduler = EngagementScheduler(max_workers=1, max_jobs=2)
+    release = threading.Event()
+    scheduler.submit(_Blocked('a', release))
+    scheduler.submit(_Blocked('b', release))
+    with pytest.raises(SchedulerFull):
+        scheduler.submit(_Blocked('c', release))
+    assert scheduler.is_running('b') and not scheduler.is_running('c')
+
+    release.set()
+    wait_idle(scheduler)
+    assert scheduler.stats()['completed'] == 2
+    scheduler.submit(_Blocked('c', release))  # Room again once jobs finish
+    wait_idle(scheduler)
+
+
+def test_failed_step_marks_conversation_failed():
+    store = ConversationStore()
+    scheduler = EngagementScheduler(max_workers=2, max_jobs=10)
+    scheduler.submit(engagement(store, 'ok', _Persona()))
+    scheduler.submit(engagement(store, 'broken', _Persona(fail=True)))
+    wait_idle(scheduler)
+
+    assert store.get('broken')['status'] == 'failed'
+    assert store.get('broken')['error'] == 'LLM unavailable'
+    assert store.get('ok')['status'] == 'completed'
+    assert len(store.get('ok')['history']) == 2
+    assert scheduler.stats()['failed'] == 1 and scheduler.stats()['completed'] == 1
+
+
+class _CountingStore(ConversationStore):
+    gets = 0
+
+    def get(self, conv_id):
+        self.gets += 1
+        return super().get(conv_id)
+
+
+class _Recorder(_Persona):
+    def __init__(self):
+        super().__init__()
+        self.seen = []
+
+    def generate_response(self, message, conversation, on_token=None):
+        self.seen.append([turn['agent'] for turn in conversation['history']])
+        return f'reply {len(conversation["history"])}'
+
+
+def test_turns_are_kept_locally_and_resumed():
+    store = _CountingStore()
+    store.create('resumed')
+    store.add_turn('resumed', 'Earlier message', 'earlier reply')
+
+    persona = _Recorder()
+    job = Engagement('resumed', 'You won a lottery', 4, persona, _Extractor(), store, _Scammer())
+    while job.step():
+        pass
+    job.finish()
+
+    assert store.gets == 1  # Read once to resume, never per turn
+    assert persona.seen == [['earlier reply'], ['earlier reply', 'reply 1'],
+                            ['earlier reply', 'reply 1', 'reply 2'],
+                            ['earlier reply', 'reply 1', 'reply 2', 'reply 3']]
+    stored = store.get('resumed')
+    assert [turn['agent'] for turn in stored['history']] == ['earlier reply', 'reply 1', 'reply 2', 'reply 3', 'reply 4']
+    assert stored['status'] == 'completed'
@@ -0,0 +1,49 @@
+import pytest
+
+from extraction.patterns import ENTITY_SCANNER, PATTERNS, SCAN_ORDER, scan_entities
+
+
+def found(text):
+    return {name: items for name, items in scan_entities(text).items() if items}
+
+
+def test_scan_order_covers_every_pattern():
+    assert sorted(SCAN_ORDER) == sorted(PATTERNS)
+    assert list(ENTITY_SCANNER.groupindex) == SCAN_ORDER
+
+
+@pytest.mark.parametrize('text, expected', [
+    # Text inside a URL is never a UPI ID, email or number
+    ('see https://x.com/pay?to=rahul@upi&amt=9876543210 now',
+     {'url': ['https://x.com/pay?to=rahul@upi&amt=9876543210']}),
+    # An address with a domain TLD is an email, not a UPI ID
+    ('pay rahul@paytm or mail a.b@gmail.com',
+     {'upi_id': ['rahul@paytm'], 'email': ['a.b@gmail.com']}),
+    # Mobile numbers are phone numbers, not bank accounts
+    ('call +919876543210 or 9876543210',
+     {'phone_international': ['+919876543210'], 'phone_indian': ['9876543210']}),
+    # Digit runs that are not phone numbers are bank accounts
+    ('acct 123456789012 ref 9876543210123 IFSC SBIN0001234',
+     {'bank_account': ['123456789012', '9876543210123'], 'ifsc': ['SBIN0001234']}),
+])
+def test_overlaps_resolved_by_scan_order(text, expected):
+    assert found(text) == expected
+
+
+def test_matches_deduplicated_in_first_seen_order():
+    text = 'pay b@ybl then a@ybl then b@ybl again'
+    assert scan_entities(text)['upi_id'] == ['b@ybl', 'a@ybl']
+
+
+def test_prefilter_does_not_change_matches():
+    texts = [
+        'Send Rs 5000 to winner@paytm, call 9876543210 or visit http://claim-77.xyz today',
+        'Account 123456789012 IFSC HDFC0004321, mail refund.desk@gmail.com for help',
+        'Dear customer, your KYC is pending. Reply YES',
+        'wa.me/+447911123456 or +447911123456 text me:9123456780',
+    ]
+    for text in texts:
+        unfiltered = {name: {} for name in SCAN_ORDER}
+        for match in ENTITY_SCANNER.finditer(text):
+            unfiltered[match.lastgroup][match.group()] = None
+        assert scan_entities(text) == {name: list(items) for name, items in unfiltered.items()}
@@ -0,0 +1,199 @@
+import asyncio
+import threading
+
+import httpx
+import pytest
+from groq import APIConnectionError, BadRequestError, InternalServerError, RateLimitError
+
+from config import Config
+from llm import LLMGateway, LLMResponse
+from llm.gateway import GroqBackend, StubBackend
+
+MESSAGES = [{'role': 'user', 'content': 'hello'}]
+REQUEST = httpx.Request('POST', 'https://api.groq.com/openai/v1/chat/completions')
+
+
+def status_error(cls, status, retry_after=None):
+    headers = {'retry-after': retry_after} if retry_after is not None else {}
+    return cls(f'HTTP {status}', response=httpx.Response(status, headers=headers, request=REQUEST), body=None)
+
+
+class _Scripted:
+    """Backend that raises or answers from a script, deciding retries like GroqBackend"""
+
+    name = 'scripted'
+    is_retryable = staticmethod(GroqBackend.is_retryable)
+    retry_after = staticmethod(GroqBackend.retry_after)
+
+    def __init__(self, *outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = 0
+
+    def _next(self):
+        self.calls += 1
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return LLMResponse(text=outcome, prompt_tokens=3, completion_tokens=1)
+
+    def create(self, *args):
+        return self._next()
+
+    async def acreate(self, *args):
+        return self._next()
+
+    def create_stream(self, *args):
+        response = self._next()
+        for word in response.text.split():
+            yield LLMResponse(text=word)
+            if self.outcomes and isinstance(self.outcomes[0], Exception):
+                raise self.outcomes.pop(0)  # Fails mid-stream
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Backoff delays, recorded instead of slept"""
+    delays = []
+    monkeypatch.setattr('llm.gateway.time.sleep', delays.append)
+
+    async def asleep(delay):
+        delays.append(delay)
+    monkeypatch.setattr('llm.gateway.asyncio.sleep', asleep)
+    return delays
+
+
+def test_groq_errors_classified_for_retry():
+    assert GroqBackend.is_retryable(status_error(RateLimitError, 429))
+    assert GroqBackend.is_retryable(status_error(InternalServerError, 503))
+    assert GroqBackend.is_retryable(APIConnectionError(request=REQUEST))
+    assert not GroqBackend.is_retryable(status_error(BadRequestError, 400))
+    assert not GroqBackend.is_retryable(ValueError('bad prompt'))
+
+    assert GroqBackend.retry_after(status_error(RateLimitError, 429, '2.5')) == 2.5
+    assert GroqBackend.retry_after(status_error(RateLimitError, 429, 'Wed, 21 Oct 2026 07:28:00 GMT')) is None
+    assert GroqBackend.retry_after(status_error(RateLimitError, 429)) is None
+    assert GroqBackend.retry_after(ValueError()) is None
+
+
+def test_complete_retries_429_and_5xx_with_backoff(sleeps, monkeypatch):
+    monkeypatch.setattr('llm.gateway.random.uniform', lambda low, high: high)
+    backend = _Scripted(status_error(RateLimitError, 429), status_error(InternalServerError, 502), 'ok')
+    gateway = LLMGateway(backend, max_retries=2)
+
+    response = gateway.complete(MESSAGES)
+    assert (response.text, response.prompt_tokens, backend.calls) == ('ok', 3, 3)
+    assert sleeps == [Config.LLM_BACKOFF_BASE, Config.LLM_BACKOFF_BASE * 2]
+
+
+def test_backoff_is_jittered_and_capped():
+    gateway = LLMGateway(_Scripted(), max_retries=2)
+    error = status_error(InternalServerError, 500)
+    for attempt in range(10):
+        delay = gateway._backoff(attempt, error)
+        assert 0 <= delay <= min(Config.LLM_BACKOFF_BASE * 2 ** attempt, Config.LLM_BACKOFF_MAX)
+
+
+def test_retry_after_is_honoured_up_to_the_cap(sleeps):
+    backend = _Scripted(status_error(RateLimitError, 429, '1.5'), status_error(RateLimitError, 429, '3600'), 'ok')
+    assert LLMGateway(backend, max_retries=2).complete(MESSAGES).text == 'ok'
+    assert sleeps == [1.5, Config.LLM_BACKOFF_MAX]
+
+
+def test_gives_up_after_max_retries_and_on_client_errors(sleeps):
+    backend = _Scripted(*[status_error(InternalServerError, 500)] * 3)
+    with pytest.raises(InternalServerError):
+        LLMGateway(backend, max_retries=2).complete(MESSAGES)
+    assert backend.calls == 3
+
+    backend = _Scripted(status_error(BadRequestError, 400), 'ok')
+    with pytest.raises(BadRequestError):
+        LLMGateway(backend, max_retries=2).complete(MESSAGES)
+    assert backend.calls == 1 and len(sleeps) == 2
+
+
+def test_stream_retries_only_before_the_first_delta(sleeps):
+    backend = _Scripted(status_error(RateLimitError, 429, '0'), 'one two three')
+    stream = LLMGateway(backend, max_retries=2).stream(MESSAGES)
+    assert list(stream) == ['one', 'two', 'three']
+    assert stream.response.text == 'onetwothree' and backend.calls == 2
+
+    backend = _Scripted('one two', status_error(InternalServerError, 500), 'never')
+    stream = LLMGateway(backend, max_retries=2).stream(MESSAGES)
+    received = []
+    with pytest.raises(InternalServerError):
+        for text in stream:
+            received.append(text)
+    assert received == ['one'] and backend.calls == 1
+
+
+def test_acomplete_retries_with_backoff(sleeps):
+    backend = _Scripted(status_error(RateLimitError, 429, '2'), 'ok')
+    response = asyncio.run(LLMGateway(backend, max_retries=1).acomplete(MESSAGES))
+    assert (response.text, backend.calls, sleeps) == ('ok', 2, [2.0])
+
+
+def test_acomplete_caps_concurrency_per_event_loop():
+    class Slow(_Scripted):
+        def __init__(self):
+            super().__init__()
+            self.running = self.peak = 0
+            self.lock = threading.Lock()
+
+        async def acreate(self, *args):
+            with self.lock:
+                self.running += 1
+                self.peak = max(self.peak, self.running)
+            await asyncio.sleep(0.01)
+            with self.lock:
+                self.running -= 1
+            return LLMResponse(text='ok')
+
+    backend = Slow()
+    gateway = LLMGateway(backend, max_concurrency=2, max_retries=0)
+
+    async def burst():
+        return await asyncio.gather(*(gateway.acomplete(MESSAGES) for _ in range(6)))
+
+    # Each loop (here: two threads, then the main thread) gets its own semaphore
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(asyncio.run(burst()))) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    results.append(asyncio.run(burst()))
+    assert [len(r) for r in results] == [6, 6, 6]
+    assert 2 <= backend.peak <= 4
+
+
+def test_stub_backend_canned_replies(sleeps):
+    gateway = LLMGateway(StubBackend(latency=0), max_retries=2)
+    response = gateway.complete(MESSAGES)
+    assert response.text == StubBackend.default_responder(MESSAGES)
+    assert (response.prompt_tokens, response.completion_tokens) == (len('hello') // 4, len(response.text) // 4)
+    assert gateway.complete([{'role': 'user', 'content': 'Answer in JSON'}]).text == '{}'
+
+    stream = gateway.stream(MESSAGES)
+    assert ''.join(stream) == response.text
+    assert stream.response.completion_tokens == response.completion_tokens
+    assert asyncio.run(gateway.acomplete(MESSAGES)).text == response.text
+
+    echo = LLMGateway(StubBackend(responder=lambda messages: messages[-1]['content'].upper(), latency=0))
+    assert echo.complete(MESSAGES).text == 'HELLO'
+
+    def broken(messages):
+        raise RuntimeError('stub failure')
+    with pytest.raises(RuntimeError):
+        LLMGateway(StubBackend(responder=broken, latency=0), max_retries=2).complete(MESSAGES)
+    assert sleeps == []  # Stub errors are never retried
+
+
+def test_groq_async_client_belongs_to_its_event_loop():
+    backend = GroqBackend(api_key='gsk_test')
+
+    async def clients():
+        return backend.async_client, backend.async_client
+
+    first, again = asyncio.run(clients())
+    second, _ = asyncio.run(clients())
+    assert first is again and first is not second
@@ -0,0 +1,76 @@
+import io
+import json
+import logging
+import queue
+import threading
+
+import pytest
+
+from utils.log import REDACTED, DroppingQueueHandler, JsonFormatter, RedactingFilter
+
+API_KEY = 'scam-honeypot-secret-key-12345'
+GROQ_KEY = 'gsk_' + 'A1b2C3d4' * 6
+
+
+@pytest.fixture
+def capture(request):
+    """A logger writing through RedactingFilter to a buffer, in the given format"""
+    def make(fmt):
+        buffer = io.StringIO()
+        output = logging.StreamHandler(buffer)
+        output.addFilter(RedactingFilter([API_KEY, GROQ_KEY, 'short', None]))
+        output.setFormatter(JsonFormatter() if fmt == 'json' else logging.Formatter('%(levelname)s %(message)s'))
+        logger = logging.getLogger(f'tests.log.{fmt}')
+        logger.handlers = [output]
+        logger.propagate = False
+        logger.setLevel(logging.INFO)
+        request.addfinalizer(lambda: setattr(logger, 'handlers', []))
+        return logger, buffer
+    return make
+
+
+def test_redacts_configured_secrets_and_provider_tokens_in_plain_text(capture):
+    logger, buffer = capture('text')
+    logger.info('key=%s groq=%s', API_KEY, GROQ_KEY)
+    logger.warning('retrying with sk_%s and pk_%s', 'live' * 5, 'Test1234' * 2)
+    logger.info('too short to be a key: sk_abc, short, pk_1234')
+
+    lines = buffer.getvalue().splitlines()
+    assert lines[0] == f'INFO key={REDACTED} groq={REDACTED}'
+    assert lines[1] == f'WARNING retrying with {REDACTED} and {REDACTED}'
+    assert lines[2] == 'INFO too short to be a key: sk_abc, short, pk_1234'
+
+
+def test_redacts_messages_and_extra_fields_in_json(capture):
+    logger, buffer = capture('json')
+    logger.info('auth header %r', {'X-API-Key': API_KEY},
+                extra={'api_key': API_KEY, 'token': f'Bearer {GROQ_KEY}', 'attempt': 2})
+    try:
+        raise ValueError('boom')
+    except ValueError:
+        logger.exception('failed for %s', 'sk_' + 'x' * 20)
+
+    first, second = (json.loads(line) for line in buffer.getvalue().splitlines())
+    assert first['msg'] == f"auth header {{'X-API-Key': '{REDACTED}'}}"
+    assert (first['api_key'], first['token'], first['attempt']) == (REDACTED, f'Bearer {REDACTED}', 2)
+    assert (first['level'], first['logger']) == ('INFO', 'tests.log.json')
+    assert second['msg'] == f'failed for {REDACTED}'
+    assert API_KEY not in buffer.getvalue() and GROQ_KEY not in buffer.getvalue()
+
+
+def test_dropping_queue_handler_never_blocks():
+    handler = DroppingQueueHandler(queue.Queue(maxsize=2))
+    logger = logging.getLogger('tests.log.queue')
+    logger.handlers = [handler]
+    logger.propagate = False
+    try:
+        # Nothing drains the queue; a blocking put would hang the thread
+        thread = threading.Thread(target=lambda: [logger.warning('record %d', n) for n in range(5)])
+        thread.start()
+        thread.join(timeout=5)
+        assert not thread.is_alive()
+    finally:
+        logger.handlers = []
+
+    assert (handler.queue.qsize(), handler.dropped) == (2, 3)
+    assert [handler.queue.get_nowait().getMessage() for _ in range(2)] == ['record 0', 'record 1']
@@ -0,0 +1,140 @@
+import importlib
+import sys
+import threading
+
+import pytest
+
+from config import Config
+from llm import estimate_tokens
+from personas import BasePersona, PersonaRegistry, UnknownPersona
+from personas.registry import SCAM_TYPE_PERSONAS
+
+LLM = object()  # Personas only hold on to the client until they reply
+
+PERSONA_MODULE = '''
+from personas import BasePersona
+
+from . import IMPORTS
+
+IMPORTS.append(__name__)
+
+
+class {cls}(BasePersona):
+    def __init__(self, llm=None):
+        super().__init__(name={name!r}, age=30, occupation='tester', location='Pune', llm=llm)
+
+    def get_system_prompt(self):
+        return 'You are {name}.'
+'''
+
+
+@pytest.fixture
+def persona_package(tmp_path, monkeypatch):
+    """A throwaway persona package whose modules record being imported"""
+    package = tmp_path / 'fake_personas'
+    package.mkdir()
+    (package / '__init__.py').write_text('IMPORTS = []\n')
+    for name in ('alpha', 'beta', 'gamma'):
+        (package / f'{name}.py').write_text(PERSONA_MODULE.format(cls=name.title() + 'Persona', name=name))
+    (package / 'helpers.py').write_text('from . import IMPORTS\n\nIMPORTS.append(__name__)\n')
+    monkeypatch.syspath_prepend(str(tmp_path))
+    yield importlib.import_module('fake_personas')
+    for module in [m for m in sys.modules if m.startswith('fake_personas')]:
+        del sys.modules[module]
+
+
+def test_registry_imports_personas_on_first_use(persona_package):
+    registry = PersonaRegistry(persona_package.__name__, llm=LLM, routes={'lottery': 'beta'}, default='alpha')
+    imports = persona_package.IMPORTS
+    assert registry.available() == ['alpha', 'beta', 'gamma', 'helpers']
+    assert imports == [] and registry.loaded() == []
+
+    persona = registry.for_scam_type('lottery')
+    assert (persona.name, persona.llm) == ('beta', LLM)
+    assert imports == ['fake_personas.beta'] and registry.loaded() == ['beta']
+
+    assert registry.get('beta') is persona
+    assert registry.get().name == 'alpha'
+    assert imports == ['fake_personas.beta', 'fake_personas.alpha']
+
+    with pytest.raises(UnknownPersona):
+        registry.get('missing')
+    with pytest.raises(UnknownPersona):
+        registry.get('helpers')  # A module without a persona class
+    assert registry.loaded() == ['alpha', 'beta']
+
+
+def test_registry_creates_each_persona_once_across_threads(persona_package):
+    registry = PersonaRegistry(persona_package.__name__, llm=LLM, default='alpha')
+    start = threading.Barrier(8)
+    personas = []
+
+    def worker():
+        start.wait()
+        personas.append(registry.get('gamma'))
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len({id(p) for p in personas}) == 1
+    assert persona_package.IMPORTS == ['fake_personas.gamma']
+
+
+def test_scam_types_route_to_their_persona():
+    registry = PersonaRegistry(llm=LLM)
+    assert set(SCAM_TYPE_PERSONAS.values()) <= set(registry.available())
+    assert Config.DEFAULT_PERSONA in registry.available()
+
+    for scam_type, name in SCAM_TYPE_PERSONAS.items():
+        assert registry.name_for(scam_type) == name
+        persona = registry.for_scam_type(scam_type)
+        assert persona is registry.get(name)
+        assert type(persona).__module__ == f'personas.{name}'
+        assert isinstance(persona, BasePersona) and persona.llm is LLM
+
+    # Unrouted and undetected scam types get the default persona
+    for scam_type in ('crypto', 'unknown', None):
+        assert registry.name_for(scam_type) == Config.DEFAULT_PERSONA
+        assert registry.for_scam_type(scam_type) is registry.get(Config.DEFAULT_PERSONA)
+    assert registry.loaded() == sorted(set(SCAM_TYPE_PERSONAS.values()) | {Config.DEFAULT_PERSONA})
+
+
+def turns(count):
+    return [{'scammer': f'Turn {n}: send the OTP to verify account {n * 1111}',
+             'agent': f'Which OTP sir, I got {n} messages?'} for n in range(count)]
+
+
+def history_tokens(history):
+    return sum(estimate_tokens(t['scammer']) + estimate_tokens(t['agent']) for t in history)
+
+
+@pytest.mark.parametrize('budget', [0, 10, 25, 100, 1000])
+def test_trim_history_keeps_newest_turns_within_budget(budget):
+    persona = PersonaRegistry(llm=LLM).get('ramesh')
+    history = turns(40)
+    kept, used = persona.trim_history(history, budget)
+
+    assert used == history_tokens(kept) <= budget
+    assert kept == history[len(history) - len(kept):]  # A suffix, in order
+    if len(kept) < len(history):
+        assert used + history_tokens(history[-len(kept) - 1:][:1]) > budget  # The next older turn would not fit
+
+
+def test_build_messages_uses_configured_budget(monkeypatch):
+    persona = PersonaRegistry(llm=LLM).get('sunita')
+    history = turns(200)
+    monkeypatch.setattr(Config, 'PERSONA_HISTORY_TOKEN_BUDGET', 120)
+    messages, estimated = persona.build_messages('Pay the fee now', {'history': history})
+
+    assert messages[0] is persona.system_message
+    assert messages[-1] == {'role': 'user', 'content': 'Pay the fee now'}
+    sent = messages[1:-1]
+    assert [m['role'] for m in sent] == ['user', 'assistant'] * (len(sent) // 2)
+    kept = history[-(len(sent) // 2):]
+    assert [m['content'] for m in sent[::2]] == [t['scammer'] for t in kept]
+    assert history_tokens(kept) <= 120 < history_tokens(history[-len(kept) - 1:])
+    assert estimated == persona.system_tokens + history_tokens(kept) + estimate_tokens('Pay the fee now')
+
+    assert persona.build_messages('hello', None)[0] == [persona.system_message, {'role': 'user', 'content': 'hello'}]
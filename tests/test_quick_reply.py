@@ -0,0 +1,71 @@
+import random
+
+from api.quick_reply import REPLY_RULES, SCAM_FLAG_KEYWORDS, QuickReplyEngine
+
+FILLER = ['sir', 'please', 'your', 'today', 'immediately', 'dear', 'customer', 'rs', '5000',
+          'hello', 'kindly', 'share', 'details', 'number', 'team', 'support', 'now']
+TRIGGERS = sorted({kw for rule in REPLY_RULES for kw in rule['keywords']} | set(SCAM_FLAG_KEYWORDS)
+                  | {'payments', 'callback', 'Blocked', 'BANKING', 'linked', 'upi@paytm'})
+
+
+def legacy_reply(message):
+    """The original process-message handler's if/elif chain"""
+    msg = message.lower()
+    scam_keywords = [
+        'blocked', 'verify', 'urgent', 'account',
+        'bank', 'otp', 'prize', 'lottery',
+        'upi', 'paytm', 'payment', 'money'
+    ]
+    is_scam = any(k in msg for k in scam_keywords)
+    if 'blocked' in msg or 'suspended' in msg:
+        reply = "Oh no! My account blocked? But sir, I not do anything wrong."
+    elif 'verify' in msg:
+        reply = "Verify again? But I already did KYC."
+    elif 'bank' in msg:
+        reply = "Which bank sir? I have SBI only."
+    elif 'prize' in msg or 'lottery' in msg:
+        reply = "Really? I won? I not remember applying."
+    elif 'upi' in msg or 'paytm' in msg:
+        reply = "UPI I not know properly. My son handles phone."
+    elif 'urgent' in msg:
+        reply = "So urgent? I am busy now."
+    elif 'link' in msg:
+        reply = "Link? Please explain slowly."
+    elif 'call' in msg:
+        reply = "Is this official number sir?"
+    elif 'pay' in msg or 'money' in msg:
+        reply = "Why I need to pay money?"
+    else:
+        reply = "Sir, please explain again."
+    return is_scam, reply
+
+
+def make_corpus(size, seed=7):
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(size):
+        words = rng.choices(FILLER, k=rng.randint(4, 30))
+        for _ in range(rng.randint(0, 3)):
+            words.insert(rng.randrange(len(words) + 1), rng.choice(TRIGGERS))
+        corpus.append(' '.join(words))
+    return corpus
+
+
+def test_rule_table_matches_legacy_chain():
+    engine = QuickReplyEngine()
+    corpus = make_corpus(3000) + [
+        '', 'Your account is BLOCKED', 'paymentlink', 'recall the prize', 'Pay via UPI urgently',
+        'verify your bank account', 'hello sir', 'otp', 'click the link to call us',
+    ]
+    for message in corpus:
+        assert engine.respond(message) == legacy_reply(message), message
+
+
+def test_custom_rule_table():
+    engine = QuickReplyEngine(
+        rules=[{'name': 'gift', 'keywords': ['gift card'], 'reply': 'Which gift card?'}],
+        scam_keywords=['gift card', 'itunes'], default_reply='Hmm?'
+    )
+    assert engine.respond('Buy an iTunes GIFT CARD now') == (True, 'Which gift card?')
+    assert engine.respond('Send itunes codes') == (True, 'Hmm?')
+    assert engine.respond('hello') == (False, 'Hmm?')
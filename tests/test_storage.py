@@ -0,0 +1,286 @@
+import json
+import random
+
+import pytest
+
+import api.routes
+from config import Config
+from models import entity_keys
+from storage.archive import ConversationArchive
+from storage.memory_store import ConversationStore
+from storage.sqlite_store import SQLiteConversationStore
+
+STATUSES = ['active', 'queued', 'completed', 'failed', 'not_a_scam']
+SCAM_TYPES = [None, 'lottery', 'banking', 'payment_fraud', 'phishing']
+
+
+def recount(store):
+    """Statistics computed the old way, by walking every conversation"""
+    conversations = store.get_all()
+    scam_types = {}
+    for c in conversations:
+        key = c.get('scam_type') or 'unknown'
+        scam_types[key] = scam_types.get(key, 0) + 1
+    total_turns = sum(len(c['history']) for c in conversations)
+    return {
+        'total_conversations': len(conversations),
+        'active_conversations': sum(1 for c in conversations if c['status'] == 'active'),
+        'total_intel_extracted': sum(len(c.get('extracted_intel', {})) for c in conversations),
+        'total_intel_items': sum(
+            sum(len(v) for v in c.get('extracted_intel', {}).values()) for c in conversations
+        ),
+        'scam_types_breakdown': scam_types,
+        'avg_turns_per_conversation': total_turns / max(len(conversations), 1),
+    }
+
+
+def recount_entities(store):
+    """Conversations per normalized entity, by walking every conversation"""
+    counts = {}
+    for c in store.get_all():
+        for key in entity_keys(c.get('extracted_intel')):
+            counts[key] = counts.get(key, 0) + 1
+    return counts
+
+
+def indexed_entities(store):
+    return {
+        (e['kind'], e['value']): e['conversations']
+        for e in store.top_entities(limit=1_000_000)
+    }
+
+
+def assert_consistent(store):
+    assert store.get_stats() == recount(store)
+    assert indexed_entities(store) == recount_entities(store)
+
+
+def random_intel(rng):
+    return {
+        kind: [f'{kind}-{rng.randrange(20)}'.upper() if rng.random() < 0.3 else f'{kind}-{rng.randrange(20)}'
+               for _ in range(rng.randrange(3))]
+        for kind in rng.sample(['upi_ids', 'bank_accounts', 'phone_numbers', 'urls'], rng.randrange(5))
+    }
+
+
+@pytest.fixture(params=['memory', 'memory+archive', 'sqlite'])
+def store(request, tmp_path):
+    if request.param == 'memory':
+        return ConversationStore()
+    if request.param == 'memory+archive':
+        # Evicts finished conversations on every sweep; they still count
+        return ConversationStore(
+            archive=ConversationArchive(str(tmp_path / 'archive'), block_records=8),
+            idle_ttl=0, max_resident=20, sweep_interval=0
+        )
+    return SQLiteConversationStore(str(tmp_path / 'stats.db'))
+
+
+def test_create_update_replace(store):
+    store.create('a')
+    store.add_turn('a', 'scammer says', 'agent says')
+    store.update('a', status='completed', scam_type='lottery',
+                 extracted_intel={'upi_ids': ['win@paytm', 'WIN@paytm'], 'urls': []})
+    store.create('b')
+    store.update('b', extracted_intel={'upi_ids': ['win@paytm']})
+    assert_consistent(store)
+
+    # Re-creating an id replaces the conversation and drops its intel
+    store.create('a')
+    assert_consistent(store)
+    assert store.get_stats()['active_conversations'] == 2
+
+    getattr(store, 'sweep', lambda: 0)()
+    store.update('b', status='failed', extracted_intel={})
+    assert_consistent(store)
+    assert indexed_entities(store) == {}
+
+
+def test_random_operations(store):
+    rng = random.Random(7)
+    ids = []
+    sweep = getattr(store, 'sweep', lambda: 0)
+    for i in range(1500):
+        op = rng.random()
+        if op < 0.15 or not ids:
+            conv_id = rng.choice(ids) if ids and rng.random() < 0.1 else f'conv_{i}'
+            store.create(conv_id)
+            if conv_id not in ids:
+                ids.append(conv_id)
+        elif op < 0.55:
+            store.add_turn(rng.choice(ids), 'scammer says', 'agent says')
+        elif op < 0.65:
+            conv_id = f'conv_implicit_{i}'  # add_turns creates missing conversations
+            store.add_turns(conv_id, [('s', 'a')] * rng.randrange(1, 4))
+            ids.append(conv_id)
+        else:
+            fields = {}
+            if rng.random() < 0.6:
+                fields['status'] = rng.choice(STATUSES)
+            if rng.random() < 0.4:
+                fields['scam_type'] = rng.choice(SCAM_TYPES)
+            if rng.random() < 0.4:
+                fields['extracted_intel'] = random_intel(rng)
+            store.update(rng.choice(ids), **fields)
+        sweep()
+
+        if i % 100 == 0:
+            assert_consistent(store)
+    assert_consistent(store)
+
+
+def test_sqlite_aggregates_survive_reopen(tmp_path):
+    path = str(tmp_path / 'stats.db')
+    store = SQLiteConversationStore(path)
+    store.create('a')
+    store.add_turns('a', [('s', 'a')] * 3)
+    store.update('a', status='completed', scam_type='banking',
+                 extracted_intel={'bank_accounts': ['123456789012']})
+    store.create('b')
+
+    reopened = SQLiteConversationStore(path)
+    assert_consistent(reopened)
+    assert reopened.get_stats() == store.get_stats()
+
+
+def finished_conversations(store, count):
+    for n in range(count):
+        conv_id = f'conv_{n}'
+        store.create(conv_id)
+        store.add_turns(conv_id, [(f'scammer {n}', f'agent {n}')] * (n % 4 + 1))
+        store.update(conv_id, status='completed' if n % 3 else 'failed',
+                     scam_type='lottery' if n % 2 else None,
+                     extracted_intel={'upi_ids': [f'win{n % 7}@paytm']})
+
+
+def test_archive_sweep_and_reload(tmp_path):
+    directory = str(tmp_path / 'archive')
+    store = ConversationStore(archive=ConversationArchive(directory, block_records=8),
+                              idle_ttl=3600, max_resident=10, sweep_interval=0)
+    finished_conversations(store, 40)
+    store.create('live')
+
+    # Writes past max_resident never archive by themselves
+    assert len(store.conversations) == 41
+    assert store.sweep() == 32
+    assert len(store.conversations) == 9
+    assert store.retention_stats()['archive']['conversations'] == 32
+    assert_consistent(store)
+
+    archived = store.get('conv_0')
+    assert archived['status'] == 'failed'
+    assert [t['scammer'] for t in archived['history']] == ['scammer 0']
+    assert archived['extracted_intel'].to_dict() == {'upi_ids': ['win0@paytm']}
+    assert 'conv_0' not in store.conversations
+
+    # A restart keeps only what was archived; stats and entities come from the index rows
+    reloaded = ConversationStore(archive=ConversationArchive(directory),
+                                 idle_ttl=3600, max_resident=10, sweep_interval=0)
+    assert reloaded.archive._block_cache == {}
+    assert_consistent(reloaded)
+    assert reloaded.get_stats()['total_conversations'] == 32
+    assert reloaded.get('conv_5').to_dict() == store.get('conv_5').to_dict()
+    assert reloaded.find_by_entity('win0@paytm') == [f'conv_{n}' for n in range(0, 32, 7)]
+
+    # Writing to an archived conversation makes it resident; archiving it again supersedes the old copy
+    reloaded.update('conv_1', status='completed', extracted_intel={})
+    assert 'conv_1' in reloaded.conversations
+    reloaded.sweep(now=float('inf'))
+    again = ConversationStore(archive=ConversationArchive(directory), sweep_interval=0)
+    assert_consistent(again)
+    assert not again.get('conv_1')['extracted_intel']
+    assert [c['id'] for c in again.get_all()][:3] == ['conv_0', 'conv_1', 'conv_2']
+
+
+def test_archive_reload_without_summaries(tmp_path):
+    directory = str(tmp_path / 'archive')
+    archive = ConversationArchive(directory, block_records=4)
+    source = ConversationStore(sweep_interval=0)
+    finished_conversations(source, 10)
+    archive.append(c.to_dict() for c in source.get_all())  # Index rows without a summary column
+
+    store = ConversationStore(archive=ConversationArchive(directory), sweep_interval=0)
+    assert store.get_stats() == source.get_stats()
+    assert indexed_entities(store) == indexed_entities(source)
+
+
+def listing_fixture(store, count):
+    for n in range(count):
+        store.create(f'conv_{n}')
+        store.add_turn(f'conv_{n}', f'scammer {n}', f'agent {n}')
+        store.update(f'conv_{n}', status='completed' if n % 2 else 'active',
+                     scam_type='lottery' if n % 3 == 0 else 'banking')
+
+
+def walk(store, limit, **filters):
+    pages, cursor = [], None
+    while True:
+        page, cursor = store.list_conversations(limit, after=cursor, **filters)
+        pages.append([c['id'] for c in page])
+        if cursor is None:
+            return pages
+
+
+def test_list_conversations_pages_in_creation_order(store):
+    listing_fixture(store, 12)
+    getattr(store, 'sweep', lambda: 0)()
+
+    assert walk(store, 5) == [[f'conv_{n}' for n in range(start, min(start + 5, 12))] for start in (0, 5, 10)]
+    assert walk(store, 4) == [[f'conv_{n}' for n in range(start, start + 4)] for start in (0, 4, 8)]
+    assert walk(store, 2, status='completed', scam_type='lottery') == [['conv_3', 'conv_9']]
+    assert walk(store, 20, status='failed') == [[]]
+
+    page, _ = store.list_conversations(1, include_history=False)
+    assert 'history' not in page[0] and page[0]['scam_type'] == 'lottery'
+    assert [t['scammer'] for t in store.list_conversations(1)[0][0]['history']] == ['scammer 0']
+
+
+def test_list_conversations_cursor_survives_inserts(store):
+    listing_fixture(store, 6)
+    first, cursor = store.list_conversations(3)
+    assert [c['id'] for c in first] == ['conv_0', 'conv_1', 'conv_2']
+
+    # Writes to listed and unlisted conversations and new ones neither repeat nor skip rows
+    store.add_turn('conv_1', 'again', 'again')
+    store.update('conv_4', status='completed')
+    store.create('conv_new')
+    getattr(store, 'sweep', lambda: 0)()
+
+    rest = []
+    while cursor is not None:
+        page, cursor = store.list_conversations(2, after=cursor)
+        rest += [c['id'] for c in page]
+    assert rest == ['conv_3', 'conv_4', 'conv_5', 'conv_new']
+
+
+@pytest.fixture
+def api_client(store, monkeypatch):
+    from app import app
+    monkeypatch.setattr(api.routes, '_conversation_store', store)
+    client = app.test_client()
+    return lambda query: client.get(f'/api/conversations?{query}', headers={'X-API-Key': Config.API_KEY})
+
+
+def test_conversations_route_fields_and_ndjson(store, api_client):
+    listing_fixture(store, 5)
+
+    body = api_client('limit=2&fields=status,scam_type').get_json()
+    assert body['conversations'] == [
+        {'id': 'conv_0', 'status': 'active', 'scam_type': 'lottery'},
+        {'id': 'conv_1', 'status': 'completed', 'scam_type': 'banking'},
+    ]
+    assert (body['count'], body['total']) == (2, 5)
+    body = api_client(f'limit=2&fields=history&cursor={body["next_cursor"]}').get_json()
+    assert [(c['id'], len(c['history'])) for c in body['conversations']] == [('conv_2', 1), ('conv_3', 1)]
+
+    response = api_client('format=ndjson&fields=status&status=completed')
+    assert response.mimetype == 'application/x-ndjson'
+    assert [json.loads(line) for line in response.get_data(as_text=True).splitlines()] == [
+        {'id': 'conv_1', 'status': 'completed'}, {'id': 'conv_3', 'status': 'completed'}
+    ]
+    rows = [json.loads(line) for line in api_client('format=ndjson').get_data(as_text=True).splitlines()]
+    assert [r['id'] for r in rows] == [f'conv_{n}' for n in range(5)]
+    assert rows[4]['history'][0]['agent'] == 'agent 4'
+
+    assert api_client('cursor=abc').status_code == 400
+    assert api_client('limit=0').status_code == 400
@@ -1,39 +1,55 @@
 from functools import wraps
-from flask import request, jsonify
-import os
+from flask import request, jsonify, g
+import logging
+import math
 
-API_KEY = os.getenv('API_KEY', 'scam-honeypot-secret-key-12345').strip()
+from .keys import key_registry
+from .rate_limit import rate_limiter
 
-# DEBUG: Print the API key on startup
-print(f"🔑 Backend expecting API_KEY: '{API_KEY}'")
-print(f"🔑 API_KEY length: {len(API_KEY)}")
+logger = logging.getLogger(__name__)
+
+def require_api_key(f=None, *, cost=1):
+    """Decorator to require API key for endpoints
+
+    Keys are checked against the key registry; each request then spends
+    ``cost`` tokens from the client's rate-limit bucket. Use as
+    ``@require_api_key`` or ``@require_api_key(cost=10)``.
+    """
+    if f is None:
+        return lambda fn: require_api_key(fn, cost=cost)
 
-def require_api_key(f):
-    """Decorator to require API key for endpoints"""
     @wraps(f)
     def decorated_function(*args, **kwargs):
         # Check for API key in headers
-        api_key = request.headers.get('X-API-Key', '').strip()  # Add .strip() here too
-        
-        # DEBUG
-        print(f"🔍 Received API key: '{api_key}'")
-        print(f"🔍 Received key length: {len(api_key)}")
-        print(f"🔍 Expected API key: '{API_KEY}'")
-        print(f"🔍 Expected key length: {len(API_KEY)}")
-        print(f"🔍 Match: {api_key == API_KEY}")
+        api_key = request.headers.get('X-API-Key', '').strip()
         
         if not api_key:
+            logger.info("Missing API key", extra={'path': request.path, 'remote_addr': request.remote_addr})
             return jsonify({
                 'error': 'Missing API key',
                 'message': 'Please provide X-API-Key header'
             }), 401
         
-        if api_key != API_KEY:
+        key = key_registry.verify(api_key)
+        if key is None:
+            logger.info("Invalid API key", extra={'path': request.path, 'remote_addr': request.remote_addr})
             return jsonify({
                 'error': 'Invalid API key',
                 'message': 'The provided API key is not valid'
             }), 403
         
+        if rate_limiter is not None:
+            allowed, retry_after = rate_limiter.acquire(key.client, key.rate_per_minute, key.burst, cost)
+            if not allowed:
+                logger.info("Rate limit exceeded", extra={'path': request.path, 'client': key.client})
+                response = jsonify({
+                    'error': 'Rate limit exceeded',
+                    'message': f'Too many requests for this API key; retry in {retry_after:.1f}s'
+                })
+                response.headers['Retry-After'] = str(math.ceil(retry_after))
+                return response, 429
+        
+        g.api_client = key.client
         return f(*args, **kwargs)
     
     return decorated_function
@@ -0,0 +1,239 @@
+import hashlib
+import hmac
+import json
+import logging
+import os
+import secrets
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import NamedTuple, Optional
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+
+def hash_key(raw_key):
+    """SHA-256 hex digest of an API key; only digests are stored or cached"""
+    return hashlib.sha256(raw_key.encode('utf-8')).hexdigest()
+
+
+def generate_key():
+    return secrets.token_urlsafe(32)
+
+
+class KeyRecord(NamedTuple):
+    """One issued API key"""
+    client: str
+    key_hash: str
+    rate_per_minute: Optional[float] = None   # None: Config.RATE_LIMIT_PER_MINUTE
+    burst: Optional[float] = None             # None: Config.RATE_LIMIT_BURST
+
+
+class KeyRegistry:
+    """Base class for API key registries.
+
+    ``verify`` hashes the presented key, finds the record by digest and
+    confirms it with ``hmac.compare_digest``, so raw keys are never stored
+    or compared byte by byte. Results, including unknown keys, are kept in
+    an in-process LRU for ``cache_ttl`` seconds, so a revoked key stops
+    working within that window. Backends implement ``_lookup``.
+
+    The env ``API_KEY`` is always accepted as client "default".
+    """
+
+    def __init__(self, cache_size=None, cache_ttl=None, default_key=None):
+        self.cache_size = cache_size or Config.API_KEY_CACHE_SIZE
+        self.cache_ttl = Config.API_KEY_CACHE_TTL if cache_ttl is None else cache_ttl
+        default_key = Config.API_KEY if default_key is None else default_key
+        self.default = KeyRecord('default', hash_key(default_key.strip())) if default_key else None
+        self.hits = 0
+        self.misses = 0
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def verify(self, raw_key):
+        """Return the KeyRecord for a presented key, or None if it is not valid"""
+        key_hash = hash_key(raw_key)
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._cache.get(key_hash)
+            if entry is not None and entry[1] > now:
+                self._cache.move_to_end(key_hash)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+
+        record = self._find(key_hash)
+
+        with self._lock:
+            self._cache[key_hash] = (record, now + self.cache_ttl)
+            self._cache.move_to_end(key_hash)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return record
+
+    def invalidate(self):
+        with self._lock:
+            self._cache.clear()
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            'backend': self.backend,
+            'cached': len(self._cache),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / total, 4) if total else 0.0
+        }
+
+    def _find(self, key_hash):
+        candidates = [self.default, self._lookup(key_hash)]
+        found = None
+        for record in candidates:
+            # Evaluate every candidate so timing doesn't reveal which matched
+            if record is not None and hmac.compare_digest(record.key_hash, key_hash):
+                found = found or record
+        return found
+
+    def _lookup(self, key_hash):
+        raise NotImplementedError
+
+
+class FileKeyRegistry(KeyRegistry):
+    """Keys from a JSON file, re-read when the file changes.
+
+    Format: [{"client": "partner-a", "key_sha256": "<hex>",
+              "rate_per_minute": 60, "burst": 10}, ...]
+
+    A file that cannot be read or parsed (e.g. half-written) is logged and
+    the keys last loaded stay in effect until it changes again.
+    """
+
+    backend = 'file'
+
+    def __init__(self, path, **kwargs):
+        super().__init__(**kwargs)
+        self.path = path
+        self._mtime = None
+        self._keys = {}
+        self._load_lock = threading.Lock()
+
+    def _lookup(self, key_hash):
+        self._reload_if_changed()
+        return self._keys.get(key_hash)
+
+    def _reload_if_changed(self):
+        try:
+            mtime = os.stat(self.path).st_mtime
+        except (FileNotFoundError, TypeError):
+            self._keys, self._mtime = {}, None
+            return
+        except OSError as e:
+            logger.error("Could not stat API keys file %s: %s", self.path, e)
+            return
+        if mtime == self._mtime:
+            return
+        with self._load_lock:
+            if mtime == self._mtime:
+                return
+            self._mtime = mtime
+            try:
+                with open(self.path, encoding='utf-8') as f:
+                    entries = json.load(f)
+                self._keys = {
+                    e['key_sha256']: KeyRecord(
+                        e['client'], e['key_sha256'], e.get('rate_per_minute'), e.get('burst')
+                    )
+                    for e in entries if e.get('enabled', True)
+                }
+            except (OSError, ValueError, KeyError, TypeError, AttributeError) as e:
+                logger.error("Could not load API keys from %s, keeping %d loaded keys: %s",
+                             self.path, len(self._keys), e)
+                return
+        self.invalidate()
+
+
+class SQLiteKeyRegistry(KeyRegistry):
+    """Keys in a SQLite table, shared by every worker pointing at the file"""
+
+    backend = 'sqlite'
+
+    def __init__(self, path, **kwargs):
+        super().__init__(**kwargs)
+        self.path = path
+        self._local = threading.local()
+        conn = self._conn()
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS api_keys ('
+            'key_hash TEXT PRIMARY KEY, client TEXT NOT NULL, '
+            'rate_per_minute REAL, burst REAL, '
+            'enabled INTEGER NOT NULL DEFAULT 1, created_at REAL NOT NULL)'
+        )
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_api_keys_client ON api_keys(client)')
+        conn.commit()
+
+    def _conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _lookup(self, key_hash):
+        row = self._conn().execute(
+            'SELECT client, key_hash, rate_per_minute, burst FROM api_keys '
+            'WHERE key_hash = ? AND enabled = 1', (key_hash,)
+        ).fetchone()
+        return KeyRecord(*row) if row else None
+
+    def add_key(self, client, rate_per_minute=None, burst=None):
+        """Issue a new key for a client; the raw key is returned once and never stored"""
+        raw_key = generate_key()
+        conn = self._conn()
+        with conn:
+            conn.execute(
+                'INSERT INTO api_keys (key_hash, client, rate_per_minute, burst, created_at) '
+                'VALUES (?, ?, ?, ?, ?)',
+                (hash_key(raw_key), client, rate_per_minute, burst, time.time())
+            )
+        return raw_key
+
+    def revoke(self, client):
+        """Disable every key of a client; returns how many were revoked"""
+        conn = self._conn()
+        with conn:
+            revoked = conn.execute(
+                'UPDATE api_keys SET enabled = 0 WHERE client = ? AND enabled = 1', (client,)
+            ).rowcount
+        self.invalidate()
+        return revoked
+
+    def list_keys(self):
+        rows = self._conn().execute(
+            'SELECT client, rate_per_minute, burst, enabled, created_at FROM api_keys ORDER BY created_at'
+        ).fetchall()
+        return [
+            {'client': c, 'rate_per_minute': r, 'burst': b, 'enabled': bool(e), 'created_at': t}
+            for c, r, b, e, t in rows
+        ]
+
+
+def create_key_registry(backend=None):
+    """Build the key registry configured in Config"""
+    backend = backend or Config.API_KEYS_BACKEND
+    if backend == 'file':
+        return FileKeyRegistry(Config.API_KEYS_PATH or None)
+    if backend == 'sqlite':
+        return SQLiteKeyRegistry(Config.API_KEYS_PATH or 'api_keys.db')
+    raise ValueError(f'Unknown API key registry backend: {backend}')
+
+
+# Global instance
+key_registry = create_key_registry()
@@ -0,0 +1,134 @@
+import bisect
+import threading
+import time
+from functools import wraps
+
+# Upper bounds in milliseconds: 10us up to 10s, eight buckets per decade
+BUCKET_BOUNDS_MS = [round(10 ** (e / 8), 6) for e in range(-16, 33)]
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram with percentile estimates.
+
+    Recording is a bisect and an increment under a lock, so it is cheap
+    enough for hot endpoints. Percentiles are interpolated inside the
+    bucket that holds them (about 33% bucket width at most).
+    """
+
+    def __init__(self, bounds=None):
+        self.bounds = bounds or BUCKET_BOUNDS_MS
+        self.counts = [0] * (len(self.bounds) + 1)   # last bucket is +Inf
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, ms):
+        index = bisect.bisect_left(self.bounds, ms)
+        with self._lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.total_ms += ms
+            if ms > self.max_ms:
+                self.max_ms = ms
+
+    def percentile(self, pct):
+        with self._lock:
+            counts = list(self.counts)
+            count = self.count
+            max_ms = self.max_ms
+        return self._percentile(counts, count, max_ms, pct)
+
+    def snapshot(self):
+        with self._lock:
+            counts = list(self.counts)
+            count = self.count
+            total_ms = self.total_ms
+            max_ms = self.max_ms
+        return {
+            'count': count,
+            'avg_ms': round(total_ms / count, 4) if count else 0.0,
+            'p50_ms': round(self._percentile(counts, count, max_ms, 50), 4),
+            'p95_ms': round(self._percentile(counts, count, max_ms, 95), 4),
+            'p99_ms': round(self._percentile(counts, count, max_ms, 99), 4),
+            'max_ms': round(max_ms, 4)
+        }
+
+    def buckets(self):
+        """Cumulative (upper bound ms, count) pairs, ending with +Inf"""
+        with self._lock:
+            counts = list(self.counts)
+        return cumulative_buckets(self.bounds, counts)
+
+    def state(self):
+        """Raw bucket counts and totals, for merging across processes"""
+        with self._lock:
+            return {'counts': list(self.counts), 'count': self.count,
+                    'total_ms': self.total_ms, 'max_ms': self.max_ms}
+
+    def _percentile(self, counts, count, max_ms, pct):
+        if not count:
+            return 0.0
+        rank = count * pct / 100
+        seen = 0
+        for index, n in enumerate(counts):
+            if n and seen + n >= rank:
+                lower = self.bounds[index - 1] if index else 0.0
+                upper = self.bounds[index] if index < len(self.bounds) else max_ms
+                return min(lower + (upper - lower) * (rank - seen) / n, max_ms)
+            seen += n
+        return max_ms
+
+
+def cumulative_buckets(bounds, counts):
+    """(upper bound ms, cumulative count) pairs, ending with +Inf"""
+    cumulative = []
+    running = 0
+    for bound, n in zip(bounds + [float('inf')], counts):
+        running += n
+        cumulative.append((bound, running))
+    return cumulative
+
+
+class LatencyRegistry:
+    """Named latency histograms, created on first observation"""
+
+    def __init__(self, bounds=None):
+        self.bounds = bounds
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def get(self, name):
+        histogram = self._histograms.get(name)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(name, LatencyHistogram(self.bounds))
+        return histogram
+
+    def observe(self, name, ms):
+        self.get(name).observe(ms)
+
+    def snapshot(self):
+        return {name: h.snapshot() for name, h in sorted(self._histograms.items())}
+
+    def items(self):
+        return sorted(self._histograms.items())
+
+
+def track_latency(name, registry=None):
+    """Decorator recording each call's wall time under ``name``"""
+    def decorator(f):
+        @wraps(f)
+        def wrapper(*args, **kwargs):
+            histogram = (registry or endpoint_latency).get(name)
+            start = time.perf_counter()
+            try:
+                return f(*args, **kwargs)
+            finally:
+                histogram.observe((time.perf_counter() - start) * 1000)
+        return wrapper
+    return decorator
+
+
+# Global instance
+endpoint_latency = LatencyRegistry()
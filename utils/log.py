@@ -0,0 +1,140 @@
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import re
+import sys
+import threading
+import time
+
+from config import Config
+
+# Attributes every LogRecord has; anything else was passed via ``extra``
+_RECORD_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+# Provider keys that should never reach a log line, even if not configured here
+_TOKEN_PATTERN = re.compile(r'\b(?:gsk|sk|pk)_[A-Za-z0-9]{16,}\b')
+
+REDACTED = '[REDACTED]'
+
+
+class SamplingFilter(logging.Filter):
+    """Keep a fraction of records below WARNING; warnings and errors always pass"""
+
+    def __init__(self, rate):
+        super().__init__()
+        self.rate = rate
+        self.sampled_out = 0
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING or self.rate >= 1:
+            return True
+        if random.random() < self.rate:
+            return True
+        self.sampled_out += 1
+        return False
+
+
+class RedactingFilter(logging.Filter):
+    """Mask configured secrets and anything shaped like a provider API key"""
+
+    def __init__(self, secrets):
+        super().__init__()
+        secrets = sorted({s for s in secrets if s and len(s) >= 8}, key=len, reverse=True)
+        self.pattern = re.compile('|'.join(re.escape(s) for s in secrets)) if secrets else None
+
+    def redact(self, text):
+        if self.pattern is not None:
+            text = self.pattern.sub(REDACTED, text)
+        return _TOKEN_PATTERN.sub(REDACTED, text)
+
+    def filter(self, record):
+        record.msg = self.redact(record.getMessage())
+        record.args = None
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS and isinstance(value, str):
+                setattr(record, key, self.redact(value))
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: ts, level, logger, msg, plus any ``extra`` fields"""
+
+    def format(self, record):
+        entry = {
+            'ts': round(record.created, 3),
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage()
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS:
+                entry[key] = value
+        return json.dumps(entry, default=str)
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that drops (and counts) records instead of blocking when full"""
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+_setup_lock = threading.Lock()
+_state = {}
+
+
+def setup_logging(level=None, fmt=None, sample_rate=None, stream=None):
+    """Route the root logger through a queue to a background writer thread.
+
+    Callers only format the message and enqueue it; redaction, formatting
+    and the write happen on the listener thread. Safe to call repeatedly;
+    only the first call configures anything.
+    """
+    with _setup_lock:
+        if _state:
+            return _state['listener']
+
+        output = logging.StreamHandler(stream or sys.stderr)
+        output.addFilter(RedactingFilter([Config.API_KEY, Config.GROQ_API_KEY, Config.SECRET_KEY]))
+        if (fmt or Config.LOG_FORMAT) == 'json':
+            output.setFormatter(JsonFormatter())
+        else:
+            formatter = logging.Formatter('%(asctime)s %(levelname)s %(name)s: %(message)s')
+            formatter.converter = time.gmtime
+            output.setFormatter(formatter)
+
+        handler = DroppingQueueHandler(queue.Queue(maxsize=Config.LOG_QUEUE_SIZE))
+        sampler = SamplingFilter(Config.LOG_SAMPLE_RATE if sample_rate is None else sample_rate)
+        handler.addFilter(sampler)
+
+        root = logging.getLogger()
+        root.handlers = [handler]
+        root.setLevel((level or Config.LOG_LEVEL).upper())
+
+        listener = logging.handlers.QueueListener(handler.queue, output)
+        listener.start()
+        atexit.register(listener.stop)
+
+        _state.update(listener=listener, handler=handler, sampler=sampler)
+        return listener
+
+
+def logging_stats():
+    """Records dropped on a full queue or sampled out since startup"""
+    if not _state:
+        return None
+    return {
+        'queued': _state['handler'].queue.qsize(),
+        'dropped': _state['handler'].dropped,
+        'sampled_out': _state['sampler'].sampled_out
+    }
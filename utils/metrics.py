@@ -0,0 +1,328 @@
+import glob
+import json
+import os
+import threading
+import time
+from functools import wraps
+
+try:
+    import fcntl
+except ImportError:  # Not on Windows: retired totals are folded without a lock
+    fcntl = None
+
+from config import Config
+from .latency import BUCKET_BOUNDS_MS, LatencyRegistry, cumulative_buckets, endpoint_latency
+
+# Stage latencies span sub-millisecond regex scans to multi-second LLM calls
+STAGE_BOUNDS_MS = [0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000]
+
+METRIC_HELP = {
+    'stage_duration_seconds': 'Time spent in each engagement stage',
+    'endpoint_duration_seconds': 'Request handler latency',
+    'llm_calls_total': 'LLM calls by mode and outcome',
+    'llm_retries_total': 'LLM attempts retried after a retryable error',
+    'llm_tokens_total': 'LLM tokens by kind (prompt, completion)',
+    'fallbacks_total': 'Canned or rule-based results used after a failure',
+    'engagements_total': 'Finished autonomous engagements by status',
+    'campaign_assignments_total': 'Scam messages assigned to a campaign (exact, similar or new)',
+    'classifier_decisions_total': 'Local classifier outcomes (scam, not_scam, or uncertain: sent to the LLM)',
+    'conversations': 'Stored conversations',
+    'active_conversations': 'Conversations currently being engaged',
+    'verdict_cache_entries': 'Cached LLM scam verdicts',
+    'engagement_jobs': 'Background engagements queued or running',
+    'stream_subscribers': 'Live conversation stream subscribers'
+}
+
+
+class _StageTimer:
+    """Context manager timing one stage into a histogram"""
+
+    __slots__ = ('histogram', 'start')
+
+    def __init__(self, histogram):
+        self.histogram = histogram
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe((time.perf_counter() - self.start) * 1000)
+        return False
+
+
+class MetricsRegistry:
+    """Counters, stage histograms and gauges in Prometheus text format.
+
+    Recording stays in process memory (a dict increment or a histogram
+    bisect under a lock). With ``directory`` set, a background thread
+    writes this process's values there every ``flush_interval`` seconds
+    and ``render`` merges the files of every process, so any gunicorn
+    worker can answer a scrape. Files are named by pid and process start
+    time, so a reused pid never overwrites a dead worker's values. Counters
+    and histograms of exited workers are folded into ``retired.json``, so
+    totals never go backwards; their gauges are dropped.
+    """
+
+    def __init__(self, directory=None, flush_interval=None, prefix='honeypot'):
+        self.directory = directory
+        self.flush_interval = flush_interval or Config.METRICS_FLUSH_INTERVAL
+        self.prefix = prefix
+        self.stages = LatencyRegistry(STAGE_BOUNDS_MS)
+        self._counters = {}
+        self._gauges = {}
+        self._lock = threading.Lock()
+        self._flusher = None
+        self._identity = _identity(os.getpid())
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            self._start_flusher()
+            os.register_at_fork(after_in_child=self._after_fork)
+
+    def inc(self, name, amount=1, **labels):
+        key = (name, tuple(labels.items()))  # Label order is normalised at render time
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def stage(self, name):
+        """``with metrics.stage('detect'):`` records the block's duration"""
+        return _StageTimer(self.stages.get(name))
+
+    def timed(self, name):
+        """Decorator recording each call's duration as stage ``name``"""
+        histogram = self.stages.get(name)
+
+        def decorator(f):
+            @wraps(f)
+            def wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return f(*args, **kwargs)
+                finally:
+                    histogram.observe((time.perf_counter() - start) * 1000)
+            return wrapper
+        return decorator
+
+    def gauge(self, name, fn, shared=False):
+        """Register a gauge read at collection time (``fn`` may return None).
+
+        ``shared`` gauges report the same value from every process (e.g. a
+        SQLite store) and are merged with max instead of sum.
+        """
+        self._gauges[name] = (fn, shared)
+
+    def snapshot(self):
+        """This process's values, JSON-serialisable"""
+        with self._lock:
+            counters = [[name, list(labels), value] for (name, labels), value in self._counters.items()]
+        gauges = {}
+        for name, (fn, shared) in list(self._gauges.items()):
+            try:
+                value = fn()
+            except Exception:
+                value = None
+            if value is not None:
+                gauges[name] = [value, shared]
+        return {
+            'pid': os.getpid(),
+            'started': self._identity,
+            'counters': counters,
+            'stages': {name: h.state() for name, h in self.stages.items()},
+            'endpoints': {name: h.state() for name, h in endpoint_latency.items()},
+            'gauges': gauges
+        }
+
+    def flush(self):
+        if not self.directory:
+            return
+        path = os.path.join(self.directory, f'metrics_{os.getpid()}_{self._identity}.json')
+        tmp = f'{path}.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(self.snapshot(), f)
+        os.replace(tmp, path)
+
+    def render(self):
+        """Prometheus text exposition of every process's metrics"""
+        snapshots = self._collect()
+        lines = []
+        self._render_counters(lines, snapshots)
+        self._render_histograms(lines, snapshots, 'stages', 'stage_duration_seconds', 'stage', STAGE_BOUNDS_MS)
+        self._render_histograms(lines, snapshots, 'endpoints', 'endpoint_duration_seconds', 'endpoint',
+                                BUCKET_BOUNDS_MS)
+        self._render_gauges(lines, snapshots)
+        return '\n'.join(lines) + '\n'
+
+    def _collect(self):
+        own = self.snapshot()
+        if not self.directory:
+            return [own]
+        # One collector at a time, so a dead worker is folded exactly once
+        with open(os.path.join(self.directory, 'retired.lock'), 'a') as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            retired_path = os.path.join(self.directory, 'retired.json')
+            retired = _read_snapshot(retired_path) or {'counters': [], 'stages': {}, 'endpoints': {}}
+            snapshots, dead = [own], []
+            for path in glob.glob(os.path.join(self.directory, 'metrics_*.json')):
+                snapshot = _read_snapshot(path)
+                if snapshot is None or (snapshot['pid'], snapshot.get('started')) == (own['pid'], own['started']):
+                    continue
+                if _alive(snapshot['pid'], snapshot.get('started')):
+                    snapshots.append(snapshot)
+                else:
+                    dead.append((path, snapshot))
+            if dead:
+                retired = _merge_retired(retired, [snapshot for _, snapshot in dead])
+                tmp = f'{retired_path}.tmp'
+                with open(tmp, 'w') as f:
+                    json.dump(retired, f)
+                os.replace(tmp, retired_path)
+                for path, _ in dead:
+                    os.remove(path)
+        retired['gauges'] = {}
+        snapshots.append(retired)
+        return snapshots
+
+    def _render_counters(self, lines, snapshots):
+        totals = {}
+        for snapshot in snapshots:
+            for name, labels, value in snapshot['counters']:
+                key = (name, tuple(sorted(tuple(pair) for pair in labels)))
+                totals[key] = totals.get(key, 0) + value
+        for name in sorted({name for name, _ in totals}):
+            self._header(lines, name, 'counter')
+            for (metric, labels), value in sorted(totals.items()):
+                if metric == name:
+                    lines.append(f'{self.prefix}_{name}{_labels(labels)} {_number(value)}')
+
+    def _render_histograms(self, lines, snapshots, field, name, label, bounds):
+        merged = {}
+        for snapshot in snapshots:
+            for key, state in snapshot[field].items():
+                total = merged.setdefault(key, {'counts': [0] * len(state['counts']), 'count': 0, 'total_ms': 0.0})
+                total['counts'] = [a + b for a, b in zip(total['counts'], state['counts'])]
+                total['count'] += state['count']
+                total['total_ms'] += state['total_ms']
+        if not merged:
+            return
+        self._header(lines, name, 'histogram')
+        for key, total in sorted(merged.items()):
+            for bound_ms, count in cumulative_buckets(bounds, total['counts']):
+                le = '+Inf' if bound_ms == float('inf') else _number(bound_ms / 1000)
+                lines.append(f'{self.prefix}_{name}_bucket{_labels(((label, key), ("le", le)))} {count}')
+            lines.append(f'{self.prefix}_{name}_sum{_labels(((label, key),))} {_number(total["total_ms"] / 1000)}')
+            lines.append(f'{self.prefix}_{name}_count{_labels(((label, key),))} {total["count"]}')
+
+    def _render_gauges(self, lines, snapshots):
+        merged = {}
+        for snapshot in snapshots:
+            for name, (value, shared) in snapshot['gauges'].items():
+                if name in merged:
+                    merged[name] = max(merged[name], value) if shared else merged[name] + value
+                else:
+                    merged[name] = value
+        for name, value in sorted(merged.items()):
+            self._header(lines, name, 'gauge')
+            lines.append(f'{self.prefix}_{name} {_number(value)}')
+
+    def _header(self, lines, name, kind):
+        if name in METRIC_HELP:
+            lines.append(f'# HELP {self.prefix}_{name} {METRIC_HELP[name]}')
+        lines.append(f'# TYPE {self.prefix}_{name} {kind}')
+
+    def _after_fork(self):
+        self._identity = _identity(os.getpid())
+        self._start_flusher()
+
+    def _start_flusher(self):
+        def run():
+            while True:
+                time.sleep(self.flush_interval)
+                try:
+                    self.flush()
+                except OSError:
+                    pass
+
+        self._flusher = threading.Thread(target=run, name='metrics-flush', daemon=True)
+        self._flusher.start()
+
+
+def _start_ticks(pid):
+    """Process start time in clock ticks since boot (Linux), or None"""
+    try:
+        with open(f'/proc/{pid}/stat') as f:
+            return int(f.read().rsplit(')', 1)[1].split()[19])
+    except (OSError, IndexError, ValueError):
+        return None
+
+
+def _identity(pid):
+    """Tells this process apart from a later one reusing its pid"""
+    ticks = _start_ticks(pid)
+    return f't{ticks}' if ticks is not None else f'w{int(time.time() * 1000)}'
+
+
+def _alive(pid, started=None):
+    if started is not None and started.startswith('t'):
+        return _identity(pid) == started
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def _read_snapshot(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _merge_retired(retired, snapshots):
+    """Add the counters and histograms of exited workers to the retired totals"""
+    counters = {
+        (name, tuple(sorted(tuple(pair) for pair in labels))): value
+        for name, labels, value in retired['counters']
+    }
+    for snapshot in snapshots:
+        for name, labels, value in snapshot['counters']:
+            key = (name, tuple(sorted(tuple(pair) for pair in labels)))
+            counters[key] = counters.get(key, 0) + value
+        for field in ('stages', 'endpoints'):
+            for key, state in snapshot[field].items():
+                total = retired[field].get(key)
+                if total is None:
+                    retired[field][key] = state
+                    continue
+                total['counts'] = [a + b for a, b in zip(total['counts'], state['counts'])]
+                total['count'] += state['count']
+                total['total_ms'] += state['total_ms']
+    retired['counters'] = [[name, [list(pair) for pair in labels], value]
+                           for (name, labels), value in counters.items()]
+    return retired
+
+
+def _labels(pairs):
+    if not pairs:
+        return ''
+    escaped = (str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, v in pairs)
+    return '{' + ','.join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + '}'
+
+
+def _number(value):
+    if isinstance(value, float):
+        return repr(round(value, 6))
+    return str(value)
+
+
+def create_metrics():
+    """Build the registry; METRICS_DIR shares it across worker processes"""
+    return MetricsRegistry(Config.METRICS_DIR or None)
+
+
+# Global instance
+metrics = create_metrics()
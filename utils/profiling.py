@@ -0,0 +1,205 @@
+import cProfile
+import io
+import itertools
+import marshal
+import os
+import pstats
+import random
+import sys
+import threading
+import time
+from collections import Counter, deque
+
+from flask import g, request
+
+from config import Config
+from .keys import key_registry
+
+MODES = ('sample', 'cprofile')
+# pstats sort keys, plus the column names pstats also accepts for them
+SORT_KEYS = frozenset(key.value for key in pstats.SortKey) | {'tottime', 'cumtime', 'ncalls'}
+
+
+class StackSampler:
+    """Samples the stacks of registered threads on one background thread.
+
+    Every ``interval`` seconds the current frame of each target thread is
+    walked and counted as a collapsed stack (``outer;inner``), the format
+    flame graph tools read. The thread only runs while something is being
+    sampled.
+    """
+
+    def __init__(self, interval=None):
+        self.interval = interval or Config.PROFILE_SAMPLE_INTERVAL_MS / 1000
+        self._targets = {}
+        self._cond = threading.Condition()
+        self._thread = None
+
+    def start(self, thread_id):
+        counts = Counter()
+        with self._cond:
+            self._targets[thread_id] = counts
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='stack-sampler', daemon=True)
+                self._thread.start()
+            self._cond.notify()
+        return counts
+
+    def stop(self, thread_id):
+        with self._cond:
+            return self._targets.pop(thread_id, Counter())
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if not self._targets:
+                    self._cond.wait()
+                targets = list(self._targets.items())
+            frames = sys._current_frames()
+            for thread_id, counts in targets:
+                frame = frames.get(thread_id)
+                if frame is not None:
+                    counts[_collapse(frame)] += 1
+            del frames
+            time.sleep(self.interval)
+
+
+class RequestProfiler:
+    """Opt-in per-request profiling for a blueprint.
+
+    A request is profiled when it sends ``X-Profile: sample|cprofile`` with
+    a valid API key, or at random with probability ``sample_rate``. The
+    last ``max_profiles`` profiles are kept in a ring buffer: stack samples
+    as collapsed stacks, cProfile runs as pstats data.
+    """
+
+    def __init__(self, sample_rate=None, mode=None, max_profiles=None, header_enabled=None):
+        self.sample_rate = Config.PROFILE_SAMPLE_RATE if sample_rate is None else sample_rate
+        self.mode = mode or Config.PROFILE_MODE
+        self.header_enabled = Config.PROFILE_HEADER_ENABLED if header_enabled is None else header_enabled
+        self.profiles = deque(maxlen=max_profiles or Config.PROFILE_MAX_PROFILES)
+        self.sampler = StackSampler()
+        self.captured = 0
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def init_blueprint(self, blueprint, exclude=()):
+        """Profile the blueprint's requests, except the ``exclude`` endpoints"""
+        excluded = {f'{blueprint.name}.{name}' for name in exclude}
+
+        @blueprint.before_request
+        def start_profile():
+            if request.endpoint not in excluded:
+                self.start()
+
+        @blueprint.after_request
+        def record_status(response):
+            if 'profile' in g:
+                g.profile['status'] = response.status_code
+            return response
+
+        @blueprint.teardown_request
+        def finish_profile(error=None):
+            self.finish()
+
+    def start(self):
+        mode = self._requested_mode()
+        if mode is None:
+            return
+        profile = {'mode': mode, 'started': time.perf_counter(), 'status': None}
+        if mode == 'cprofile':
+            profile['profiler'] = cProfile.Profile()
+            profile['profiler'].enable()
+        else:
+            profile['counts'] = self.sampler.start(threading.get_ident())
+        g.profile = profile
+
+    def finish(self):
+        profile = g.pop('profile', None)
+        if profile is None:
+            return
+        duration_ms = (time.perf_counter() - profile['started']) * 1000
+        if profile['mode'] == 'cprofile':
+            profile['profiler'].disable()
+            profile['profiler'].create_stats()
+            data = marshal.dumps(profile['profiler'].stats)
+        else:
+            data = dict(self.sampler.stop(threading.get_ident()))
+
+        with self._lock:
+            self.captured += 1
+            self.profiles.append({
+                'id': next(self._ids),
+                'timestamp': time.time(),
+                'method': request.method,
+                'path': request.path,
+                'status': profile['status'],
+                'mode': profile['mode'],
+                'duration_ms': round(duration_ms, 3),
+                'data': data
+            })
+
+    def list(self):
+        with self._lock:
+            return [{k: v for k, v in p.items() if k != 'data'} for p in reversed(self.profiles)]
+
+    def get(self, profile_id):
+        with self._lock:
+            return next((p for p in self.profiles if p['id'] == profile_id), None)
+
+    def stats(self):
+        return {
+            'captured': self.captured,
+            'stored': len(self.profiles),
+            'sample_rate': self.sample_rate,
+            'mode': self.mode
+        }
+
+    def _requested_mode(self):
+        header = request.headers.get('X-Profile', '').strip().lower()
+        if header and self.header_enabled:
+            # Only callers holding an API key may ask for the extra overhead
+            if key_registry.verify(request.headers.get('X-API-Key', '').strip()) is not None:
+                return header if header in MODES else self.mode
+        if self.sample_rate and random.random() < self.sample_rate:
+            return self.mode
+        return None
+
+
+def collapsed_stacks(profile):
+    """Stack-sample profile as ``frame;frame count`` lines for flame graphs"""
+    return ''.join(f'{stack} {count}\n' for stack, count in
+                   sorted(profile['data'].items(), key=lambda item: -item[1]))
+
+
+def pstats_text(profile, sort='cumulative', limit=50):
+    """Human-readable pstats table for a cProfile profile"""
+    if sort not in SORT_KEYS:
+        raise ValueError(f'Unknown sort key: {sort}')
+    out = io.StringIO()
+    stats = pstats.Stats(_StatsSource(profile['data']), stream=out)
+    stats.sort_stats(sort).print_stats(limit)
+    return out.getvalue()
+
+
+class _StatsSource:
+    """Adapter so pstats.Stats can load marshalled profiler stats"""
+
+    def __init__(self, data):
+        self.stats = marshal.loads(data)
+
+    def create_stats(self):
+        pass
+
+
+def _collapse(frame):
+    stack = []
+    while frame is not None:
+        code = frame.f_code
+        stack.append(f'{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})')
+        frame = frame.f_back
+    return ';'.join(reversed(stack))
+
+
+# Global instance
+request_profiler = RequestProfiler()
@@ -0,0 +1,42 @@
+from bisect import bisect_left, insort
+from itertools import islice
+from typing import Dict, Hashable, List
+
+
+class CountRanking:
+    """Keys bucketed by count, for top-N without sorting.
+
+    Counts only ever move by one, so a change is a dict move between
+    neighbouring buckets plus a bisect on the (short) list of distinct
+    counts; ``top`` walks buckets from the highest count down. Moving a
+    key to count 0 removes it.
+    """
+
+    __slots__ = ('buckets', 'counts')
+
+    def __init__(self):
+        self.buckets: Dict[int, Dict[Hashable, None]] = {}
+        self.counts: List[int] = []  # Distinct non-zero counts, ascending
+
+    def move(self, key: Hashable, old: int, new: int):
+        if old:
+            bucket = self.buckets[old]
+            del bucket[key]
+            if not bucket:
+                del self.buckets[old]
+                del self.counts[bisect_left(self.counts, old)]
+        if new:
+            bucket = self.buckets.get(new)
+            if bucket is None:
+                bucket = self.buckets[new] = {}
+                insort(self.counts, new)
+            bucket[key] = None
+
+    def top(self, limit: int) -> List[Hashable]:
+        keys = []
+        for count in reversed(self.counts):
+            # Most recently promoted first within a count
+            keys.extend(islice(reversed(self.buckets[count]), limit - len(keys)))
+            if len(keys) >= limit:
+                break
+        return keys
@@ -0,0 +1,130 @@
+import os
+import sqlite3
+import threading
+import time
+
+from config import Config
+
+
+def _refill(tokens, updated_at, now, rate, burst, cost):
+    """Token bucket step: returns (tokens left, allowed, seconds until allowed)"""
+    tokens = min(burst, tokens + max(now - updated_at, 0) * rate)
+    cost = min(cost, burst)  # A request larger than the bucket needs a full bucket
+    if tokens >= cost:
+        return tokens - cost, True, 0.0
+    return tokens, False, (cost - tokens) / rate
+
+
+class RateLimiter:
+    """Base class for per-client token-bucket rate limiters.
+
+    Each client refills at ``rate_per_minute`` up to ``burst`` tokens and
+    a request spends ``cost`` tokens. Backends implement ``_acquire``.
+    """
+
+    def __init__(self):
+        self.allowed = 0
+        self.limited = 0
+        self._lock = threading.Lock()
+
+    def acquire(self, client, rate_per_minute=None, burst=None, cost=1):
+        """Spend ``cost`` tokens; returns (allowed, retry_after_seconds)"""
+        rate = (rate_per_minute or Config.RATE_LIMIT_PER_MINUTE) / 60
+        burst = burst or Config.RATE_LIMIT_BURST
+        allowed, retry_after = self._acquire(client, rate, burst, cost)
+        with self._lock:
+            if allowed:
+                self.allowed += 1
+            else:
+                self.limited += 1
+        return allowed, retry_after
+
+    def stats(self):
+        return {'backend': self.backend, 'allowed': self.allowed, 'limited': self.limited}
+
+    def _acquire(self, client, rate, burst, cost):
+        raise NotImplementedError
+
+
+class MemoryRateLimiter(RateLimiter):
+    """Buckets in a dict; limits apply per process"""
+
+    backend = 'memory'
+
+    def __init__(self):
+        super().__init__()
+        self._buckets = {}
+        self._bucket_lock = threading.Lock()
+
+    def _acquire(self, client, rate, burst, cost):
+        now = time.monotonic()
+        with self._bucket_lock:
+            tokens, updated_at = self._buckets.get(client, (burst, now))
+            tokens, allowed, retry_after = _refill(tokens, updated_at, now, rate, burst, cost)
+            self._buckets[client] = (tokens, now)
+        return allowed, retry_after
+
+
+class SQLiteRateLimiter(RateLimiter):
+    """Buckets in a SQLite table, so every worker on the host shares one limit.
+
+    Each acquire is a single BEGIN IMMEDIATE read-modify-write, which
+    serializes concurrent workers on the same file.
+    """
+
+    backend = 'sqlite'
+
+    def __init__(self, path):
+        super().__init__()
+        self.path = path
+        self._local = threading.local()
+        self._conn().execute(
+            'CREATE TABLE IF NOT EXISTS rate_buckets ('
+            'client TEXT PRIMARY KEY, tokens REAL NOT NULL, updated_at REAL NOT NULL)'
+        )
+
+    def _conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _acquire(self, client, rate, burst, cost):
+        conn = self._conn()
+        now = time.time()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            row = conn.execute(
+                'SELECT tokens, updated_at FROM rate_buckets WHERE client = ?', (client,)
+            ).fetchone()
+            tokens, updated_at = row if row else (burst, now)
+            tokens, allowed, retry_after = _refill(tokens, updated_at, now, rate, burst, cost)
+            conn.execute(
+                'INSERT OR REPLACE INTO rate_buckets (client, tokens, updated_at) VALUES (?, ?, ?)',
+                (client, tokens, now)
+            )
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        return allowed, retry_after
+
+
+def create_rate_limiter(backend=None):
+    """Build the rate limiter configured in Config (None when disabled)"""
+    backend = backend or Config.RATE_LIMIT_BACKEND
+    if backend == 'sqlite':
+        return SQLiteRateLimiter(Config.RATE_LIMIT_PATH)
+    if backend == 'memory':
+        return MemoryRateLimiter()
+    if backend == 'none':
+        return None
+    raise ValueError(f'Unknown rate limit backend: {backend}')
+
+
+# Global instance
+rate_limiter = create_rate_limiter()